@@ -0,0 +1,135 @@
+# agents/catalog_feed.py — Scout-side catalog access (streamed rows + requirement filter)
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional
+
+import httpx
+
+BUDGET_TOLERANCE = 1.15  # slight budget tolerance
+
+
+# ------------------------------------------------------------------------------
+# ✅ Business rules
+# ------------------------------------------------------------------------------
+def matches_request(laptop_data: dict, msg) -> bool:
+    """True if a catalog row satisfies a ProcurementRequest's requirements."""
+    if msg.use_case not in laptop_data.get("use_cases", []):
+        return False
+    if msg.min_ram_gb and laptop_data["specs"]["ram_gb"] < msg.min_ram_gb:
+        return False
+    if msg.min_storage_gb and laptop_data["specs"]["storage_gb"] < msg.min_storage_gb:
+        return False
+    if msg.preferred_brand and laptop_data["brand"].lower() != msg.preferred_brand.lower():
+        return False
+    if laptop_data["stock"] < msg.quantity:
+        return False
+    if laptop_data["price"] > msg.max_budget_per_unit * BUDGET_TOLERANCE:
+        return False
+    return True
+
+
+def filter_rows(rows: Iterable[dict], msg) -> Iterator[dict]:
+    for laptop_data in rows:
+        if matches_request(laptop_data, msg):
+            yield laptop_data
+
+
+# ------------------------------------------------------------------------------
+# ✅ NDJSON streaming feed
+# ------------------------------------------------------------------------------
+async def iter_ndjson_rows(client: httpx.AsyncClient, url: str) -> AsyncIterator[dict]:
+    """Yield catalog rows one at a time as the NDJSON feed arrives."""
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line:
+                yield json.loads(line)
+
+
+async def stream_candidates(client: httpx.AsyncClient, url: str, msg) -> AsyncIterator[dict]:
+    """Streamed rows → requirement filter; only matching rows are ever retained."""
+    async for laptop_data in iter_ndjson_rows(client, url):
+        if matches_request(laptop_data, msg):
+            yield laptop_data
+
+
+# ------------------------------------------------------------------------------
+# ✅ Local catalog replica (conditional refresh + singleflight)
+# ------------------------------------------------------------------------------
+class CatalogReplica:
+    """
+    Versioned in-memory copy of the catalog. Fresh copies are served directly;
+    stale ones are served while a background conditional GET (If-None-Match)
+    revalidates them. Concurrent misses share a single in-flight fetch.
+    Fetches go through `client_factory`'s (caller-owned, pooled) client, or
+    else a short-lived client closed after each fetch.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_s: float = 30.0,
+        client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+    ):
+        self.url = url
+        self.ttl_s = ttl_s
+        self.rows: List[dict] = []
+        self.etag: Optional[str] = None
+        self.version = 0           # bumped whenever the catalog content changes
+        self.catalog_version: Optional[str] = None  # backend snapshot version (X-Catalog-Version)
+        self.fetched_at = 0.0      # monotonic time of the last successful (re)validation
+        self._client_factory = client_factory
+        self._inflight: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.version > 0
+
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() - self.fetched_at > self.ttl_s
+
+    async def get(self) -> List[dict]:
+        if not self.loaded:
+            await self.refresh()
+        elif self.stale:
+            self.refresh_in_background()
+        return self.rows
+
+    def refresh_in_background(self) -> None:
+        if self._inflight is None:
+            self._start_fetch()
+
+    async def refresh(self) -> List[dict]:
+        task = self._inflight or self._start_fetch()
+        await asyncio.shield(task)
+        return self.rows
+
+    def _start_fetch(self) -> asyncio.Task:
+        task = self._inflight = asyncio.create_task(self._fetch())
+        task.add_done_callback(self._fetch_done)
+        return task
+
+    def _fetch_done(self, task: asyncio.Task) -> None:
+        self._inflight = None
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[CatalogReplica] Refresh failed: {task.exception()}")
+
+    async def _fetch(self) -> None:
+        headers = {"If-None-Match": self.etag} if self.etag and self.loaded else {}
+        if self._client_factory is not None:
+            response = await self._client_factory().get(self.url, headers=headers)
+        else:
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.get(self.url, headers=headers)
+        if response.status_code == 304:
+            self.fetched_at = time.monotonic()
+            return
+        response.raise_for_status()
+        self.rows = response.json().get("laptops", [])
+        self.etag = response.headers.get("etag")
+        self.catalog_version = response.headers.get("x-catalog-version")
+        self.version += 1
+        self.fetched_at = time.monotonic()
@@ -5,7 +5,8 @@ import httpx
 import datetime
 from uagents import Agent, Context, Protocol
 from uagents.setup import fund_agent_if_low
-from agents.messages import LaptopEvaluationRequest, LaptopScoredResponse, ScoredLaptopOption
+from agents.messages import LaptopEvaluationRequest, LaptopScoredResponse, PayloadRejected, ScoredLaptopOption
+from agents.wire import resolver
 
 # ------------------------------------------------------------------------------
 # Environment-based configuration (✅ Now ready for microservice deployment)
@@ -20,17 +21,9 @@ NOTIFY_URL = os.getenv("NOTIFY_URL", "http://127.0.0.1:9000/api/notify")
 AGENT_MNEMONIC = os.getenv("AGENT_MNEMONIC")
 
 # ------------------------------------------------------------------------------
-# Agent Setup
+# Protocol (the Agent itself is only built when run standalone, see bottom)
 # ------------------------------------------------------------------------------
 
-compute_agent = Agent(
-    name="compute_agent",
-    port=PORT,
-    endpoint=f"{PUBLIC_URL}/submit",   # ✅ dynamic endpoint
-    mailbox=True,
-    seed=AGENT_MNEMONIC                # ✅ optional stable identity support
-)
-
 proto = Protocol(name="compute_protocol")
 
 
@@ -62,13 +55,30 @@ async def handle_laptop_eval_request(ctx: Context, sender: str, msg: LaptopEvalu
     await notify(msg.request_id, "🧮 Dispatching batch to CUDOS compute cluster...")
 
     try:
-        # Prepare data payload
-        laptop_dicts = [laptop.dict() for laptop in msg.laptops]
-        await notify(msg.request_id, f"📦 {len(laptop_dicts)} laptops queued for evaluation...")
+        # Compact requests carry only ids (rows resolved below if ever needed)
+        compact = msg.laptop_ids is not None and not msg.laptops
+        ids = msg.laptop_ids if compact else [laptop.id for laptop in msg.laptops]
+        await notify(msg.request_id, f"📦 {len(ids)} laptops queued for evaluation...")
 
         async with httpx.AsyncClient() as client:
-            response = await client.post(SCORING_URL, json={"laptops": laptop_dicts})
+            # Catalog SKUs are precomputed server-side: look them up by id first
+            response = await client.post(SCORING_URL, json={"ids": ids})
             scoring_data = response.json()
+            unscored = set(scoring_data.get("missing", []))
+            missing = [i for i in ids if i in unscored]
+            if missing:
+                if compact:
+                    rows = await resolver().rows(msg.catalog_version, missing)
+                    if rows is None:
+                        await ctx.send(sender, PayloadRejected(
+                            request_id=msg.request_id, stage="compute", chunk_index=msg.chunk_index,
+                            reason=f"catalog {msg.catalog_version} rows unavailable",
+                        ))
+                        return
+                else:
+                    rows = [laptop.dict() for laptop in msg.laptops if laptop.id in unscored]
+                response = await client.post(SCORING_URL, json={"laptops": rows})
+                scoring_data["results"] += response.json()["results"]
 
         await notify(
             msg.request_id,
@@ -82,29 +92,48 @@ async def handle_laptop_eval_request(ctx: Context, sender: str, msg: LaptopEvalu
             "network": "cudos-mainnet",
             "compute_cost": scoring_data["compute_cost"],
             "execution_time_ms": scoring_data["execution_time_ms"],
-            "node_location": scoring_data["node_location"]
+            "node_location": scoring_data["node_location"],
+            "factor_version": scoring_data.get("factor_version"),
         }
 
-        scored_laptops = []
-        for result in scoring_data["results"]:
-            base = next(l for l in msg.laptops if l.id == result["id"])
+        results = scoring_data["results"]
+        models = {} if compact else {l.id: l.model for l in msg.laptops}
+        for result in results:
             await notify(
                 msg.request_id,
-                f"📊 {base.model}: proc={result['processor_score']} | "
+                f"📊 {models.get(result['id'], result['id'])}: proc={result['processor_score']} | "
                 f"warr={result['warranty_score']} | ship={result['shipping_score']}"
             )
-            scored_laptops.append(ScoredLaptopOption(
-                base=base,
-                processor_score=result["processor_score"],
-                warranty_score=result["warranty_score"],
-                shipping_score=result["shipping_score"],
-                cudos_meta=cudos_meta
-            ))
-
-        await ctx.send(sender, LaptopScoredResponse(
-            request_id=msg.request_id,
-            laptops=scored_laptops
-        ))
+
+        chunk = {"chunk_index": msg.chunk_index, "final": msg.final, "total_chunks": msg.total_chunks}
+        if compact:
+            # Score columns + one cudos_meta instead of a full row per laptop
+            reply = LaptopScoredResponse(
+                request_id=msg.request_id,
+                laptop_ids=[r["id"] for r in results],
+                processor_scores=[r["processor_score"] for r in results],
+                warranty_scores=[r["warranty_score"] for r in results],
+                shipping_scores=[r["shipping_score"] for r in results],
+                cudos_meta=cudos_meta,
+                **chunk,
+            )
+        else:
+            by_id = {l.id: l for l in msg.laptops}
+            reply = LaptopScoredResponse(
+                request_id=msg.request_id,
+                laptops=[
+                    ScoredLaptopOption(
+                        base=by_id[result["id"]],
+                        processor_score=result["processor_score"],
+                        warranty_score=result["warranty_score"],
+                        shipping_score=result["shipping_score"],
+                        cudos_meta=cudos_meta
+                    )
+                    for result in results
+                ],
+                **chunk,
+            )
+        await ctx.send(sender, reply)
 
         await notify(msg.request_id, "✅ Compute scoring complete — forwarding to Evaluator...")
 
@@ -117,13 +146,24 @@ async def handle_laptop_eval_request(ctx: Context, sender: str, msg: LaptopEvalu
 
 
 # ------------------------------------------------------------------------------
-# Bootstrap
+# Bootstrap (fused mode calls the handler above without an Agent)
 # ------------------------------------------------------------------------------
 
-fund_agent_if_low(compute_agent.wallet.address())
-compute_agent.include(proto, publish_manifest=True)
+def build_agent() -> Agent:
+    agent = Agent(
+        name="compute_agent",
+        port=PORT,
+        endpoint=f"{PUBLIC_URL}/submit",   # ✅ dynamic endpoint
+        mailbox=True,
+        seed=AGENT_MNEMONIC                # ✅ optional stable identity support
+    )
+    agent.include(proto, publish_manifest=True)
+    return agent
+
 
 if __name__ == "__main__":
+    compute_agent = build_agent()
+    fund_agent_if_low(compute_agent.wallet.address())
     print("🧮 Starting Compute Agent (CUDOS Simulation)...")
     print("PORT:", PORT)
     print("PUBLIC_URL:", PUBLIC_URL)
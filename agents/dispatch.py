@@ -0,0 +1,201 @@
+# agents/dispatch.py — Replica sets and load-aware dispatch for downstream agents
+#
+# Each downstream stage (Scout / Compute / Evaluator / Negotiator) may run as
+# several replicas, configured as a comma-separated address list. A request
+# goes to one replica, chosen by least outstanding requests or by consistent
+# hashing on request_id. Requests that go unanswered for `timeout_s` take
+# that replica out of rotation for `down_for_s` and are handed to another.
+
+import bisect
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+VNODES = 64  # ring points per replica
+
+
+def parse_addresses(raw: str) -> List[str]:
+    """'addr1, addr2,,addr3' → ['addr1', 'addr2', 'addr3'] (order kept, duplicates dropped)."""
+    return list(dict.fromkeys(a.strip() for a in raw.split(",") if a.strip()))
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class Replica:
+    def __init__(self, address: str):
+        self.address = address
+        self.outstanding = 0
+        self.sent = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.down_until = 0.0
+
+    def up(self, now: float) -> bool:
+        return now >= self.down_until
+
+
+class ReplicaSet:
+    """
+    Replicas of one stage. `pick` + `sent` record a dispatch, `complete` its
+    reply; `expired` hands back requests past their deadline (marking their
+    replica down) so the caller can re-send them elsewhere.
+    """
+
+    def __init__(self, name: str, addresses: List[str], strategy: str = "least",
+                 timeout_s: float = 60.0, down_for_s: float = 30.0, remember: int = 10_000):
+        if not addresses:
+            raise ValueError(f"{name}: at least one replica address is required")
+        self.name = name
+        self.strategy = strategy
+        self.timeout_s = timeout_s
+        self.down_for_s = down_for_s
+        self.replicas: Dict[str, Replica] = {a: Replica(a) for a in addresses}
+        self._ring: List[Tuple[int, str]] = sorted(
+            (_hash(f"{a}#{v}"), a) for a in addresses for v in range(VNODES)
+        )
+        self._ring_keys = [h for h, _ in self._ring]
+        # request_id → (replica address, deadline, message, tried addresses)
+        self._in_flight: Dict[str, Tuple[str, float, object, Tuple[str, ...]]] = {}
+        self._done: "OrderedDict[str, None]" = OrderedDict()  # recent completions, to drop late duplicates
+        self._remember = remember
+        self.redispatched = 0
+
+    @property
+    def addresses(self) -> List[str]:
+        return list(self.replicas)
+
+    def _ring_order(self, request_id: str) -> List[str]:
+        """Replicas in ring order starting from request_id's point (each once)."""
+        start = bisect.bisect(self._ring_keys, _hash(request_id))
+        order: List[str] = []
+        for i in range(len(self._ring)):
+            addr = self._ring[(start + i) % len(self._ring)][1]
+            if addr not in order:
+                order.append(addr)
+                if len(order) == len(self.replicas):
+                    break
+        return order
+
+    def pick(self, request_id: str, exclude: Tuple[str, ...] = ()) -> str:
+        now = time.monotonic()
+        ring = self._ring_order(request_id)
+        candidates = [a for a in ring if a not in exclude and self.replicas[a].up(now)]
+        if not candidates:
+            # everything is down (or already tried): fall back to any replica rather than stall
+            candidates = [a for a in ring if a not in exclude] or ring
+        if self.strategy == "hash":
+            return candidates[0]
+        # least outstanding; ties go to the request's ring order, which spreads them
+        return min(candidates, key=lambda a: self.replicas[a].outstanding)
+
+    def sent(self, request_id: str, address: str, message, tried: Tuple[str, ...] = ()) -> None:
+        self._done.pop(request_id, None)  # a follow-up request (e.g. a full-form resend) expects a new reply
+        previous = self._in_flight.get(request_id)
+        if previous is not None:
+            self.replicas[previous[0]].outstanding -= 1
+        replica = self.replicas[address]
+        replica.outstanding += 1
+        replica.sent += 1
+        self._in_flight[request_id] = (address, time.monotonic() + self.timeout_s, message, tried + (address,))
+
+    def complete(self, request_id: str, sender: str) -> bool:
+        """Record a reply; False if it is a late duplicate of an already-answered request."""
+        if request_id in self._done:
+            return False
+        entry = self._in_flight.pop(request_id, None)
+        if entry is not None:
+            self.replicas[entry[0]].outstanding -= 1
+            self._done[request_id] = None
+            while len(self._done) > self._remember:
+                self._done.popitem(last=False)
+        replica = self.replicas.get(sender)
+        if replica is not None:
+            replica.completed += 1
+            replica.down_until = 0.0  # it answers again
+        return True
+
+    def in_flight(self, request_id: str) -> Optional[Tuple[str, object]]:
+        """(replica, message) of a request still awaiting its reply, else None."""
+        entry = self._in_flight.get(request_id)
+        return None if entry is None else (entry[0], entry[2])
+
+    def touch(self, request_id: str) -> None:
+        """Progress on a request (e.g. a streamed chunk): restart its reply deadline."""
+        entry = self._in_flight.get(request_id)
+        if entry is not None:
+            self._in_flight[request_id] = (entry[0], time.monotonic() + self.timeout_s, entry[2], entry[3])
+
+    def abandon(self, request_id: str) -> None:
+        """Stop tracking a request (a late reply is still accepted)."""
+        entry = self._in_flight.pop(request_id, None)
+        if entry is not None:
+            self.replicas[entry[0]].outstanding -= 1
+
+    def cancel(self, request_id: str) -> None:
+        """Stop tracking a request and drop its reply if one still comes."""
+        self.abandon(request_id)
+        self._done[request_id] = None
+        while len(self._done) > self._remember:
+            self._done.popitem(last=False)
+
+    def expired(self) -> List[Tuple[str, str, object, Tuple[str, ...]]]:
+        """(request_id, replica, message, tried) past deadline; their replicas go out of rotation."""
+        now = time.monotonic()
+        late = [(rid, e[0], e[2], e[3]) for rid, e in self._in_flight.items() if e[1] <= now]
+        for rid, address, _, _ in late:
+            replica = self.replicas[address]
+            replica.timeouts += 1
+            replica.down_until = now + self.down_for_s
+        return late
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "strategy": self.strategy,
+            "in_flight": len(self._in_flight),
+            "redispatched": self.redispatched,
+            "replicas": [
+                {
+                    "address": r.address,
+                    "up": r.up(now),
+                    "outstanding": r.outstanding,
+                    "sent": r.sent,
+                    "completed": r.completed,
+                    "timeouts": r.timeouts,
+                }
+                for r in self.replicas.values()
+            ],
+        }
+
+    def summary(self) -> str:
+        now = time.monotonic()
+        up = sum(r.up(now) for r in self.replicas.values())
+        load = "/".join(str(r.outstanding) for r in self.replicas.values())
+        return f"{self.name}: {up}/{len(self.replicas)} up, outstanding {load}"
+
+
+async def dispatch(ctx, replicas: ReplicaSet, request_id: str, message, exclude: Tuple[str, ...] = ()) -> str:
+    """Send `message` to a replica of `replicas` and track it; returns the address used."""
+    address = replicas.pick(request_id, exclude)
+    replicas.sent(request_id, address, message, exclude)
+    await ctx.send(address, message)
+    return address
+
+
+async def redispatch_expired(ctx, replicas: ReplicaSet) -> List[Tuple[str, str, Optional[str]]]:
+    """Re-send every timed-out request to a replica it has not tried yet: (request_id, from, to)."""
+    moved = []
+    for request_id, address, message, tried in replicas.expired():
+        untried = [a for a in replicas.addresses if a not in tried]
+        if not untried:
+            # every replica had its chance; stop tracking so the slot is freed
+            replicas.abandon(request_id)
+            moved.append((request_id, address, None))
+            continue
+        target = await dispatch(ctx, replicas, request_id, message, tried)
+        replicas.redispatched += 1
+        moved.append((request_id, address, target))
+    return moved
@@ -0,0 +1,112 @@
+# agents/eval_features.py — Per-SKU Evaluator features cached across requests
+#
+# perf score, review signal and compute blend depend only on the laptop (and
+# the Compute agent's scores for it), never on the request. They are computed
+# once per distinct set of inputs and kept in flat arrays; a request gathers
+# its rows and only the budget-dependent value term is computed per call,
+# vectorized.
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_COMPUTE = (0.5, 0.5, 0.5)  # processor / warranty / shipping when Compute gave nothing
+
+
+def value_scores(prices, budget: float):
+    """
+    Vectorized `py_price_value`: same float operations, so identical results.
+    `budget` may be an array that broadcasts against `prices`.
+    """
+    prices = np.asarray(prices, dtype=float)
+    denom = np.maximum(budget, 1e-9)
+    return np.where(prices <= budget, (budget - prices) / denom, -0.3 * ((prices - budget) / denom))
+
+
+class FeatureCache:
+    """
+    LRU cache of (perf, review, compute) stored column-wise in NumPy arrays.
+    Entries are keyed by a fingerprint of the inputs the features read
+    (processor, RAM, GPU, rating, review count and Compute's scores), so a
+    catalog write only misses for the laptops it actually changed. Misses are
+    filled in one batch by the vectorized `perf_fn(processors, ram_gb, gpus)`,
+    `review_fn(ratings, counts)` and `blend_fn(processor, warranty, shipping)`.
+    """
+
+    def __init__(
+        self,
+        perf_fn: Callable,
+        review_fn: Callable,
+        blend_fn: Callable,
+        capacity: int = 50_000,
+    ):
+        self.perf_fn = perf_fn
+        self.review_fn = review_fn
+        self.blend_fn = blend_fn
+        self.capacity = capacity
+        self.perf = np.zeros(capacity)
+        self.review = np.zeros(capacity)
+        self.compute = np.zeros(capacity)
+        self._slots: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @staticmethod
+    def fingerprint(l, compute: Tuple[float, float, float]) -> Hashable:
+        s = l.specs
+        return (s.processor, s.ram_gb, s.gpu, l.rating, l.review_count, compute)
+
+    def _take_slot(self) -> int:
+        if self._free:
+            return self._free.pop()
+        # Least recently used; rows this request already touched sit at the
+        # MRU end, so they are never the ones evicted (n <= capacity)
+        _, slot = self._slots.popitem(last=False)
+        self.evictions += 1
+        return slot
+
+    def gather(self, laptops: Sequence, compute_map: Dict[str, Dict[str, float]]):
+        """(perf, review, compute) arrays aligned with `laptops`, filling misses."""
+        n = len(laptops)
+        if n > self.capacity:
+            raise ValueError(f"{n} laptops exceed feature cache capacity {self.capacity}")
+        slots = np.empty(n, dtype=np.intp)
+        missed: Dict[Hashable, int] = {}  # fingerprint -> index of the laptop that missed
+        for k, l in enumerate(laptops):
+            cs = compute_map.get(l.id)
+            compute = (cs["processor"], cs["warranty"], cs["shipping"]) if cs else DEFAULT_COMPUTE
+            key = self.fingerprint(l, compute)
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._slots.move_to_end(key)
+                self.hits += 1
+            else:
+                slot = self._slots[key] = self._take_slot()
+                missed[key] = k
+                self.misses += 1
+            slots[k] = slot
+
+        if missed:
+            keys = list(missed)
+            fill = slots[list(missed.values())]
+            processors, ram_gb, gpus, ratings, counts, compute = zip(*keys)
+            proc, warr, ship = (np.array(c, dtype=float) for c in zip(*compute))
+            self.perf[fill] = self.perf_fn(processors, np.array(ram_gb, dtype=float), gpus)
+            self.review[fill] = self.review_fn(np.array(ratings, dtype=float), np.array(counts, dtype=float))
+            self.compute[fill] = self.blend_fn(proc, warr, ship)
+        return self.perf[slots], self.review[slots], self.compute[slots]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._slots),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,8 +1,13 @@
 # agents/evaluator.py — Hybrid (MeTTa + Compute + Value) evaluation agent with env-based config
 
+import asyncio
+import heapq
 import os
+import random
+import statistics
 from typing import List, Dict, Optional
 import httpx
+import numpy as np
 
 from uagents import Agent, Context, Protocol
 from uagents.setup import fund_agent_if_low
@@ -12,7 +17,16 @@ from agents.messages import (
     ScoredLaptop,
     ScoredLaptopOption,
     LaptopOption,
+    PayloadRejected,
 )
+from agents.eval_features import DEFAULT_COMPUTE, FeatureCache, value_scores
+from agents.join import HalfJoin
+from agents.streaming import RankStreams
+from agents.kb_compiler import KBCompileError, ParityStats, compare_scores, compiled_kb, score_upper_bounds
+from agents.metta_engine import HAS_METTA, MettaPool, parse_scores, shared_kb
+from agents.pruning import bounded_top_k
+from agents.taxonomy import gpu_info, processor_info
+from agents.wire import hybrid_rationale, ranked_columns, resolver, with_dominance
 
 # ------------------------------------------------------------------------------
 # ✅ Environment-based configuration (for microservice deployment)
@@ -21,18 +35,31 @@ PORT = int(os.getenv("AGENT_PORT", "8001"))
 PUBLIC_URL = os.getenv("PUBLIC_URL", f"http://127.0.0.1:{PORT}")
 NOTIFY_URL = os.getenv("NOTIFY_URL", "http://127.0.0.1:9000/api/notify")
 AGENT_MNEMONIC = os.getenv("AGENT_MNEMONIC")  # optional stable identity
+# "compiled": kb.metta rules compiled to NumPy (default); "metta": always run Hyperon
+SYMBOLIC_ENGINE = os.getenv("SYMBOLIC_ENGINE", "compiled")
+# Share of compiled-path requests re-scored by real MeTTa to check for drift
+PARITY_SAMPLE_RATE = float(os.getenv("METTA_PARITY_SAMPLE_RATE", "0.05"))
+# Warm MeTTa worker processes (0 = score on a thread in this process instead)
+METTA_WORKERS = int(os.getenv("METTA_WORKERS", str(os.cpu_count() or 2)))
+METTA_MAX_INFLIGHT = int(os.getenv("METTA_MAX_INFLIGHT", str(max(1, METTA_WORKERS) * 2)))
+METTA_TIMEOUT_S = float(os.getenv("METTA_TIMEOUT_S", "30"))
+FEATURE_CACHE_SIZE = int(os.getenv("EVAL_FEATURE_CACHE_SIZE", "50000"))
+# MeTTa path with top_k: only score laptops whose upper bound can reach the top-K
+PRUNE_ENABLED = os.getenv("EVAL_PRUNE", "1") == "1"
+PRUNE_BATCH = int(os.getenv("EVAL_PRUNE_BATCH", "16"))
+# Score components are retained here for what-if re-ranking ("" disables)
+EVAL_STORE_URL = os.getenv("EVAL_STORE_URL", "http://127.0.0.1:9000/api/evaluations")
+# Fan-out: how long one half of a request waits for the other before falling back
+JOIN_TIMEOUT_S = float(os.getenv("EVAL_JOIN_TIMEOUT_S", "10"))
+# Range of Compute's blended score, bounding MeTTa pruning before Compute is in
+COMPUTE_RANGE = (float(os.getenv("EVAL_COMPUTE_MIN", "0")), float(os.getenv("EVAL_COMPUTE_MAX", "1")))
+# Streamed requests: running rankings not completed within this long are dropped
+STREAM_TTL_S = float(os.getenv("EVAL_STREAM_TTL_S", "300"))
 
 
 # ------------------------------------------------------------------------------
-# ✅ Agent setup (dynamic endpoint + optional stable wallet)
+# ✅ Protocol (the Agent itself is only built when run standalone, see bottom)
 # ------------------------------------------------------------------------------
-evaluator = Agent(
-    name="evaluator_agent",
-    port=PORT,
-    endpoint=f"{PUBLIC_URL}/submit",
-    mailbox=True,
-    seed=AGENT_MNEMONIC,
-)
 proto = Protocol(name="evaluator_protocol")
 
 
@@ -54,13 +81,33 @@ async def notify(req_id: str, message: str, done: bool = False, error: bool = Fa
 # ------------------------------------------------------------------------------
 # ✅ Optional MeTTa support
 # ------------------------------------------------------------------------------
-try:
-    from hyperon import MeTTa
-    HAS_METTA = True
+if HAS_METTA:
     print("✅ [Evaluator] MeTTa (Hyperon) available")
-except Exception as e:
-    HAS_METTA = False
-    print(f"⚠️  [Evaluator] MeTTa unavailable: {e}")
+else:
+    print("⚠️  [Evaluator] MeTTa unavailable: hyperon not installed")
+
+METTA_POOL: Optional[MettaPool] = (
+    MettaPool(METTA_WORKERS, METTA_MAX_INFLIGHT, METTA_TIMEOUT_S) if HAS_METTA and METTA_WORKERS > 0 else None
+)
+
+
+async def run_metta(laptops: List[LaptopOption], max_budget: float, prefer_performance: bool) -> Dict[str, float]:
+    """kb.metta scores off the event loop: warm worker pool, or a thread with the shared KB."""
+    if METTA_POOL is not None:
+        return await METTA_POOL.score(laptops, max_budget, prefer_performance)
+    loop = asyncio.get_running_loop()
+    res = await asyncio.wait_for(
+        loop.run_in_executor(None, shared_kb().score, laptops, max_budget, prefer_performance),
+        METTA_TIMEOUT_S,
+    )
+    return parse_scores(res)
+
+
+def metta_pool_summary() -> str:
+    if METTA_POOL is None:
+        return "in-process"
+    st = METTA_POOL.stats()
+    return f"queue={st['queued']} in_flight={st['in_flight']}/{st['max_inflight']} workers={st['workers']}"
 
 
 # ------------------------------------------------------------------------------
@@ -83,9 +130,10 @@ COMPUTE_WEIGHTS = {
 # ✅ Fallback symbolic helpers
 # ------------------------------------------------------------------------------
 def py_perf_score(specs) -> float:
-    cpu_score = 0.85 if ("i7" in specs.processor or "Ryzen 7" in specs.processor) else 0.65
+    # Parsed taxonomy (shared with backend scoring), not per-call substring checks
+    cpu_score = 0.85 if processor_info(specs.processor).high_tier else 0.65
     ram_score = specs.ram_gb / 64.0
-    gpu_score = 0.75 if "RTX" in specs.gpu else 0.30
+    gpu_score = 0.75 if gpu_info(specs.gpu).family == "rtx" else 0.30
     return (0.4 * cpu_score) + (0.3 * ram_score) + (0.3 * gpu_score)
 
 
@@ -107,12 +155,30 @@ def compute_blend(proc: float, warr: float, ship: float) -> float:
     )
 
 
+def perf_scores(processors, ram_gb, gpus):
+    """`py_perf_score` over parallel processor / RAM / GPU columns."""
+    cpu_score = np.where([processor_info(p).high_tier for p in processors], 0.85, 0.65)
+    ram_score = np.asarray(ram_gb, dtype=float) / 64.0
+    gpu_score = np.where([gpu_info(g).family == "rtx" for g in gpus], 0.75, 0.30)
+    return (0.4 * cpu_score) + (0.3 * ram_score) + (0.3 * gpu_score)
+
+
+def review_signals(ratings, counts):
+    """`py_review_signal` over rating / review-count columns."""
+    counts = np.asarray(counts, dtype=float)
+    return (np.asarray(ratings, dtype=float) / 5.0) * np.where(counts >= 500, 1.0, np.maximum(0.0, counts / 500.0))
+
+
 def fallback_symbolic(l: LaptopOption) -> float:
     perf = py_perf_score(l.specs)
     rev  = py_review_signal(l.rating, l.review_count)
     return 0.7 * perf + 0.3 * rev
 
 
+# Request-independent per-SKU features (perf, review signal, compute blend)
+FEATURES = FeatureCache(perf_scores, review_signals, compute_blend, capacity=FEATURE_CACHE_SIZE)
+
+
 # ------------------------------------------------------------------------------
 # ✅ Helper utilities
 # ------------------------------------------------------------------------------
@@ -129,34 +195,44 @@ def build_compute_lookup(scored: Optional[List[ScoredLaptopOption]]) -> Dict[str
     }
 
 
-def parse_metta_scores(metta_result, laptops_by_id: Dict[str, LaptopOption]) -> Dict[str, float]:
-    scores: Dict[str, float] = {}
-    if not metta_result:
-        return scores
+def compute_lookup(msg: LaptopEvaluationRequest) -> Dict[str, Dict[str, float]]:
+    """Compute's scores from either form of a request (full ScoredLaptopOptions or compact columns)."""
+    if msg.scored_laptops:
+        return build_compute_lookup(msg.scored_laptops)
+    if msg.laptop_ids is None or msg.processor_scores is None:
+        return {}
+    return {
+        laptop_id: {"processor": float(p), "warranty": float(w), "shipping": float(s)}
+        for laptop_id, p, w, s in zip(msg.laptop_ids, msg.processor_scores, msg.warranty_scores, msg.shipping_scores)
+    }
+
+
+def compute_column(laptops: List[LaptopOption], compute_map: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """Blended compute score per laptop (same float ops as `compute_blend`)."""
+    cols = np.array([
+        (cs["processor"], cs["warranty"], cs["shipping"]) if cs else DEFAULT_COMPUTE
+        for cs in (compute_map.get(l.id) for l in laptops)
+    ], dtype=float).reshape(len(laptops), 3)
+    return compute_blend(cols[:, 0], cols[:, 1], cols[:, 2])
 
-    seq = metta_result[0] if isinstance(metta_result, list) and len(metta_result) == 1 else metta_result
 
-    def maybe_float(x):
-        try:
-            return float(str(x))
-        except Exception:
-            return None
+def parse_metta_scores(metta_scores: Dict[str, float], laptops_by_id: Dict[str, LaptopOption]) -> Dict[str, float]:
+    return {lid: sc for lid, sc in metta_scores.items() if lid in laptops_by_id}
 
-    items = seq if isinstance(seq, list) else [seq]
 
-    for item in items:
-        stack = [item]
-        while stack:
-            node = stack.pop()
-            if hasattr(node, "get_children"):
-                children = node.get_children()
-                if children and len(children) >= 3 and str(children[0]) == "scored":
-                    lid = str(children[1])
-                    sc = maybe_float(children[2])
-                    if lid in laptops_by_id and sc is not None:
-                        scores[lid] = sc
-                stack.extend(children)
-    return scores
+def score_distribution(scores: List[float]) -> Dict[str, float]:
+    if not scores:
+        return {}
+    ordered = sorted(scores)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.pstdev(ordered),
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+    }
 
 
 def format_top3_summary(ranked: List[ScoredLaptop]) -> str:
@@ -170,78 +246,304 @@ def format_top3_summary(ranked: List[ScoredLaptop]) -> str:
 
 
 # ------------------------------------------------------------------------------
-# ✅ Main evaluation handler (unchanged logic)
+# ✅ Compiled-vs-MeTTa parity sampling
 # ------------------------------------------------------------------------------
+PARITY = ParityStats()
+
+
+async def check_parity(msg: LaptopEvaluationRequest, laptops: List[LaptopOption], by_id, compiled: Dict[str, float]):
+    """Re-score a sampled request with real MeTTa (on the worker pool) and report drift."""
+    try:
+        res = await run_metta(laptops, msg.max_budget, msg.prefer_performance)
+        report = compare_scores(compiled, parse_metta_scores(res, by_id))
+    except Exception as e:
+        print(f"⚠️ [Evaluator] Parity check failed: {e}")
+        return
+    PARITY.record(report)
+    if report["ok"]:
+        print(f"🔁 [Evaluator] Parity ok for {msg.request_id} ({report['checked']} laptops; {PARITY.summary()})")
+        return
+    print(f"❗ [Evaluator] Compiled KB drift on {msg.request_id}: {report} ({PARITY.summary()})")
+    await notify(
+        msg.request_id,
+        f"❗ Compiled KB drifted from MeTTa on {len(report['drifted']) + len(report['missing'])} laptops "
+        f"(max {report['max_drift']:.3g})",
+    )
+
+
+# ------------------------------------------------------------------------------
+# ✅ Upper-bound pruning (MeTTa only scores laptops that can still make the top-K)
+# ------------------------------------------------------------------------------
+async def metta_contenders(msg: LaptopEvaluationRequest, laptops: List[LaptopOption], by_id,
+                           fallback, compute, value, compute_hi=None, known: Optional[Dict[str, float]] = None):
+    """
+    MeTTa scores for the top-K contenders only. A laptop's symbolic bound is
+    derived term by term from kb.metta's rules (`score_upper_bounds`; only
+    called when the kb still has those rules); exact finals come from MeTTa
+    in descending-bound order. A laptop MeTTa omits falls back to the
+    fallback score, and if that breaks its bound every remaining laptop is scored.
+
+    Before Compute's scores are in, `compute` / `compute_hi` are a lower and
+    an upper bound on them (finals are then lower bounds, which prunes less
+    but never wrongly). Laptops already in `known` are not sent to MeTTa again.
+    """
+    symbolic_ub = score_upper_bounds(
+        [l.specs.ram_gb for l in laptops], [l.price for l in laptops], [l.rating for l in laptops],
+        msg.max_budget, msg.prefer_performance,
+    )
+    hi = compute if compute_hi is None else compute_hi
+    upper = WEIGHTS["symbolic"] * symbolic_ub + WEIGHTS["compute"] * hi + WEIGHTS["value"] * value
+    scored: Dict[str, float] = dict(known or {})
+    reused = 0
+
+    async def score_rows(rows: List[int]) -> List[float]:
+        nonlocal reused
+        todo = [laptops[k] for k in rows if laptops[k].id not in scored]
+        reused += len(rows) - len(todo)
+        if todo:
+            scored.update(parse_metta_scores(await run_metta(todo, msg.max_budget, msg.prefer_performance), by_id))
+        sym = np.array([scored.get(laptops[k].id, fallback[k]) for k in rows])
+        return (WEIGHTS["symbolic"] * sym + WEIGHTS["compute"] * compute[rows] + WEIGHTS["value"] * value[rows]).tolist()
+
+    _, stats = await bounded_top_k(upper, msg.top_k, score_rows, PRUNE_BATCH)
+    stats["reused"] = reused
+    return scored, stats
+
+
+# ------------------------------------------------------------------------------
+# ✅ Retain score components for what-if re-ranking (fire-and-forget)
+# ------------------------------------------------------------------------------
+def retained_candidates(laptops: List[LaptopOption], compute_map, perf, review, symbolic, engines) -> List[dict]:
+    candidates = []
+    for k, l in enumerate(laptops):
+        cs = compute_map.get(l.id)
+        proc, warr, ship = (cs["processor"], cs["warranty"], cs["shipping"]) if cs else DEFAULT_COMPUTE
+        candidates.append({
+            "id": l.id, "model": l.model,
+            "processor": l.specs.processor, "ram_gb": l.specs.ram_gb, "gpu": l.specs.gpu,
+            "price": l.price, "rating": l.rating, "review_count": l.review_count,
+            "perf": float(perf[k]), "review": float(review[k]), "symbolic": float(symbolic[k]),
+            "processor_score": proc, "warranty_score": warr, "shipping_score": ship,
+            "engine": engines[k],
+        })
+    return candidates
+
+
+async def retain_evaluation(msg: LaptopEvaluationRequest, candidates: List[dict]):
+    try:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            await client.post(EVAL_STORE_URL, json={
+                "request_id": msg.request_id,
+                "max_budget": msg.max_budget,
+                "prefer_performance": msg.prefer_performance,
+                "weights": WEIGHTS,
+                "compute_weights": COMPUTE_WEIGHTS,
+                "skyband_k": msg.skyband_k,
+                "candidates": candidates,
+            })
+    except Exception as e:
+        print(f"[Evaluator Retain Error] {e}")
+
+
+# ------------------------------------------------------------------------------
+# ✅ Symbolic phase (compiled kb rules, else MeTTa with bound pruning)
+# ------------------------------------------------------------------------------
+async def symbolic_phase(msg: LaptopEvaluationRequest, base_laptops: List[LaptopOption], by_id,
+                         fallback, compute, value, compute_hi=None):
+    """(symbolic scores by id, compiled-kb estimates, engine, pruning stats or None)."""
+    symbolic_scores: Dict[str, float] = {}
+    estimates: Dict[str, float] = {}  # compiled kb scores: the result, or stand-ins for pruned laptops
+    bounded = False  # the kb's rules are the ones score_upper_bounds was derived from
+    engine = "fallback"
+    prune_stats = None
+
+    if SYMBOLIC_ENGINE == "compiled" or (PRUNE_ENABLED and msg.top_k is not None):
+        try:
+            kb = compiled_kb()
+            estimates = kb.score(base_laptops, msg.max_budget, msg.prefer_performance)
+            bounded = kb.bounded
+        except (KBCompileError, OSError) as e:
+            fallback_note = "falling back to MeTTa" if SYMBOLIC_ENGINE == "compiled" else "bound pruning disabled"
+            await notify(msg.request_id, f"⚠️ Compiled KB unavailable ({e}), {fallback_note}")
+        if estimates and not bounded and SYMBOLIC_ENGINE != "compiled":
+            await notify(msg.request_id, "⚠️ kb.metta scoring rules changed since the pruning bounds were derived, bound pruning disabled")
+    if SYMBOLIC_ENGINE == "compiled" and estimates:
+        symbolic_scores = estimates
+        engine = "compiled"
+        await notify(msg.request_id, f"⚡ Compiled kb.metta rules scored {len(symbolic_scores)} laptops")
+
+    if engine == "fallback" and HAS_METTA:
+        try:
+            await notify(msg.request_id, f"⚙️ Running MeTTa symbolic engine (pre-loaded KB, {metta_pool_summary()})...")
+            # the bounds divide by the budget, so a non-positive one gets no pruning
+            if (bounded and estimates and msg.max_budget > 0
+                    and msg.top_k is not None and msg.top_k < len(base_laptops)):
+                symbolic_scores, prune_stats = await metta_contenders(
+                    msg, base_laptops, by_id, fallback, compute, value, compute_hi
+                )
+                await notify(
+                    msg.request_id,
+                    f"✂️ Bound pruning: MeTTa scored {prune_stats['scored']}/{prune_stats['candidates']} "
+                    f"contenders in {prune_stats['rounds']} round(s), pruned {prune_stats['pruned']}"
+                    + (f", {prune_stats['bound_violations']} bound violation(s)" if prune_stats["bound_violations"] else ""),
+                )
+            else:
+                # Request atoms are added in one batch and removed after the query
+                res = await run_metta(base_laptops, msg.max_budget, msg.prefer_performance)
+                symbolic_scores = parse_metta_scores(res, by_id)
+            engine = "metta" if symbolic_scores else "fallback"
+            await notify(msg.request_id, f"✅ MeTTa symbolic phase complete (used={bool(symbolic_scores)})")
+
+        except Exception as e:
+            await notify(msg.request_id, f"⚠️ MeTTa unavailable or errored ({e}), using fallback symbolic scoring")
+    elif engine == "fallback":
+        await notify(msg.request_id, "⚠️ MeTTa disabled or not installed - fallback symbolic scoring active")
+
+    if engine == "compiled" and HAS_METTA and random.random() < PARITY_SAMPLE_RATE:
+        asyncio.create_task(check_parity(msg, base_laptops, by_id, symbolic_scores))
+    return symbolic_scores, estimates, engine, prune_stats
+
+
+# ------------------------------------------------------------------------------
+# ✅ Main evaluation handler (fan-out halves are joined here by request_id)
+# ------------------------------------------------------------------------------
+JOINS = HalfJoin()
+RANKINGS = RankStreams(ttl_s=STREAM_TTL_S)
+
+
+def join_key(msg: LaptopEvaluationRequest) -> str:
+    """Fan-out halves pair up per request, and per chunk when streamed."""
+    return msg.request_id if msg.chunk_index is None else f"{msg.request_id}#{msg.chunk_index}"
+
+
+async def request_laptops(ctx: Context, sender: str, msg: LaptopEvaluationRequest) -> Optional[List[LaptopOption]]:
+    """Candidate rows of a request (resolved by id when compact); None once it has been rejected."""
+    if msg.scored_laptops:
+        return [s.base for s in msg.scored_laptops]
+    if msg.laptop_ids is not None and not msg.laptops:
+        laptops = await resolver().laptops(msg.catalog_version, msg.laptop_ids)
+        if laptops is None:
+            print(f"⚠️ [Evaluator] Cannot resolve catalog {msg.catalog_version} for {msg.request_id}; asking for full payload")
+            await ctx.send(sender, PayloadRejected(
+                request_id=msg.request_id, stage="evaluator", phase=msg.phase, chunk_index=msg.chunk_index,
+                reason=f"catalog {msg.catalog_version} unavailable",
+            ))
+            return None
+        return with_dominance(laptops, msg.dominance_counts)
+    return msg.laptops or []
+
+
 @proto.on_message(LaptopEvaluationRequest)
 async def handle_eval(ctx: Context, sender: str, msg: LaptopEvaluationRequest):
-    if msg.scored_laptops:
-        base_laptops: List[LaptopOption] = [s.base for s in msg.scored_laptops]
-        compute_map = build_compute_lookup(msg.scored_laptops)
-    else:
-        base_laptops = msg.laptops or []
-        compute_map = {}
+    if msg.phase == "compute":
+        outcome = await JOINS.offer(join_key(msg), msg, JOIN_TIMEOUT_S)
+        if outcome == "alone":
+            await notify(
+                msg.request_id,
+                f"⏱️ Symbolic half not in after {JOIN_TIMEOUT_S:.0f}s — evaluating Compute's scores on their own",
+            )
+            await evaluate(ctx, sender, msg)
+        elif outcome == "late":
+            print(f"↩️  [Evaluator] Late compute half for {msg.request_id} — ignored")
+        return
+    if msg.phase == "symbolic" and not JOINS.open(join_key(msg)):
+        print(f"↩️  [Evaluator] Late symbolic half for {msg.request_id} — already answered")
+        return
+    await evaluate(ctx, sender, msg)
 
-    print(f"\n📊 [Evaluator] Received request {msg.request_id}")
+
+async def evaluate(ctx: Context, sender: str, msg: LaptopEvaluationRequest):
+    compact = msg.laptop_ids is not None and not msg.laptops and not msg.scored_laptops
+    base_laptops = await request_laptops(ctx, sender, msg)
+    if base_laptops is None:
+        return
+    fanout = msg.phase == "symbolic"  # Compute's scores arrive later, as the "compute" half
+    compute_map = {} if fanout else compute_lookup(msg)
+
+    print(f"\n📊 [Evaluator] Received request {msg.request_id}" + (" (symbolic half)" if fanout else ""))
     await notify(msg.request_id, "🧠 Evaluator received laptops, preparing for scoring...")
 
     if not base_laptops:
+        if fanout:
+            JOINS.close(join_key(msg))
+        if msg.chunk_index is not None:
+            await stream_chunk(ctx, sender, msg, compact, [], [], [])
+            return
         await notify(msg.request_id, "⚠️ No laptops provided to Evaluator. Returning empty ranking.", error=True)
-        await ctx.send(sender, LaptopEvaluationResult(request_id=msg.request_id, ranked=[]))
+        await ctx.send(sender, LaptopEvaluationResult(request_id=msg.request_id, ranked=[], total_candidates=0))
         await notify(msg.request_id, "✅ Evaluation result delivered.", done=True)
         return
 
     ranked: List[ScoredLaptop] = []
     by_id = {l.id: l for l in base_laptops}
 
-    # ---------- MeTTa symbolic scoring ----------
-    metta_scores: Dict[str, float] = {}
-    metta_used = False
-
-    if HAS_METTA:
-        try:
-            await notify(msg.request_id, "⚙️ Initializing MeTTa symbolic engine...")
-            m = MeTTa()
-
-            kb_path = os.path.join("knowledge", "kb.metta")
-            if os.path.exists(kb_path):
-                with open(kb_path, "r") as f:
-                    m.run(f.read())
-
-            for l in base_laptops:
-                atom = (
-                    f'(laptop {l.id} '
-                    f'"{l.specs.processor}" {l.specs.ram_gb} "{l.specs.gpu}" '
-                    f'{l.price} {l.rating} {l.review_count})'
-                )
-                m.run(f'!(add-atom &self {atom})')
-
-            m.run(f'!(add-atom &self (pref budget {msg.max_budget}))')
-            m.run(f'!(add-atom &self (pref prefer_performance {"True" if msg.prefer_performance else "False"}))')
-
-            res = m.run('!(get-laptop-scores)')
-            metta_scores = parse_metta_scores(res, by_id)
-            metta_used = bool(metta_scores)
-            await notify(msg.request_id, f"✅ MeTTa symbolic phase complete (used={metta_used})")
+    # Cached per-SKU features + one vectorized value term; ScoredLaptop and
+    # rationale are only built for the survivors
+    features = FEATURES if len(base_laptops) <= FEATURES.capacity else FeatureCache(
+        perf_scores, review_signals, compute_blend, capacity=len(base_laptops)
+    )
+    perf, review, compute = features.gather(base_laptops, compute_map)
+    value = value_scores([l.price for l in base_laptops], msg.max_budget)
+    fallback = 0.7 * perf + 0.3 * review
+
+    # ---------- Symbolic scoring (concurrently with Compute when fanned out) ----------
+    compute_hi = None
+    if fanout:
+        compute = np.full(len(base_laptops), COMPUTE_RANGE[0])
+        compute_hi = np.full(len(base_laptops), COMPUTE_RANGE[1])
+    symbolic_scores, estimates, engine, prune_stats = await symbolic_phase(
+        msg, base_laptops, by_id, fallback, compute, value, compute_hi
+    )
 
-        except Exception as e:
-            await notify(msg.request_id, "⚠️ MeTTa unavailable or errored, using fallback symbolic scoring")
-    else:
-        await notify(msg.request_id, "⚠️ MeTTa disabled or not installed - fallback symbolic scoring active")
+    # ---------- Join Compute's half ----------
+    if fanout:
+        half = await JOINS.claim(join_key(msg), JOIN_TIMEOUT_S)
+        if half is None:
+            await notify(
+                msg.request_id,
+                f"⏱️ Compute scores not in {JOIN_TIMEOUT_S:.0f}s after the symbolic phase — using default compute scores",
+            )
+        else:
+            compute_map = compute_lookup(half)
+            await notify(msg.request_id, f"🔗 Joined Compute scores for {len(compute_map)} laptops with the symbolic phase")
+        compute = compute_column(base_laptops, compute_map)
+        if prune_stats is not None:
+            # Contenders were picked against a compute range; settle them with the real scores
+            symbolic_scores, prune_stats = await metta_contenders(
+                msg, base_laptops, by_id, fallback, compute, value, known=symbolic_scores
+            )
+            await notify(
+                msg.request_id,
+                f"✂️ Re-checked contenders with Compute's scores: {prune_stats['scored']} in the top-K race "
+                f"({prune_stats['reused']} already scored by MeTTa)",
+            )
 
     # ---------- Hybrid aggregation ----------
     await notify(msg.request_id, "📦 Blending symbolic + compute + value into hybrid scores...")
 
-    for l in base_laptops:
-        symbolic_score = metta_scores.get(l.id, fallback_symbolic(l))
-        cs = compute_map.get(l.id, {"processor": 0.5, "warranty": 0.5, "shipping": 0.5})
-        compute_component = compute_blend(cs["processor"], cs["warranty"], cs["shipping"])
-        value_component = py_price_value(l.price, msg.max_budget)
-        final_score = (
-            WEIGHTS["symbolic"] * symbolic_score
-            + WEIGHTS["compute"] * compute_component
-            + WEIGHTS["value"] * value_component
-        )
+    symbolic = fallback.copy()
+    engines = ["fallback"] * len(base_laptops)
+    for k, l in enumerate(base_laptops):
+        if l.id in symbolic_scores:
+            symbolic[k] = symbolic_scores[l.id]
+            engines[k] = engine
+        elif engine == "metta" and l.id in estimates:
+            # pruned: its bound already ruled it out of the top-K
+            symbolic[k] = estimates[l.id]
+            engines[k] = "compiled"
+    final = WEIGHTS["symbolic"] * symbolic + WEIGHTS["compute"] * compute + WEIGHTS["value"] * value
+    scores = final.tolist()
+
+    if msg.top_k is not None and msg.top_k < len(scores):
+        order = heapq.nlargest(max(0, msg.top_k), range(len(scores)), key=scores.__getitem__)  # stable, like sort
+    else:
+        order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+    survivors = [
+        (scores[k], base_laptops[k], float(symbolic[k]), float(compute[k]), float(value[k]), engines[k])
+        for k in order
+    ]
 
+    for final_score, l, symbolic_score, compute_component, value_component, scored_by in survivors:
         ranked.append(
             ScoredLaptop(
                 laptop=l,
@@ -249,34 +551,136 @@ async def handle_eval(ctx: Context, sender: str, msg: LaptopEvaluationRequest):
                 symbolic_score=float(symbolic_score),
                 compute_score=float(compute_component),
                 value_score=float(value_component),
-                metta_used=metta_used,
-                rationale=(
-                    f"hybrid: symbolic={symbolic_score:.3f}, "
-                    f"compute={compute_component:.3f}, "
-                    f"value={value_component:.3f}"
-                    f"{' (metta)' if metta_used else ''}"
-                ),
+                metta_used=scored_by == "metta",
+                score_engine=scored_by,
+                rationale=hybrid_rationale(symbolic_score, compute_component, value_component, scored_by),
             )
         )
 
-    ranked.sort(key=lambda x: x.score, reverse=True)
+    if msg.chunk_index is not None:
+        retained = retained_candidates(base_laptops, compute_map, perf, review, symbolic, engines) if EVAL_STORE_URL else []
+        await stream_chunk(ctx, sender, msg, compact, list(zip(order, ranked)), scores, retained)
+        return
+    await deliver_ranking(ctx, sender, msg, compact, ranked, scores)
+    if EVAL_STORE_URL:
+        asyncio.create_task(retain_evaluation(
+            msg, retained_candidates(base_laptops, compute_map, perf, review, symbolic, engines)
+        ))
+    await notify(msg.request_id, "✅ Evaluation result delivered.")
+
+
+def evaluation_result(msg: LaptopEvaluationRequest, compact: bool, ranked: List[ScoredLaptop], **fields) -> LaptopEvaluationResult:
+    if compact:
+        return LaptopEvaluationResult(request_id=msg.request_id, **ranked_columns(ranked), **fields)
+    return LaptopEvaluationResult(request_id=msg.request_id, ranked=ranked, **fields)
+
+
+async def deliver_ranking(ctx: Context, sender: str, msg: LaptopEvaluationRequest, compact: bool,
+                          ranked: List[ScoredLaptop], scores: List[float], **fields):
+    score_stats = score_distribution(scores)
 
     # ---------- Top-3 summary ----------
     await notify(msg.request_id, f"📊 {format_top3_summary(ranked)}")
 
     # ---------- Send final result ----------
-    await notify(msg.request_id, f"✅ Hybrid evaluation complete for {len(ranked)} laptops. Sending results...")
-    await ctx.send(sender, LaptopEvaluationResult(request_id=msg.request_id, ranked=ranked))
-    await notify(msg.request_id, "✅ Evaluation result delivered.")
+    await notify(
+        msg.request_id,
+        f"✅ Hybrid evaluation complete for {len(scores)} laptops "
+        f"(returning top {len(ranked)}, scores {score_stats['min']:.3f}–{score_stats['max']:.3f}). Sending results...",
+    )
+    await ctx.send(sender, evaluation_result(
+        msg, compact, ranked, total_candidates=len(scores), score_stats=score_stats, **fields
+    ))
 
 
 # ------------------------------------------------------------------------------
-# ✅ Bootstrap
+# ✅ Streamed requests (running top-K across chunks)
 # ------------------------------------------------------------------------------
-fund_agent_if_low(evaluator.wallet.address())
-evaluator.include(proto, publish_manifest=True)
+async def stream_chunk(ctx: Context, sender: str, msg: LaptopEvaluationRequest, compact: bool,
+                       ranked: List[tuple], scores: List[float], retained: List[dict]):
+    """Fold one chunk's (position, ScoredLaptop) top-K into its request's ranking; answer once all chunks are in."""
+    stream = RANKINGS.get(msg.request_id, msg.top_k)
+    total_chunks = msg.total_chunks if msg.final else None
+    if not stream.add(msg.chunk_index, [(k, r.score, r) for k, r in ranked], scores, total_chunks):
+        print(f"↩️  [Evaluator] Chunk {msg.chunk_index} of {msg.request_id} already ranked — ignored")
+        return
+    stream.retained.extend(retained)
+    top = stream.ranked()
+
+    if not stream.complete:
+        await notify(
+            msg.request_id,
+            f"🧩 Chunk {msg.chunk_index} ranked ({len(scores)} laptops) — provisional top {len(top)} "
+            f"over {len(stream.scores)} so far",
+        )
+        await ctx.send(sender, evaluation_result(
+            msg, compact, top, total_candidates=len(stream.scores), final=False, chunks_done=len(stream.chunks),
+        ))
+        return
+
+    RANKINGS.close(msg.request_id)
+    if not stream.scores:
+        await notify(msg.request_id, "⚠️ No laptops provided to Evaluator. Returning empty ranking.", error=True)
+        await ctx.send(sender, LaptopEvaluationResult(
+            request_id=msg.request_id, ranked=[], total_candidates=0, chunks_done=len(stream.chunks),
+        ))
+        await notify(msg.request_id, "✅ Evaluation result delivered.", done=True)
+        return
+    await deliver_ranking(ctx, sender, msg, compact, top, stream.scores, chunks_done=len(stream.chunks))
+    if EVAL_STORE_URL:
+        asyncio.create_task(retain_evaluation(msg, stream.retained))
+    await notify(msg.request_id, f"✅ Evaluation result delivered ({len(stream.chunks)} chunks).")
+
+
+# ------------------------------------------------------------------------------
+# ✅ KB warm-up (parse kb.metta once per worker, before the first request)
+# ------------------------------------------------------------------------------
+async def warm_kb(ctx: Context):
+    if not HAS_METTA:
+        return
+    try:
+        if METTA_POOL is not None:
+            workers = await METTA_POOL.warm()
+            ctx.logger.info(f"MeTTa worker pool ready: {workers} processes with kb.metta loaded")
+        else:
+            kb = shared_kb()
+            ctx.logger.info(f"MeTTa KB loaded from {kb.kb_path}")
+    except Exception as e:
+        ctx.logger.warning(f"MeTTa KB warm-up failed: {e}")
+
+
+async def log_metta_pool(ctx: Context):
+    if METTA_POOL is not None and (METTA_POOL.completed or METTA_POOL.queued):
+        ctx.logger.info(f"MeTTa pool: {METTA_POOL.stats()}")
+
+
+async def stop_metta_pool(ctx: Context):
+    if METTA_POOL is not None:
+        METTA_POOL.shutdown()
+
+
+# ------------------------------------------------------------------------------
+# ✅ Bootstrap (dynamic endpoint + optional stable wallet; fused mode calls the
+# handlers above without an Agent)
+# ------------------------------------------------------------------------------
+def build_agent() -> Agent:
+    agent = Agent(
+        name="evaluator_agent",
+        port=PORT,
+        endpoint=f"{PUBLIC_URL}/submit",
+        mailbox=True,
+        seed=AGENT_MNEMONIC,
+    )
+    agent.on_event("startup")(warm_kb)
+    agent.on_interval(period=60.0)(log_metta_pool)
+    agent.on_event("shutdown")(stop_metta_pool)
+    agent.include(proto, publish_manifest=True)
+    return agent
+
 
 if __name__ == "__main__":
+    evaluator = build_agent()
+    fund_agent_if_low(evaluator.wallet.address())
     print("\n📊 Starting Laptop Evaluator Agent (HYBRID MODE, Scout-style SSE)...")
     print(f"PORT: {PORT}")
     print(f"PUBLIC_URL: {PUBLIC_URL}")
@@ -0,0 +1,94 @@
+# agents/join.py — Pairs the two halves of a fanned-out evaluation by request_id
+#
+# The orchestrator sends Scout's candidates to Compute and to the Evaluator's
+# symbolic phase at the same time, then forwards Compute's scores to the same
+# Evaluator. Whichever half arrives first waits (bounded) for the other. Each
+# request is settled exactly once: a half that shows up after its partner gave
+# up is dropped as late.
+
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class _Slot:
+    __slots__ = ("opened", "half")
+
+    def __init__(self):
+        self.opened = asyncio.Event()  # the symbolic half has arrived
+        self.half: asyncio.Future = asyncio.get_running_loop().create_future()  # the compute half
+
+
+class HalfJoin:
+    """
+    `open` + `claim` on the symbolic side, `offer` on the compute side.
+    Outcomes are kept for the last `remember` requests (see `stats`).
+    """
+
+    def __init__(self, remember: int = 10_000):
+        self._slots: Dict[str, _Slot] = {}
+        self._settled: "OrderedDict[str, str]" = OrderedDict()
+        self._remember = remember
+        self.outcomes = {"joined": 0, "compute_late": 0, "symbolic_late": 0, "closed": 0, "dropped": 0}
+
+    def _settle(self, request_id: str, outcome: str) -> None:
+        self._slots.pop(request_id, None)
+        self._settled[request_id] = outcome
+        while len(self._settled) > self._remember:
+            self._settled.popitem(last=False)
+        self.outcomes[outcome] += 1
+
+    def _slot(self, request_id: str) -> _Slot:
+        slot = self._slots.get(request_id)
+        if slot is None:
+            slot = self._slots[request_id] = _Slot()
+        return slot
+
+    def open(self, request_id: str) -> bool:
+        """Symbolic half arrived; False if the request was already answered without it."""
+        if request_id in self._settled:
+            self.outcomes["dropped"] += 1
+            return False
+        self._slot(request_id).opened.set()
+        return True
+
+    def close(self, request_id: str) -> None:
+        """The symbolic half answered without Compute's scores (e.g. no candidates)."""
+        self._settle(request_id, "closed")
+
+    async def claim(self, request_id: str, timeout_s: float):
+        """The compute half for an opened request, or None if it is not in within `timeout_s`."""
+        slot = self._slot(request_id)
+        try:
+            half = await asyncio.wait_for(asyncio.shield(slot.half), timeout_s)
+        except asyncio.TimeoutError:
+            self._settle(request_id, "compute_late")
+            return None
+        self._settle(request_id, "joined")
+        return half
+
+    async def offer(self, request_id: str, half, timeout_s: float) -> str:
+        """
+        Hand over the compute half: "joined" once a symbolic half has it,
+        "alone" if none arrived within `timeout_s` (the caller then evaluates
+        this half on its own), "late" if the request was already settled.
+        """
+        if request_id in self._settled:
+            self.outcomes["dropped"] += 1
+            return "late"
+        slot = self._slot(request_id)
+        if slot.half.done():
+            return "late"  # duplicate compute half
+        slot.half.set_result(half)
+        try:
+            await asyncio.wait_for(slot.opened.wait(), timeout_s)
+        except asyncio.TimeoutError:
+            self._settle(request_id, "symbolic_late")
+            return "alone"
+        return "joined"
+
+    def pending(self) -> int:
+        return len(self._slots)
+
+    def stats(self) -> dict:
+        return {"pending": len(self._slots), **self.outcomes}
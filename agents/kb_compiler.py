@@ -0,0 +1,395 @@
+# agents/kb_compiler.py — Compile kb.metta's arithmetic scoring rules to NumPy
+#
+# The scoring rules in knowledge/kb.metta are plain arithmetic over a laptop's
+# fields and the request prefs. This module parses the file, turns every
+# arithmetic `(= (f $args...) body)` rule into a vectorized function, and
+# translates `get-laptop-scores` (collapse / match over laptop + pref atoms)
+# into a column binding, so a whole candidate list is scored in one pass.
+#
+# Semantics follow Hyperon's number handling: `/` on two integers truncates
+# toward zero, any float operand makes the result float. Rules the compiler
+# does not understand raise `KBCompileError`; callers then use real MeTTa.
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from agents.metta_engine import KB_PATH
+
+# Positional layout of the `(laptop ...)` atom written by metta_engine.laptop_atom
+LAPTOP_FIELDS = ("id", "processor", "ram_gb", "gpu", "price", "rating", "review_count")
+
+
+class KBCompileError(Exception):
+    pass
+
+
+# ------------------------------------------------------------------------------
+# ✅ S-expression reader
+# ------------------------------------------------------------------------------
+_TOKEN = re.compile(r'\s*(?:(;[^\n]*)|(\()|(\))|("(?:[^"\\]|\\.)*")|([^\s()";]+))')
+
+
+class Sym(str):
+    """A MeTTa symbol or $variable (strings and numbers stay Python values)."""
+
+
+def parse_sexprs(text: str) -> List:
+    stack: List[list] = [[]]
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            if text[pos:].strip():
+                raise KBCompileError(f"unexpected input at offset {pos}")
+            break
+        pos = m.end()
+        comment, lpar, rpar, string, atom = m.groups()
+        if comment:
+            continue
+        if lpar:
+            stack.append([])
+        elif rpar:
+            if len(stack) == 1:
+                raise KBCompileError("unbalanced ')'")
+            done = stack.pop()
+            stack[-1].append(done)
+        elif string is not None:
+            stack[-1].append(string[1:-1])
+        elif atom is not None:
+            stack[-1].append(_number(atom))
+    if len(stack) != 1:
+        raise KBCompileError("unbalanced '('")
+    return stack[0]
+
+
+def _number(token: str):
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return Sym(token)
+
+
+# ------------------------------------------------------------------------------
+# ✅ Vectorized MeTTa number semantics
+# ------------------------------------------------------------------------------
+def _is_int(x) -> bool:
+    return np.asarray(x).dtype.kind in "iub"
+
+
+def _div(a, b):
+    if _is_int(a) and _is_int(b):
+        a, b = np.asarray(a), np.asarray(b)
+        q = np.abs(a) // np.abs(b)  # truncate toward zero, like Hyperon's integer `/`
+        return np.where((a < 0) ^ (b < 0), -q, q)
+    return np.true_divide(a, b)
+
+
+_OPS: Dict[str, Callable] = {
+    "+": np.add if HAS_NUMPY else None,
+    "-": np.subtract if HAS_NUMPY else None,
+    "*": np.multiply if HAS_NUMPY else None,
+    "/": _div,
+    "<": np.less if HAS_NUMPY else None,
+    "<=": np.less_equal if HAS_NUMPY else None,
+    ">": np.greater if HAS_NUMPY else None,
+    ">=": np.greater_equal if HAS_NUMPY else None,
+    "==": np.equal if HAS_NUMPY else None,
+}
+_CONSTANTS = {"True": True, "False": False}
+
+Env = Dict[str, object]
+Compiled = Callable[[Env], object]
+
+
+# ------------------------------------------------------------------------------
+# ✅ Rule compiler
+# ------------------------------------------------------------------------------
+class _Compiler:
+    def __init__(self, rules: Dict[str, Tuple[List[str], object]]):
+        self.rules = rules
+        self.functions: Dict[str, Compiled] = {}
+        self._compiling: set = set()
+
+    def function(self, name: str) -> Compiled:
+        if name in self.functions:
+            return self.functions[name]
+        if name in self._compiling:
+            raise KBCompileError(f"recursive rule {name} is not compilable")
+        if name not in self.rules:
+            raise KBCompileError(f"no rule for {name}")
+        self._compiling.add(name)
+        params, body = self.rules[name]
+        compiled_body = self.expr(body)
+
+        def call(args: List[object], compiled_body=compiled_body, params=params) -> object:
+            return compiled_body(dict(zip(params, args)))
+
+        self.functions[name] = call
+        self._compiling.discard(name)
+        return call
+
+    def expr(self, node) -> Compiled:
+        if isinstance(node, Sym):
+            if node.startswith("$"):
+                return lambda env, name=str(node): env[name]
+            if node in _CONSTANTS:
+                return lambda env, value=_CONSTANTS[node]: value
+            raise KBCompileError(f"bare symbol {node} in arithmetic rule")
+        if isinstance(node, bool) or isinstance(node, (int, float)):
+            return lambda env, value=node: value
+        if isinstance(node, str):
+            raise KBCompileError("string literals are not numeric")
+        if not node:
+            raise KBCompileError("empty expression")
+
+        head, args = node[0], node[1:]
+        if not isinstance(head, Sym):
+            raise KBCompileError("expression head must be a symbol")
+        if head == "if":
+            if len(args) != 3:
+                raise KBCompileError("if takes 3 arguments")
+            cond, then, other = (self.expr(a) for a in args)
+            return lambda env: np.where(cond(env), then(env), other(env))
+        if head in _OPS:
+            if len(args) != 2:
+                raise KBCompileError(f"{head} takes 2 arguments")
+            op, left, right = _OPS[head], self.expr(args[0]), self.expr(args[1])
+            return lambda env: op(left(env), right(env))
+        if head in self.rules:
+            fn = self.function(head)
+            compiled_args = [self.expr(a) for a in args]
+            return lambda env: fn([a(env) for a in compiled_args])
+        raise KBCompileError(f"unsupported form ({head} ...)")
+
+
+def _collect_rules(forms: List) -> Dict[str, Tuple[List[str], object]]:
+    rules: Dict[str, Tuple[List[str], object]] = {}
+    for form in forms:
+        if isinstance(form, list) and len(form) == 3 and form[0] == "=" and isinstance(form[1], list) and form[1]:
+            name, params = form[1][0], form[1][1:]
+            if name in rules:
+                raise KBCompileError(f"{name} has several definitions (non-deterministic)")
+            if not all(isinstance(p, Sym) and p.startswith("$") for p in params):
+                raise KBCompileError(f"{name} pattern-matches on its arguments")
+            rules[str(name)] = ([str(p) for p in params], form[2])
+    return rules
+
+
+def _scores_query(body) -> Tuple[Dict[str, str], Dict[str, str], object]:
+    """
+    Unpack `(collapse (match &self (laptop ...) (match &self (pref k $v) ... (scored $id EXPR metta))))`
+    into (laptop var → field, pref var → pref key, EXPR).
+    """
+    if not (isinstance(body, list) and len(body) == 2 and body[0] == "collapse"):
+        raise KBCompileError("get-laptop-scores must be a collapse over matches")
+    node = body[1]
+    laptop_vars: Dict[str, str] = {}
+    pref_vars: Dict[str, str] = {}
+    while isinstance(node, list) and node and node[0] == "match":
+        if len(node) != 4 or node[1] != "&self":
+            raise KBCompileError("only (match &self pattern body) is supported")
+        pattern, node = node[2], node[3]
+        if not isinstance(pattern, list) or not pattern:
+            raise KBCompileError(f"unsupported match pattern {pattern}")
+        if pattern[0] == "laptop" and len(pattern) == len(LAPTOP_FIELDS) + 1:
+            for field, var in zip(LAPTOP_FIELDS, pattern[1:]):
+                if isinstance(var, Sym) and var.startswith("$"):
+                    laptop_vars[str(var)] = field
+        elif pattern[0] == "pref" and len(pattern) == 3 and str(pattern[2]).startswith("$"):
+            pref_vars[str(pattern[2])] = str(pattern[1])
+        else:
+            raise KBCompileError(f"unsupported match pattern {pattern}")
+    if not (isinstance(node, list) and len(node) == 4 and node[0] == "scored"):
+        raise KBCompileError("get-laptop-scores must produce (scored $id score metta)")
+    if laptop_vars.get(str(node[1])) != "id":
+        raise KBCompileError("scored result must carry the laptop id")
+    return laptop_vars, pref_vars, node[2]
+
+
+class CompiledKB:
+    """Vectorized equivalent of kb.metta's `!(get-laptop-scores)`."""
+
+    def __init__(self, text: str):
+        if not HAS_NUMPY:
+            raise KBCompileError("numpy is required for the compiled KB")
+        forms = parse_sexprs(text)
+        rules = _collect_rules(forms)
+        if "get-laptop-scores" not in rules:
+            raise KBCompileError("kb has no get-laptop-scores rule")
+        self.bounded = has_bounded_rules(text)  # score_upper_bounds holds for this kb
+        _, query = rules.pop("get-laptop-scores")
+        self.laptop_vars, self.pref_vars, score_expr = _scores_query(query)
+        compiler = _Compiler(rules)
+        self._score = compiler.expr(score_expr)
+        self.rules = sorted(compiler.functions)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CompiledKB":
+        return cls(Path(path).read_text())
+
+    def score_columns(self, columns: Dict[str, object], prefs: Dict[str, object]):
+        """
+        Scores for column arrays keyed by LAPTOP_FIELDS and a pref-key → value dict.
+        Pref values may be arrays shaped to broadcast against the columns (e.g.
+        budgets[:, None] gives one row of scores per budget).
+        """
+        env: Env = {var: np.asarray(columns[field]) for var, field in self.laptop_vars.items() if field != "id"}
+        env.update({var: prefs[key] for var, key in self.pref_vars.items()})
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.asarray(self._score(env), dtype=float)
+        return np.broadcast_to(out, np.broadcast_shapes(out.shape, (len(columns["id"]),)))
+
+    def score(self, laptops: Iterable, max_budget: float, prefer_performance: bool) -> Dict[str, float]:
+        """id → score for LaptopOption-like objects (same inputs as MettaKB.score)."""
+        laptops = list(laptops)
+        if not laptops:
+            return {}
+        columns = {
+            "id": [l.id for l in laptops],
+            "processor": [l.specs.processor for l in laptops],
+            "ram_gb": np.array([l.specs.ram_gb for l in laptops], dtype=np.int64),
+            "gpu": [l.specs.gpu for l in laptops],
+            "price": np.array([l.price for l in laptops], dtype=float),
+            "rating": np.array([l.rating for l in laptops], dtype=float),
+            "review_count": np.array([l.review_count for l in laptops], dtype=np.int64),
+        }
+        prefs = {"budget": float(max_budget), "prefer_performance": bool(prefer_performance)}
+        scores = self.score_columns(columns, prefs)
+        return dict(zip(columns["id"], scores.tolist()))
+
+
+# ------------------------------------------------------------------------------
+# ✅ Analytic score bounds (valid only for the rules they were derived from)
+# ------------------------------------------------------------------------------
+# The scoring rules the bounds below were derived from. A kb whose rules differ
+# in any way gets no bounds, so callers score every laptop instead.
+BOUNDED_RULES = """
+(= (ram-score $ram) (/ $ram 32))
+(= (price-score $price $budget)
+   (if (<= $price $budget)
+       (/ (- $budget $price) $budget)
+       (* -0.3 (/ (- $price $budget) $budget))))
+(= (rating-score $rating $count)
+   (* (/ $rating 5.0)
+      (if (>= $count 500) 1.0 (/ $count 500))))
+(= (weighted-score $ram-norm $price-norm $rating-norm $prefer)
+   (if $prefer
+       (+ (+ (* 0.40 $ram-norm) (* 0.35 $price-norm)) (* 0.25 $rating-norm))
+       (+ (+ (* 0.25 $ram-norm) (* 0.50 $price-norm)) (* 0.25 $rating-norm))))
+(= (calc-laptop-score $ram $price $budget $rating $count $prefer)
+   (weighted-score (ram-score $ram)
+                   (price-score $price $budget)
+                   (rating-score $rating $count)
+                   $prefer))
+(= (get-laptop-scores)
+   (collapse (match &self (laptop $id $cpu $ram $gpu $price $rating $count)
+     (match &self (pref budget $budget)
+       (match &self (pref prefer_performance $prefer)
+         (scored $id
+                 (calc-laptop-score $ram $price $budget $rating $count $prefer)
+                 metta))))))
+"""
+# weighted-score coefficients (ram, price, rating) by prefer_performance
+BOUND_COEFFICIENTS = {True: (0.40, 0.35, 0.25), False: (0.25, 0.50, 0.25)}
+BOUND_SLACK = 1e-9  # float rounding across the handful of operations per score
+
+
+def score_upper_bounds(ram_gb, price, rating, budget: float, prefer_performance: bool):
+    """
+    Upper bounds on kb.metta's `calc-laptop-score`, term by term:
+    ram-score ≤ ram/32 (integer `/` truncates toward zero), price-score is
+    computed as written, rating-score ≤ rating/5 (the review-count factor is
+    capped at 1 for non-negative counts), combined with the positive
+    weighted-score coefficients.
+    """
+    ram = np.maximum(np.asarray(ram_gb, dtype=float), 0.0) / 32
+    price = np.asarray(price, dtype=float)
+    price_term = np.where(price <= budget, (budget - price) / budget, -0.3 * ((price - budget) / budget))
+    rating_term = np.maximum(np.asarray(rating, dtype=float) / 5.0, 0.0)
+    c_ram, c_price, c_rating = BOUND_COEFFICIENTS[bool(prefer_performance)]
+    ub = c_ram * ram + c_price * price_term + c_rating * rating_term
+    return ub + BOUND_SLACK * (1.0 + np.abs(ub))
+
+
+def has_bounded_rules(text: str) -> bool:
+    """True if `text` defines the scoring rules exactly as BOUNDED_RULES does."""
+    try:
+        rules = _collect_rules(parse_sexprs(text))
+    except KBCompileError:
+        return False
+    expected = _collect_rules(parse_sexprs(BOUNDED_RULES))
+    return all(rules.get(name) == rule for name, rule in expected.items())
+
+
+# ------------------------------------------------------------------------------
+# ✅ Parity checking against real MeTTa
+# ------------------------------------------------------------------------------
+def compare_scores(compiled: Dict[str, float], metta: Dict[str, float], tolerance: float = 1e-9) -> dict:
+    """Drift report between compiled and MeTTa scores for the same request."""
+    drift = {
+        lid: compiled[lid] - metta[lid]
+        for lid in compiled.keys() & metta.keys()
+        if abs(compiled[lid] - metta[lid]) > tolerance
+    }
+    return {
+        "checked": len(compiled.keys() & metta.keys()),
+        "missing": sorted(compiled.keys() ^ metta.keys()),
+        "drifted": drift,
+        "max_drift": max((abs(d) for d in drift.values()), default=0.0),
+        "ok": not drift and compiled.keys() == metta.keys(),
+    }
+
+
+class ParityStats:
+    """Running totals of sampled compiled-vs-MeTTa checks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.mismatches = 0
+        self.max_drift = 0.0
+
+    def record(self, report: dict) -> None:
+        with self._lock:
+            self.checks += 1
+            self.mismatches += not report["ok"]
+            self.max_drift = max(self.max_drift, report["max_drift"])
+
+    def summary(self) -> str:
+        return f"{self.mismatches}/{self.checks} sampled requests drifted (max drift {self.max_drift:.3g})"
+
+
+# ------------------------------------------------------------------------------
+# ✅ Hot-reloaded shared instance
+# ------------------------------------------------------------------------------
+_COMPILED: Optional[CompiledKB] = None
+_COMPILED_STAMP = None
+_COMPILED_LOCK = threading.Lock()
+
+
+def compiled_kb(path: Path = KB_PATH) -> CompiledKB:
+    """Compiled KB for `path`, recompiled when the file's mtime/size changes."""
+    global _COMPILED, _COMPILED_STAMP
+    st = os.stat(path)
+    stamp = (str(path), st.st_mtime_ns, st.st_size)
+    if _COMPILED is not None and _COMPILED_STAMP == stamp:
+        return _COMPILED
+    with _COMPILED_LOCK:
+        if _COMPILED is None or _COMPILED_STAMP != stamp:
+            _COMPILED = CompiledKB.from_file(path)
+            _COMPILED_STAMP = stamp
+        return _COMPILED
@@ -0,0 +1,79 @@
+# agents/local_pipeline.py — Fused mode: downstream stages as in-process async tasks
+#
+# For single-host deployments the Scout / Compute / Evaluator / Negotiator
+# handlers run inside the orchestrator's process and event loop. Stages get
+# the same `agents/messages.py` models they would receive over the wire, and
+# their replies to the orchestrator are handed straight to its wire handlers —
+# no envelopes, signing, HTTP or mailbox in between.
+
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+Handler = Callable[..., Awaitable[None]]
+
+
+class LocalContext:
+    """Stage-side Context: replies addressed to the orchestrator are delivered in-process."""
+
+    def __init__(self, ctx, pipeline: "LocalPipeline", stage: str):
+        self._ctx = ctx
+        self._pipeline = pipeline
+        self._stage = stage
+
+    async def send(self, destination: str, message, *args, **kwargs):
+        if destination == self._ctx.agent.address:
+            await self._pipeline.deliver(self._ctx, self._stage, message)
+        else:
+            await self._ctx.send(destination, message, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._ctx, name)
+
+
+class LocalPipeline:
+    """Stage name → message handler, and reply model → orchestrator handler."""
+
+    def __init__(self, stages: Dict[str, Handler], replies: Dict[type, Handler]):
+        self.stages = stages
+        self.replies = replies
+
+    def submit(self, ctx, stage: str, message) -> asyncio.Task:
+        """Run `stage` on `message` as its own task (like a message arriving at that agent)."""
+        return asyncio.create_task(self._run(ctx, stage, message))
+
+    async def _run(self, ctx, stage: str, message) -> None:
+        try:
+            await self.stages[stage](LocalContext(ctx, self, stage), ctx.agent.address, message)
+        except Exception as e:
+            print(f"❌ [Fused] {stage} stage failed: {e}")
+
+    async def deliver(self, ctx, stage: str, message) -> None:
+        handler = self.replies.get(type(message))
+        if handler is None:
+            print(f"⚠️ [Fused] No orchestrator handler for {type(message).__name__} from {stage}")
+            return
+        await handler(ctx, f"local:{stage}", message)
+
+
+def fused_pipeline(agent, replies: Dict[type, Handler]) -> LocalPipeline:
+    """
+    Import the stages' handlers and attach their lifecycle hooks to `agent`.
+    Stage modules only build their own Agent when run as a script, so no
+    second Agent (or wallet from the shared seed) exists in this process.
+    """
+    from agents import compute_agent, evaluator, negotiator, scout
+
+    agent.on_event("startup")(scout.warm_replica)
+    agent.on_event("startup")(evaluator.warm_kb)
+    agent.on_event("shutdown")(evaluator.stop_metta_pool)
+    agent.on_interval(period=scout.REPLICA_TTL_S)(scout.revalidate_replica)
+    agent.on_interval(period=60.0)(evaluator.log_metta_pool)
+    return LocalPipeline(
+        {
+            "scout": scout.handle_procurement_request,
+            "compute": compute_agent.handle_laptop_eval_request,
+            "evaluator": evaluator.handle_eval,
+            "negotiator": negotiator.handle_negotiation,
+        },
+        replies,
+    )
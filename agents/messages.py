@@ -53,6 +53,7 @@ class LaptopOption(BaseModel):
     stock: int
     use_cases: List[str]
     bulk_pricing: List[BulkPricing]
+    dominance_count: Optional[int] = None  # set by the skyline stage: laptops that dominate it
 
 class ScoredLaptopOption(BaseModel):
     base: LaptopOption
@@ -63,7 +64,17 @@ class ScoredLaptopOption(BaseModel):
 
 class LaptopScoredResponse(Model):   # ✅ CHANGE BaseModel -> Model
     request_id: str
-    laptops: List[ScoredLaptopOption]
+    laptops: List[ScoredLaptopOption] = []
+    # Compact form: ids + score columns (aligned), cudos_meta once per batch
+    laptop_ids: Optional[List[str]] = None
+    processor_scores: Optional[List[float]] = None
+    warranty_scores: Optional[List[float]] = None
+    shipping_scores: Optional[List[float]] = None
+    cudos_meta: Optional[dict] = None
+    # Echo of the request's chunk (see LaptopResponse)
+    chunk_index: Optional[int] = None
+    final: bool = True
+    total_chunks: Optional[int] = None
 
 # -----------------------------
 # ORCHESTRATOR → SCOUT
@@ -78,13 +89,23 @@ class ProcurementRequest(Model):
     min_storage_gb: Optional[int] = None
     preferred_brand: Optional[str] = None
     prefer_performance: bool = True  # vs prefer_cost
+    wire_format: str = "full"  # "compact": reply with laptop ids + catalog_version
+    chunk_size: Optional[int] = None  # stream candidates in chunks of this size (None = one reply)
 
 # -----------------------------
 # SCOUT → ORCHESTRATOR
 # -----------------------------
 class LaptopResponse(Model):
     request_id: str
-    laptops: List[LaptopOption]
+    laptops: List[LaptopOption] = []
+    catalog_version: Optional[str] = None  # backend snapshot the rows were read from
+    laptop_ids: Optional[List[str]] = None  # compact form: rows resolved from catalog_version
+    # Chunked streaming: chunk_index None = the whole list in one message;
+    # the final chunk carries total_chunks
+    chunk_index: Optional[int] = None
+    final: bool = True
+    total_chunks: Optional[int] = None
+    total_candidates: Optional[int] = None  # on the final chunk: candidates across all chunks
 
 # -----------------------------
 # ORCHESTRATOR → EVALUATOR
@@ -97,6 +118,25 @@ class LaptopEvaluationRequest(Model):
     quantity: int
     max_budget: float
     prefer_performance: bool = True
+    top_k: Optional[int] = None  # return only the K best (None = rank everything)
+    skyband_k: Optional[int] = None  # candidates were cut to the K-skyband upstream (None = not cut)
+    catalog_version: Optional[str] = None  # snapshot the laptop_ids refer to
+    # Compact form: ids resolved from catalog_version, Compute scores as aligned columns
+    laptop_ids: Optional[List[str]] = None
+    processor_scores: Optional[List[float]] = None
+    warranty_scores: Optional[List[float]] = None
+    shipping_scores: Optional[List[float]] = None
+    cudos_meta: Optional[dict] = None
+    dominance_counts: Optional[List[Optional[int]]] = None  # skyline tags, aligned with laptop_ids
+    # "full": scored laptops in, ranking out. Fan-out sends two halves instead:
+    # "symbolic" (Scout's candidates, scored while Compute runs) and "compute"
+    # (Compute's scores, joined to the symbolic half by request_id)
+    phase: str = "full"
+    # Chunk of a streamed request (see LaptopResponse); the Evaluator keeps a
+    # running top-K across chunks and answers in full once all are in
+    chunk_index: Optional[int] = None
+    final: bool = True
+    total_chunks: Optional[int] = None
 
 # -----------------------------
 # EVALUATOR → ORCHESTRATOR
@@ -109,19 +149,35 @@ class ScoredLaptop(BaseModel):
     value_score: float               # Price vs budget pressure
     metta_used: bool                 # True if MeTTa was used
     rationale: str                   # Human-readable breakdown
+    score_engine: str = "fallback"   # "compiled" (kb rules via NumPy) | "metta" | "fallback"
 
 class LaptopEvaluationResult(Model):
     request_id: str
-    ranked: List[ScoredLaptop]
+    ranked: List[ScoredLaptop] = []
+    total_candidates: Optional[int] = None   # candidates scored (ranked may hold only the top_k)
+    score_stats: Optional[dict] = None       # min / max / mean / stdev / p50 / p90 over all candidates
+    # Compact form: ranked ids + score columns (the orchestrator holds the rows)
+    ranked_ids: Optional[List[str]] = None
+    scores: Optional[List[float]] = None
+    symbolic_scores: Optional[List[float]] = None
+    compute_scores: Optional[List[float]] = None
+    value_scores: Optional[List[float]] = None
+    score_engines: Optional[List[str]] = None
+    # Streamed requests: provisional top-K after each chunk (final=False), then the result
+    final: bool = True
+    chunks_done: Optional[int] = None
 
 # -----------------------------
 # ORCHESTRATOR → NEGOTIATOR
 # -----------------------------
 class BulkNegotiationRequest(Model):
     request_id: str
-    top_pick: ScoredLaptop
+    top_pick: Optional[ScoredLaptop] = None
     quantity: int
     target_price_per_unit: Optional[float] = None
+    # Compact form: the pick by id, resolved from catalog_version
+    laptop_id: Optional[str] = None
+    catalog_version: Optional[str] = None
 
 # -----------------------------
 # NEGOTIATOR → ORCHESTRATOR
@@ -134,4 +190,15 @@ class BulkNegotiationResult(Model):
     total_cost: float
     discount_applied_pct: float
     savings: float
-    note: Optional[str] = None
\ No newline at end of file
+    note: Optional[str] = None
+
+# -----------------------------
+# ANY STAGE → ORCHESTRATOR
+# -----------------------------
+class PayloadRejected(Model):
+    """A compact message whose rows could not be resolved; the orchestrator resends it in full."""
+    request_id: str
+    stage: str  # "compute" | "evaluator" | "negotiator"
+    reason: str
+    phase: str = "full"  # which Evaluator half, when stage == "evaluator"
+    chunk_index: Optional[int] = None
@@ -0,0 +1,343 @@
+# agents/metta_engine.py — Long-lived MeTTa engine with the KB pre-loaded
+#
+# Building a `MeTTa()` and parsing knowledge/kb.metta used to happen on every
+# evaluation request. Here the KB is loaded once (and again only when the file
+# changes); each request adds its laptop / pref atoms to the space in one
+# batch, runs the query, and removes exactly those atoms afterwards.
+#
+# `MettaPool` runs that work in warm worker processes (one KB per worker) so
+# Hyperon's CPU-bound evaluation never blocks an agent's event loop.
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from hyperon import MeTTa
+    HAS_METTA = True
+except Exception:
+    MeTTa = None
+    HAS_METTA = False
+
+KB_PATH = Path(os.getenv("METTA_KB_PATH", str(Path(__file__).parent.parent / "knowledge" / "kb.metta")))
+# Forking an agent process (event loop and network threads running) is unsafe,
+# so workers come from a fork server where available, else are spawned.
+METTA_MP_START = os.getenv(
+    "METTA_MP_START", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+# ------------------------------------------------------------------------------
+# ✅ Request atoms
+# ------------------------------------------------------------------------------
+def laptop_atom(l) -> str:
+    return (
+        f'(laptop {l.id} '
+        f'"{l.specs.processor}" {l.specs.ram_gb} "{l.specs.gpu}" '
+        f'{l.price} {l.rating} {l.review_count})'
+    )
+
+
+def request_atoms(laptops: Iterable, max_budget: float, prefer_performance: bool) -> str:
+    lines = [laptop_atom(l) for l in laptops]
+    lines.append(f"(pref budget {max_budget})")
+    lines.append(f'(pref prefer_performance {"True" if prefer_performance else "False"})')
+    return "\n".join(lines)
+
+
+def parse_scores(metta_result) -> Dict[str, float]:
+    """id → score from a `!(get-laptop-scores)` result (every `(scored id score ...)` node)."""
+    scores: Dict[str, float] = {}
+    stack = list(metta_result) if isinstance(metta_result, list) else [metta_result]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not hasattr(node, "get_children"):
+            continue
+        children = node.get_children()
+        if len(children) >= 3 and str(children[0]) == "scored":
+            try:
+                scores.setdefault(str(children[1]), float(str(children[2])))
+            except ValueError:
+                pass
+        stack.extend(children)
+    return scores
+
+
+# ------------------------------------------------------------------------------
+# ✅ Pre-loaded knowledge base
+# ------------------------------------------------------------------------------
+class MettaKB:
+    """
+    One MeTTa runner with kb.metta loaded. `score` scopes request atoms to a
+    single call; the file is re-read when its mtime/size changes (checked at
+    most once per `check_interval_s`).
+    """
+
+    def __init__(self, kb_path: Path = KB_PATH, check_interval_s: float = 1.0):
+        self.kb_path = Path(kb_path)
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()  # the runner and its space are not thread-safe
+        self._checked_at = 0.0
+        self._stamp = None
+        self.loads = 0
+        self._metta = None
+        self.reload()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.kb_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def reload(self) -> None:
+        """Build a fresh runner from the KB file, then swap it in."""
+        stamp = self._file_stamp()
+        metta = MeTTa()
+        if stamp is not None:
+            metta.run(self.kb_path.read_text())
+        with self._lock:
+            self._metta = metta
+            self._stamp = stamp
+            self.loads += 1
+
+    def refresh_if_changed(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return False
+        self._checked_at = now
+        if self._file_stamp() == self._stamp:
+            return False
+        self.reload()
+        return True
+
+    def run_scoped(self, atoms_text: str, query: str) -> List:
+        """Add `atoms_text` to the KB space, run `query`, and always remove those atoms again."""
+        self.refresh_if_changed()
+        with self._lock:
+            metta = self._metta
+            space = metta.space()
+            atoms = metta.parse_all(atoms_text)
+            added = []
+            try:
+                for atom in atoms:
+                    space.add_atom(atom)
+                    added.append(atom)
+                return metta.run(query)
+            finally:
+                for atom in added:
+                    space.remove_atom(atom)
+
+    def score(self, laptops: Iterable, max_budget: float, prefer_performance: bool) -> List:
+        """Raw `!(get-laptop-scores)` result for one request's laptops and preferences."""
+        return self.run_scoped(request_atoms(laptops, max_budget, prefer_performance), "!(get-laptop-scores)")
+
+
+_KB: Optional[MettaKB] = None
+_KB_LOCK = threading.Lock()
+
+
+def shared_kb() -> MettaKB:
+    """Process-wide KB, loaded on first use."""
+    global _KB
+    if _KB is None:
+        with _KB_LOCK:
+            if _KB is None:
+                _KB = MettaKB()
+    return _KB
+
+
+# ------------------------------------------------------------------------------
+# ✅ Warm worker-process pool
+# ------------------------------------------------------------------------------
+_WORKER_KB: Optional[MettaKB] = None
+
+
+def _init_worker(kb_path: str) -> None:
+    global _WORKER_KB
+    _WORKER_KB = MettaKB(Path(kb_path))
+
+
+def _worker_ping(hold_s: float) -> int:
+    time.sleep(hold_s)  # keep this worker busy so the next ping starts another one
+    return os.getpid()
+
+
+def _worker_score(atoms_text: str) -> Dict[str, float]:
+    # Atoms are not picklable, so results are parsed before leaving the worker
+    return parse_scores(_WORKER_KB.run_scoped(atoms_text, "!(get-laptop-scores)"))
+
+
+class MettaPoolTimeout(Exception):
+    pass
+
+
+@contextmanager
+def _without_main():
+    """
+    Start workers without the agent script: spawn and forkserver re-run
+    `__main__` in every child, importing the whole agent stack there.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+class MettaPool:
+    """
+    Symbolic scoring on worker processes that each keep kb.metta loaded.
+    At most `max_inflight` calls are submitted at once; the rest wait in a
+    queue whose depth is reported by `stats()`. Calls slower than `timeout_s`
+    raise `MettaPoolTimeout` and retire the pool: new calls go to fresh
+    workers, the retired pool's other calls run to completion, and only then
+    are its workers (the overrunning one included) terminated. A slot is only
+    freed once its worker call has actually ended.
+    """
+
+    def __init__(self, workers: int, max_inflight: Optional[int] = None, timeout_s: float = 30.0, kb_path: Path = KB_PATH):
+        self.workers = max(1, workers)
+        self.max_inflight = max_inflight or self.workers * 2
+        self.timeout_s = timeout_s
+        self.kb_path = Path(kb_path)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._calls: Dict[ProcessPoolExecutor, Set[asyncio.Future]] = {}     # unfinished calls per pool
+        self._overran: Dict[ProcessPoolExecutor, Set[asyncio.Future]] = {}   # retired pools → timed-out calls
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.recycles = 0
+        self._busy_s = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(METTA_MP_START),
+                initializer=_init_worker,
+                initargs=(str(self.kb_path),),
+            )
+        return self._executor
+
+    async def warm(self) -> int:
+        """Start every worker (each loads the KB in its initializer); returns worker count."""
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        with _without_main():
+            pings = [loop.run_in_executor(pool, _worker_ping, 0.2) for _ in range(self.workers)]
+        pids = await asyncio.gather(*pings)
+        return len(set(pids))
+
+    def _retire(self, pool: ProcessPoolExecutor, future: asyncio.Future) -> None:
+        """`future` overran: later calls get fresh workers, `pool` is reaped once its other calls end."""
+        if pool is self._executor:
+            self._executor = None
+            self.recycles += 1
+        self._overran.setdefault(pool, set()).add(future)
+        self._reap(pool)
+
+    def _reap(self, pool: ProcessPoolExecutor) -> None:
+        """Terminate a retired pool's workers once only timed-out calls are left on it."""
+        overran = self._overran.get(pool)
+        if overran is None or self._calls.get(pool, set()) - overran:
+            return
+        del self._overran[pool]
+        self._calls.pop(pool, None)
+        for proc in list((getattr(pool, "_processes", None) or {}).values()):
+            proc.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _call_done(self, pool: ProcessPoolExecutor, future: asyncio.Future) -> None:
+        calls = self._calls.get(pool)
+        if calls is not None:
+            calls.discard(future)
+            self._reap(pool)
+
+    def _release_when_done(self, future) -> None:
+        """Free the call's slot once its worker call has ended, not when the caller stopped waiting."""
+        def release(f=None) -> None:
+            if f is not None and not f.cancelled():
+                f.exception()  # consumed here, the caller may have given up on it
+            self.in_flight -= 1
+            self._semaphore.release()
+
+        if future is None:
+            release()
+        else:
+            future.add_done_callback(release)
+
+    async def score(self, laptops: Iterable, max_budget: float, prefer_performance: bool) -> Dict[str, float]:
+        atoms_text = request_atoms(laptops, max_budget, prefer_performance)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        start = time.monotonic()
+        future = None
+        try:
+            loop = asyncio.get_running_loop()
+            pool = self._pool()
+            with _without_main():
+                future = loop.run_in_executor(pool, _worker_score, atoms_text)
+            self._calls.setdefault(pool, set()).add(future)
+            future.add_done_callback(lambda f, pool=pool: self._call_done(pool, f))
+            scores = await asyncio.wait_for(asyncio.shield(future), self.timeout_s)
+            self.completed += 1
+            return scores
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._retire(pool, future)
+            raise MettaPoolTimeout(f"MeTTa scoring exceeded {self.timeout_s}s")
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._busy_s += time.monotonic() - start
+            self._release_when_done(future)
+
+    def stats(self) -> dict:
+        done = self.completed + self.timeouts + self.errors
+        return {
+            "workers": self.workers,
+            "max_inflight": self.max_inflight,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "recycles": self.recycles,
+            "avg_ms": round(self._busy_s / done * 1000, 1) if done else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for pool in list(self._overran):
+            self._calls[pool] = set()
+            self._reap(pool)
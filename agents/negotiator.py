@@ -4,7 +4,9 @@ import os
 import httpx
 from uagents import Agent, Context, Protocol
 from uagents.setup import fund_agent_if_low
-from agents.messages import BulkNegotiationRequest, BulkNegotiationResult
+from agents.messages import BulkNegotiationRequest, BulkNegotiationResult, PayloadRejected
+from agents.pricing import bulk_discount_pct
+from agents.wire import resolver
 
 # ------------------------------------------------------------------------------
 # ✅ Environment-driven configuration
@@ -15,16 +17,8 @@ NOTIFY_URL = os.getenv("NOTIFY_URL", "http://127.0.0.1:9000/api/notify")
 AGENT_MNEMONIC = os.getenv("AGENT_MNEMONIC")  # optional stable wallet seed
 
 # ------------------------------------------------------------------------------
-# ✅ Agent Setup (uses dynamic endpoint)
+# ✅ Protocol (the Agent itself is only built when run standalone, see bottom)
 # ------------------------------------------------------------------------------
-negotiator = Agent(
-    name="negotiator_agent",
-    port=PORT,
-    endpoint=f"{PUBLIC_URL}/submit",
-    mailbox=True,
-    seed=AGENT_MNEMONIC,
-)
-
 proto = Protocol(name="negotiator_protocol")
 
 
@@ -53,23 +47,31 @@ async def notify(request_id: str, message: str, done: bool = False, error: bool
 # ------------------------------------------------------------------------------
 @proto.on_message(BulkNegotiationRequest)
 async def handle_negotiation(ctx: Context, sender: str, msg: BulkNegotiationRequest):
+    if msg.top_pick is not None:
+        laptop = msg.top_pick.laptop
+    else:
+        # compact form: resolve the laptop row from the catalog snapshot the pick came from
+        resolved = await resolver().laptops(msg.catalog_version, [msg.laptop_id] if msg.laptop_id else [])
+        if not resolved:
+            print(f"⚠️ [Negotiator] Cannot resolve {msg.laptop_id}@{msg.catalog_version}; asking for full payload")
+            await ctx.send(sender, PayloadRejected(
+                request_id=msg.request_id, stage="negotiator", reason=f"catalog {msg.catalog_version} unavailable",
+            ))
+            return
+        laptop = resolved[0]
+
     print(f"\n🤝 [Negotiator] Received BulkNegotiationRequest!")
     print(f"   Request ID: {msg.request_id}")
-    print(f"   Laptop: {msg.top_pick.laptop.model}")
+    print(f"   Laptop: {laptop.model}")
     print(f"   Quantity: {msg.quantity}")
-    print(f"   Original price: ${msg.top_pick.laptop.price}")
+    print(f"   Original price: ${laptop.price}")
 
     await notify(msg.request_id, f"🤝 Negotiator evaluating bulk discount for {msg.quantity} units...")
 
-    laptop = msg.top_pick.laptop
     original_price = laptop.price
 
     # ✅ Find applicable bulk discount tier
-    discount_pct = 0.0
-    for tier in sorted(laptop.bulk_pricing, key=lambda x: x.min_qty, reverse=True):
-        if msg.quantity >= tier.min_qty:
-            discount_pct = tier.discount_pct
-            break
+    discount_pct = bulk_discount_pct(laptop.bulk_pricing, msg.quantity)
 
     final_price_per_unit = original_price * (1 - discount_pct / 100)
     total_cost = final_price_per_unit * msg.quantity
@@ -113,13 +115,24 @@ async def handle_negotiation(ctx: Context, sender: str, msg: BulkNegotiationRequ
 
 
 # ------------------------------------------------------------------------------
-# ✅ Registration & Startup
+# ✅ Registration & Startup (fused mode calls the handler above without an Agent)
 # ------------------------------------------------------------------------------
-fund_agent_if_low(negotiator.wallet.address())
-negotiator.include(proto, publish_manifest=True)
-negotiator.register()
+def build_agent() -> Agent:
+    agent = Agent(
+        name="negotiator_agent",
+        port=PORT,
+        endpoint=f"{PUBLIC_URL}/submit",
+        mailbox=True,
+        seed=AGENT_MNEMONIC,
+    )
+    agent.include(proto, publish_manifest=True)
+    return agent
+
 
 if __name__ == "__main__":
+    negotiator = build_agent()
+    fund_agent_if_low(negotiator.wallet.address())
+    negotiator.register()
     print("🤝 Starting Bulk Negotiator Agent...")
     print(f"PORT: {PORT}")
     print(f"PUBLIC_URL: {PUBLIC_URL}")
@@ -23,8 +23,13 @@ from agents.messages import (
     ProcurementRequest, LaptopResponse,
     LaptopEvaluationRequest, LaptopEvaluationResult,
     BulkNegotiationRequest, BulkNegotiationResult,
-    ScoredLaptop, LaptopScoredResponse
+    LaptopOption, ScoredLaptop, LaptopScoredResponse, PayloadRejected
 )
+from agents.dispatch import ReplicaSet, dispatch, parse_addresses, redispatch_expired
+from agents.local_pipeline import LocalPipeline, fused_pipeline
+from agents.request_state import PHASES, RequestStateStore
+from agents.skyline import SkybandStream
+from agents.wire import WIRE_FORMAT, dominance_column, expand_ranked, resolver, score_columns, scored_options
 
 # -----------------------------------------------------------------------------
 # ✅ Environment-driven configuration
@@ -34,12 +39,96 @@ PUBLIC_URL = os.getenv("PUBLIC_URL", f"http://127.0.0.1:{PORT}")  # e.g., https:
 NOTIFY_URL = os.getenv("NOTIFY_URL", "http://127.0.0.1:9000/api/notify")
 AGENT_MNEMONIC = os.getenv("AGENT_MNEMONIC")  # optional stable identity/seed
 
-# Downstream agent addresses (Agentverse/ASI on-chain addresses)
+# Downstream agent addresses (Agentverse/ASI on-chain addresses); each may be a
+# comma-separated list of replicas
 SCOUT_ADDR   = os.getenv("SCOUT_ADDR", "agent1qtn4ckex9l5ytkee37k55yzcemtpt0svhktxty4q0kkaexx8g8xlwpll9sf")
 COMPUTE_ADDR = os.getenv("COMPUTE_ADDR", "agent1q04u5agrk4xj3au80avzn208j4g4f4km6662wqnv26qy026rj7kfy654fjn")
 EVAL_ADDR    = os.getenv("EVAL_ADDR",  "agent1qd24yq6av5wchue0n6pw2ht9qg95l0vl0y35nyajsxha5juhdvyrz2ae62x")
 NEGO_ADDR    = os.getenv("NEGO_ADDR",  "agent1q2hsweq7l3004gejs63f3lve4zseha54ay7n9lj68c3zev2vtnlaxchak47")
 
+# Replica selection: "least" outstanding requests, or consistent "hash" on request_id
+DISPATCH_STRATEGY = os.getenv("DISPATCH_STRATEGY", "least")
+DISPATCH_TIMEOUT_S = float(os.getenv("DISPATCH_TIMEOUT_S", "60"))    # no reply → replica out of rotation
+DISPATCH_DOWN_FOR_S = float(os.getenv("DISPATCH_DOWN_FOR_S", "30"))  # before it is tried again
+DISPATCH_CHECK_S = float(os.getenv("DISPATCH_CHECK_S", "5"))
+
+# "distributed": each stage is its own agent; "fused": Scout / Compute / Evaluator /
+# Negotiator run as in-process stages of this agent (single-host deployments)
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "distributed")
+
+# Only the top results are shown / negotiated, so the Evaluator returns just these
+EVAL_TOP_K = int(os.getenv("EVAL_TOP_K", "3"))
+# Drop Scout candidates dominated by >= K others before Compute (0 = off)
+SKYLINE_K = int(os.getenv("SKYLINE_K", str(EVAL_TOP_K)))
+# Start the Evaluator's symbolic phase alongside Compute; it joins Compute's scores later
+EVAL_FANOUT = os.getenv("EVAL_FANOUT", "1") == "1"
+# Scout streams candidates in chunks of this size; Compute / Evaluator work chunk by chunk (0 = one reply)
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "50"))
+
+# Per-request state: unfinished requests idle this long are dropped, finished ones
+# after REQUEST_DONE_TTL_S; beyond REQUEST_MAX_ENTRIES the least recently used go
+REQUEST_TTL_S = float(os.getenv("REQUEST_TTL_S", "900"))
+REQUEST_DONE_TTL_S = float(os.getenv("REQUEST_DONE_TTL_S", "120"))
+REQUEST_MAX_ENTRIES = int(os.getenv("REQUEST_MAX_ENTRIES", "10000"))
+REQUEST_CHECK_S = float(os.getenv("REQUEST_CHECK_S", "60"))
+
+
+def replica_set(name: str, addresses: str) -> ReplicaSet:
+    return ReplicaSet(name, parse_addresses(addresses), DISPATCH_STRATEGY, DISPATCH_TIMEOUT_S, DISPATCH_DOWN_FOR_S)
+
+
+SCOUTS = replica_set("scout", SCOUT_ADDR)
+COMPUTES = replica_set("compute", COMPUTE_ADDR)
+EVALUATORS = replica_set("evaluator", EVAL_ADDR)
+NEGOTIATORS = replica_set("negotiator", NEGO_ADDR)
+STAGES = (SCOUTS, COMPUTES, EVALUATORS, NEGOTIATORS)
+PIPELINE: Optional[LocalPipeline] = None  # set in fused mode
+
+
+def compact_wire() -> bool:
+    """Reference-by-id payloads between agents (in-process stages already share the objects)."""
+    return WIRE_FORMAT == "compact" and PIPELINE is None
+
+
+async def send_stage(ctx: Context, stage: ReplicaSet, request_id: str, message):
+    """Hand `message` to a downstream stage: in-process when fused, else to a replica."""
+    if PIPELINE is not None:
+        PIPELINE.submit(ctx, stage.name, message)
+    else:
+        await dispatch(ctx, stage, request_id, message)
+
+
+async def send_joined(ctx: Context, stage: ReplicaSet, request_id: str, message) -> bool:
+    """Send a follow-up half to the replica already working on `request_id` (False if none is)."""
+    if PIPELINE is not None:
+        PIPELINE.submit(ctx, stage.name, message)
+        return True
+    pending = stage.in_flight(request_id)
+    if pending is None:
+        return False
+    await ctx.send(pending[0], message)
+    return True
+
+
+def chunk_key(request_id: str, chunk: Optional[int]) -> str:
+    """Dispatch key of one chunk's Compute job (chunks may go to different replicas)."""
+    return request_id if chunk is None else f"{request_id}#{chunk}"
+
+
+async def to_evaluator(ctx: Context, st: Dict, request_id: str, message: LaptopEvaluationRequest) -> bool:
+    """
+    The first Evaluator message of a request picks its replica; the rest (the
+    compute half, further chunks) follow it there, since that replica holds
+    the join and the running top-K. Follow-ups are kept for `replay_followups`.
+    """
+    STATE.advance(request_id, "evaluating")
+    if not st.get("evaluating"):
+        st["evaluating"] = True
+        await send_stage(ctx, EVALUATORS, request_id, message)
+        return True
+    st.setdefault("followups", {})[(message.chunk_index, message.phase)] = message
+    return await send_joined(ctx, EVALUATORS, request_id, message)
+
 # -----------------------------------------------------------------------------
 # ✅ SSE notify (safe if gateway not running)
 # -----------------------------------------------------------------------------
@@ -93,8 +182,22 @@ def extract_req_id_from_text(text: str) -> Optional[str]:
     m = re.search(r"REQID:([0-9a-fA-F-]{8,36})", text)
     return m.group(1) if m else None
 
-# Per-request state (minimal orchestration memory)
-STATE: Dict[str, Dict] = {}
+# Per-request state (minimal orchestration memory), bounded by TTL / size
+STATE = RequestStateStore(REQUEST_TTL_S, REQUEST_DONE_TTL_S, REQUEST_MAX_ENTRIES)
+
+
+def live_state(request_id: str, until: str = "done") -> Optional[Dict]:
+    """State of a request not yet at phase `until`; None (logged) once it is, or if it expired."""
+    st = STATE.get(request_id)
+    if st is None or PHASES.index(STATE.phase(request_id)) >= PHASES.index(until):
+        print(f"↩️  No live state for {request_id} ({STATE.phase(request_id) or 'expired'}) — ignored")
+        return None
+    return st
+
+
+def candidates_by_id(st: Dict) -> Dict[str, LaptopOption]:
+    """Every candidate forwarded so far, by id (what compact rankings refer to)."""
+    return {l.id: l for laptops in st.get("chunks", {}).values() for l in laptops}
 
 def parse_user_requirements(text: str) -> dict:
     """
@@ -181,14 +284,44 @@ async def startup(ctx: Context):
     print(f"Endpoint: {PUBLIC_URL}/submit")
     print(f"Mailbox: ENABLED")
     print("Downstream addresses:")
-    print(f"  • SCOUT_ADDR   = {SCOUT_ADDR}")
-    print(f"  • COMPUTE_ADDR = {COMPUTE_ADDR}")
-    print(f"  • EVAL_ADDR    = {EVAL_ADDR}")
-    print(f"  • NEGO_ADDR    = {NEGO_ADDR}")
+    for stage in STAGES:
+        print(f"  • {stage.name:<10} = {'in-process (fused)' if PIPELINE else ', '.join(stage.addresses)}")
+    print(f"🗂️  Request state: ttl {REQUEST_TTL_S:.0f}s (finished {REQUEST_DONE_TTL_S:.0f}s), max {REQUEST_MAX_ENTRIES} entries")
     print("🔔 NOTIFY_URL:", NOTIFY_URL)
     print("🚀" * 40 + "\n")
     ctx.logger.info("Orchestrator ready for laptop procurement requests")
 
+# -----------------------------------------------------------------------------
+# ✅ Replica health: re-dispatch requests a replica stopped answering
+# -----------------------------------------------------------------------------
+async def replay_followups(ctx: Context, request_id: str):
+    """A request moved to another Evaluator: send the halves / chunks that followed its first message there too."""
+    for message in list(STATE.get(request_id, {}).get("followups", {}).values()):
+        await send_joined(ctx, EVALUATORS, request_id, message)
+
+
+@orchestrator.on_interval(period=DISPATCH_CHECK_S)
+async def check_replicas(ctx: Context):
+    for stage in STAGES:
+        for request_id, stalled, target in await redispatch_expired(ctx, stage):
+            if target and stage is EVALUATORS:
+                await replay_followups(ctx, request_id)
+            request_id = request_id.partition("#")[0]  # a chunk's Compute job reports to its request
+            if target:
+                await notify(
+                    request_id,
+                    f"⏱️ {stage.name} replica {stalled[:16]}… timed out after {stage.timeout_s:.0f}s — "
+                    f"re-dispatched to {target[:16]}… ({stage.summary()})",
+                )
+            else:
+                await notify(request_id, f"⚠️ No {stage.name} replica answered — still waiting for a late reply", error=True)
+
+@orchestrator.on_interval(period=REQUEST_CHECK_S)
+async def prune_state(ctx: Context):
+    expired = STATE.expire()
+    if expired or len(STATE):
+        ctx.logger.info(f"Request state ({expired} expired): {STATE.stats()}")
+
 # -----------------------------------------------------------------------------
 # ✅ Chat Protocol Handlers
 # -----------------------------------------------------------------------------
@@ -253,7 +386,7 @@ async def on_chat_message(ctx: Context, sender: str, msg: ChatMessage):
             try:
                 # Parse user request
                 requirements = parse_user_requirements(user_text)
-                STATE[request_id] = {"user": sender, "requirements": requirements}
+                st = STATE.create(request_id, user=sender, requirements=requirements)
 
                 # Notify UI (SSE)
                 await notify(request_id, "✅ Request accepted by Orchestrator")
@@ -273,8 +406,11 @@ async def on_chat_message(ctx: Context, sender: str, msg: ChatMessage):
                     min_ram_gb=requirements['min_ram'],
                     min_storage_gb=requirements['min_storage'],
                     preferred_brand=requirements['preferred_brand'],
-                    prefer_performance=requirements['prefer_performance']
+                    prefer_performance=requirements['prefer_performance'],
+                    wire_format="compact" if compact_wire() else "full",
+                    chunk_size=STREAM_CHUNK_SIZE or None,
                 )
+                st["procurement"] = procurement_req
 
                 # UX feedback
                 await ctx.send(sender, mk_text_chat(
@@ -288,7 +424,7 @@ async def on_chat_message(ctx: Context, sender: str, msg: ChatMessage):
 
                 # Send to Scout
                 print("📤 Sending ProcurementRequest to Scout")
-                await ctx.send(SCOUT_ADDR, procurement_req)
+                await send_stage(ctx, SCOUTS, request_id, procurement_req)
                 print("✅ Request sent to Scout")
 
             except Exception as e:
@@ -307,105 +443,305 @@ async def on_chat_ack(ctx: Context, sender: str, msg: ChatAcknowledgement):
 async def on_chat_ack(ctx: Context, sender: str, msg: ChatAcknowledgement):
     print(f"✅ ACK received from {sender}")
 
+# -----------------------------------------------------------------------------
+# ✅ Stage requests (compact: ids + catalog_version + score columns; full: rows)
+# -----------------------------------------------------------------------------
+def chunk_fields(st: Dict, chunk: Optional[int]) -> dict:
+    """Chunk fields of a stage request; the last chunk carries the count once Scout has sent it."""
+    if chunk is None:
+        return {}
+    final = st.get("total_chunks") == chunk + 1
+    return {"chunk_index": chunk, "final": final, "total_chunks": st["total_chunks"] if final else None}
+
+
+def compute_request(st: Dict, request_id: str, compact: bool, chunk: Optional[int] = None) -> LaptopEvaluationRequest:
+    requirements = st.get("requirements", {})
+    laptops = st.get("chunks", {}).get(chunk, [])
+    payload = {"laptop_ids": [l.id for l in laptops], **dominance_column(laptops)} if compact else {"laptops": laptops}
+    return LaptopEvaluationRequest(
+        request_id=request_id,
+        use_case=requirements.get('use_case', 'office-work'),
+        quantity=requirements.get('quantity', 10),
+        max_budget=requirements.get('budget', 1500.0),
+        prefer_performance=requirements.get('prefer_performance', True),
+        catalog_version=st.get("catalog_version"),
+        **chunk_fields(st, chunk),
+        **payload,
+    )
+
+
+def eval_request(st: Dict, request_id: str, compact: bool, phase: str = "full",
+                 chunk: Optional[int] = None) -> LaptopEvaluationRequest:
+    requirements = st.get("requirements", {})
+    if phase == "symbolic":
+        laptops = st.get("chunks", {}).get(chunk, [])
+        payload = {"laptop_ids": [l.id for l in laptops], **dominance_column(laptops)} if compact else {"laptops": laptops}
+    else:
+        scored = st.get("scored", {}).get(chunk, [])
+        payload = (
+            {**score_columns(scored), **dominance_column([s.base for s in scored])} if compact
+            else {"scored_laptops": scored}
+        )
+    return LaptopEvaluationRequest(
+        request_id=request_id,
+        use_case=requirements['use_case'],
+        quantity=requirements['quantity'],
+        max_budget=requirements['budget'],
+        prefer_performance=requirements['prefer_performance'],
+        top_k=EVAL_TOP_K,
+        skyband_k=SKYLINE_K if SKYLINE_K > 0 else None,
+        catalog_version=st.get("catalog_version"),
+        phase=phase,
+        **chunk_fields(st, chunk),
+        **payload,
+    )
+
+
+async def resend_evaluation(ctx: Context, st: Dict, request_id: str):
+    """Start the request's evaluation over in full form (every chunk, on one newly picked Evaluator)."""
+    st["evaluating"] = False
+    st["followups"] = {}
+    for chunk in list(st.get("chunks", {})):
+        if chunk in st.get("scored", {}):
+            await to_evaluator(ctx, st, request_id, eval_request(st, request_id, False, "full", chunk))
+        elif st.get("fanout"):
+            await to_evaluator(ctx, st, request_id, eval_request(st, request_id, False, "symbolic", chunk))
+
+
+def nego_request(st: Dict, request_id: str, compact: bool) -> BulkNegotiationRequest:
+    requirements = st.get("requirements", {})
+    top: ScoredLaptop = st["ranked"][0]
+    payload = (
+        {"laptop_id": top.laptop.id, "catalog_version": st.get("catalog_version")} if compact
+        else {"top_pick": top}
+    )
+    return BulkNegotiationRequest(
+        request_id=request_id,
+        quantity=requirements.get('quantity', 10),
+        target_price_per_unit=requirements.get('budget'),
+        **payload,
+    )
+
+
+def use_compact(st: Dict) -> bool:
+    return compact_wire() and bool(st.get("catalog_version"))
+
+
 # -----------------------------------------------------------------------------
 # ✅ Wire Protocol: Inter-Agent Communication
 # -----------------------------------------------------------------------------
 @wire_proto.on_message(LaptopResponse)
 async def on_laptop_response(ctx: Context, sender: str, msg: LaptopResponse):
-    print(f"\n💻 Received LaptopResponse (Scout)")
-    st = STATE.get(msg.request_id, {})
+    chunk = msg.chunk_index
+    print(f"\n💻 Received LaptopResponse (Scout)" + ("" if chunk is None else f" — chunk {chunk}"))
+    if chunk is not None and not msg.final:
+        SCOUTS.touch(msg.request_id)  # the stream is alive: more chunks to come
+    elif not SCOUTS.complete(msg.request_id, sender):
+        print("↩️  Late duplicate from a re-dispatched replica — ignored")
+        return
+    st = live_state(msg.request_id, "negotiating")
+    if st is None:
+        return
     user = st.get("user")
-    requirements = st.get("requirements", {})
+    chunks = st.setdefault("chunks", {})
+    if chunk in chunks:
+        print(f"↩️  Chunk {chunk} already received — ignored")
+        return
 
-    if not msg.laptops:
+    candidates = msg.laptops
+    if not candidates and msg.laptop_ids:
+        candidates = await resolver().laptops(msg.catalog_version, msg.laptop_ids)
+        if candidates is None:
+            procurement = st.get("procurement")
+            if procurement is not None and procurement.wire_format != "full":
+                await notify(msg.request_id, f"🔁 Catalog {msg.catalog_version} not resolvable here — asking Scout for full rows")
+                st["procurement"] = procurement.copy(update={"wire_format": "full"})
+                await send_stage(ctx, SCOUTS, msg.request_id, st["procurement"])
+            return
+
+    if chunk is not None and msg.final:
+        st["total_chunks"] = msg.total_chunks
+    st["catalog_version"] = msg.catalog_version
+
+    found = len(candidates) if chunk is None else msg.total_candidates
+    if (chunk is None or msg.final) and not found:
         if user:
             await ctx.send(user, mk_text_chat("❌ No laptops found matching your criteria."))
         await notify(msg.request_id, "❌ Scout found 0 candidates — stopping.", error=True)
+        STATE.finish(msg.request_id, ok=False)
         return
 
-    st["laptops"] = msg.laptops
-    STATE[msg.request_id] = st
+    if chunk is None:
+        await notify(msg.request_id, f"📦 Scout Agent found {len(candidates)} candidates from OCEAN data (mocked). Forwarding to Compute…")
+    else:
+        await notify(msg.request_id, f"📦 Scout chunk {chunk}: {len(candidates)} candidates. Forwarding to Compute…")
+        if msg.final:
+            await notify(msg.request_id, f"📦 Scout Agent found {found} candidates in {msg.total_chunks} chunks from OCEAN data (mocked)")
+
+    # ---------- Skyline: dominated candidates can never reach the top-K ----------
+    # (streamed: each chunk is checked against every candidate seen so far)
+    laptops = candidates
+    if SKYLINE_K > 0 and candidates:
+        skyline = st.setdefault("skyline", SkybandStream(SKYLINE_K))
+        rows, counts = skyline.add(candidates)
+        laptops = [candidates[i].copy(update={"dominance_count": c}) for i, c in zip(rows, counts)]
+        await notify(
+            msg.request_id,
+            f"🏔️ Skyline kept {len(laptops)}/{len(candidates)} candidates "
+            f"(dropped {len(candidates) - len(laptops)} dominated by ≥{SKYLINE_K} others)",
+        )
 
-    await notify(msg.request_id, f"📦 Scout Agent found {len(msg.laptops)} candidates from OCEAN data (mocked). Forwarding to Compute…")
-    if user:
+    chunks[chunk] = laptops
+    if chunk is None or len(chunks) == st.get("total_chunks"):
+        STATE.discard(msg.request_id, "skyline", "procurement")  # Scout is done
+
+    if user and chunk is None:
         await ctx.send(user, mk_text_chat(
-            f"📦 Scout found {len(msg.laptops)} candidates. Forwarding to ComputeAgent for CUDOS scoring (mocked)..."
+            f"📦 Scout found {len(candidates)} candidates ({len(laptops)} non-dominated). "
+            "Forwarding to ComputeAgent for CUDOS scoring (mocked)..."
+        ))
+    elif user and len(chunks) == 1:
+        await ctx.send(user, mk_text_chat(
+            "📦 Scout is streaming candidates — each chunk goes to ComputeAgent for CUDOS scoring (mocked) as it arrives..."
         ))
 
-    print(f"📤 Forwarding to ComputeAgent for CUDOS scoring")
-    await ctx.send(COMPUTE_ADDR, LaptopEvaluationRequest(
-        request_id=msg.request_id,
-        laptops=msg.laptops,
-        use_case=requirements.get('use_case', 'office-work'),
-        quantity=requirements.get('quantity', 10),
-        max_budget=requirements.get('budget', 1500.0),
-        prefer_performance=requirements.get('prefer_performance', True)
-    ))
-    print("✅ Sent to ComputeAgent")
+    first = len(chunks) == 1
+    if first and EVAL_FANOUT:
+        # Symbolic scoring needs only the candidates: run it while Compute works
+        st["fanout"] = True
+
+    if laptops:
+        STATE.advance(msg.request_id, "computing")
+        print(f"📤 Forwarding to ComputeAgent for CUDOS scoring")
+        await send_stage(ctx, COMPUTES, chunk_key(msg.request_id, chunk), compute_request(st, msg.request_id, use_compact(st), chunk))
+        print("✅ Sent to ComputeAgent")
+    elif not st.get("fanout"):
+        # An empty chunk still counts towards the Evaluator's total
+        st.setdefault("scored", {})[chunk] = []
+        await to_evaluator(ctx, st, msg.request_id, eval_request(st, msg.request_id, use_compact(st), "full", chunk))
+
+    if st.get("fanout"):
+        await to_evaluator(ctx, st, msg.request_id, eval_request(st, msg.request_id, use_compact(st), "symbolic", chunk))
+        if first:
+            await notify(msg.request_id, "🔀 Evaluator started the symbolic phase alongside Compute")
 
 @wire_proto.on_message(LaptopScoredResponse)
 async def on_scored_laptops(ctx: Context, sender: str, msg: LaptopScoredResponse):
-    print(f"\n📈 Received LaptopScoredResponse (ComputeAgent)")
-    st = STATE.get(msg.request_id, {})
-    requirements = st.get("requirements", {})
+    chunk = msg.chunk_index
+    print(f"\n📈 Received LaptopScoredResponse (ComputeAgent)" + ("" if chunk is None else f" — chunk {chunk}"))
+    if not COMPUTES.complete(chunk_key(msg.request_id, chunk), sender):
+        print("↩️  Late duplicate from a re-dispatched replica — ignored")
+        return
+    st = live_state(msg.request_id, "negotiating")
+    if st is None:
+        return
     user = st.get("user")
 
-    if not msg.laptops:
+    scored = msg.laptops
+    if not scored and msg.laptop_ids:
+        by_id = {l.id: l for l in st.get("chunks", {}).get(chunk, [])}
+        if any(laptop_id not in by_id for laptop_id in msg.laptop_ids):
+            print("⚠️ Compute replied with unknown laptop ids — resending full rows")
+            await send_stage(ctx, COMPUTES, chunk_key(msg.request_id, chunk), compute_request(st, msg.request_id, False, chunk))
+            return
+        scored = scored_options([by_id[laptop_id] for laptop_id in msg.laptop_ids], msg)
+    st.setdefault("scored", {})[chunk] = scored
+
+    if chunk is not None:
+        await notify(msg.request_id, f"⚙️ Compute scored chunk {chunk} ({len(scored)} laptops). Sending to MeTTa…")
+    elif not scored:
+        if st.get("fanout"):
+            EVALUATORS.cancel(msg.request_id)  # the symbolic half's ranking is moot now
         if user:
             await ctx.send(user, mk_text_chat("❌ No viable laptops after compute scoring."))
         await notify(msg.request_id, "❌ Compute returned empty results — stopping.", error=True)
+        STATE.finish(msg.request_id, ok=False)
+        return
+    else:
+        await notify(msg.request_id, "⚙️ Compute scoring complete (processor/warranty/shipping). Sending to MeTTa…")
+        if user:
+            await ctx.send(user, mk_text_chat("🧠 Scores computed! Sending to MeTTa-based evaluation agent..."))
+
+    if st.get("fanout"):
+        # The symbolic phase is already running: hand Compute's half to the same Evaluator
+        print(f"📤 Joining Compute scores with the Evaluator's symbolic phase")
+        if await to_evaluator(ctx, st, msg.request_id, eval_request(st, msg.request_id, use_compact(st), "compute", chunk)):
+            print("✅ Sent to Evaluator")
+        else:
+            print("↩️  Evaluator already answered without Compute's scores")
         return
-
-    await notify(msg.request_id, "⚙️ Compute scoring complete (processor/warranty/shipping). Sending to MeTTa…")
-    if user:
-        await ctx.send(user, mk_text_chat("🧠 Scores computed! Sending to MeTTa-based evaluation agent..."))
 
     print(f"📤 Forwarding to Evaluator for MeTTa reasoning")
-    await ctx.send(EVAL_ADDR, LaptopEvaluationRequest(
-        request_id=msg.request_id,
-        scored_laptops=msg.laptops,  # pass full ScoredLaptopOption objects
-        use_case=requirements['use_case'],
-        quantity=requirements['quantity'],
-        max_budget=requirements['budget'],
-        prefer_performance=requirements['prefer_performance']
-    ))
+    await to_evaluator(ctx, st, msg.request_id, eval_request(st, msg.request_id, use_compact(st), "full", chunk))
     print("✅ Sent to Evaluator")
 
+
+async def on_provisional_result(msg: LaptopEvaluationResult, st: Dict):
+    """Running top-K of a streamed request: shown as it improves; negotiation waits for the final one."""
+    EVALUATORS.touch(msg.request_id)
+    ranked = msg.ranked
+    if not ranked and msg.ranked_ids:
+        ranked = expand_ranked(msg, candidates_by_id(st)) or []
+    await notify(
+        msg.request_id,
+        f"⏳ Provisional top {min(len(ranked), 3)} after {msg.chunks_done} chunks ({msg.total_candidates} candidates so far):",
+    )
+    for i, sl in enumerate(ranked[:3], 1):
+        await notify(msg.request_id, f"   {i}. {sl.laptop.model} → {sl.score:.3f}")
+
+
 @wire_proto.on_message(LaptopEvaluationResult)
 async def on_eval_result(ctx: Context, sender: str, msg: LaptopEvaluationResult):
-    print(f"\n📊 Received LaptopEvaluationResult")
-    st = STATE.get(msg.request_id, {})
-    st["ranked"] = msg.ranked
-    STATE[msg.request_id] = st
+    print(f"\n📊 Received LaptopEvaluationResult" + ("" if msg.final else f" (provisional, {msg.chunks_done} chunks)"))
+    if not msg.final:
+        st = live_state(msg.request_id, "negotiating")
+        if st is not None:
+            await on_provisional_result(msg, st)
+        return
+    if not EVALUATORS.complete(msg.request_id, sender):
+        print("↩️  Late duplicate from a re-dispatched replica — ignored")
+        return
+    st = live_state(msg.request_id, "negotiating")
+    if st is None:
+        return
+    ranked = msg.ranked
+    if not ranked and msg.ranked_ids:
+        ranked = expand_ranked(msg, candidates_by_id(st))
+        if ranked is None:
+            print("⚠️ Evaluator ranked unknown laptop ids — resending full rows")
+            await resend_evaluation(ctx, st, msg.request_id)
+            return
+    st["ranked"] = ranked
 
     # Notify hybrid breakdown (top 3)
-    await notify(msg.request_id, "🧩 Hybrid evaluation ready (MeTTa ⊕ Compute ⊕ Value). Top 3:")
-    for i, sl in enumerate(msg.ranked[:3], 1):
-        metta_used = "metta" in (sl.rationale or "").lower()
+    total = msg.total_candidates if msg.total_candidates is not None else len(ranked)
+    await notify(msg.request_id, f"🧩 Hybrid evaluation ready (MeTTa ⊕ Compute ⊕ Value) over {total} candidates. Top 3:")
+    for i, sl in enumerate(ranked[:3], 1):
+        engine = {"metta": "MeTTa✓", "compiled": "MeTTa⚡compiled"}.get(sl.score_engine, "fallback")
         line = (
             f"   {i}. {sl.laptop.model} → "
             f"symbolic={getattr(sl, 'symbolic_score', 0):.3f}, "
             f"compute={getattr(sl, 'compute_score', 0):.3f}, "
             f"value={getattr(sl, 'value_score', 0):.3f} "
             f"→ final={sl.score:.3f} "
-            f"| {'MeTTa✓' if metta_used else 'fallback'}"
+            f"| {engine}"
         )
         await notify(msg.request_id, line)
 
     user = st.get("user")
-    requirements = st.get("requirements", {})
 
-    if not msg.ranked:
+    if not ranked:
         if user:
             await ctx.send(user, mk_text_chat("❌ No suitable laptops found."))
         await notify(msg.request_id, "❌ No suitable options after evaluation.", error=True)
+        STATE.finish(msg.request_id, ok=False)
         return
 
-    top: ScoredLaptop = msg.ranked[0]
+    top: ScoredLaptop = ranked[0]
 
     if user:
         top3_summary = "Metta Evaulation Complete! Hybrid scored between compute, value, and symbolic scores and found 🏆 **Top 3 Laptops:**\n\n"
-        for i, sl in enumerate(msg.ranked[:3], 1):
+        for i, sl in enumerate(ranked[:3], 1):
             top3_summary += (
                 f"{i}. **{sl.laptop.model}** by {sl.laptop.brand}\n"
                 f"   • Price: ${sl.laptop.price}\n"
@@ -418,18 +754,21 @@ async def on_eval_result(ctx: Context, sender: str, msg: LaptopEvaluationResult)
 
     await notify(msg.request_id, f"🤝 Sending top choice to Negotiator: {top.laptop.model}")
 
+    # Only the top pick is read from here on
+    st["ranked"] = ranked[:1]
+    STATE.discard(msg.request_id, "chunks", "scored", "followups")
+    STATE.advance(msg.request_id, "negotiating")
+
     print(f"📤 Sending to Negotiator")
-    await ctx.send(NEGO_ADDR, BulkNegotiationRequest(
-        request_id=msg.request_id,
-        top_pick=top,
-        quantity=requirements.get('quantity', 10),
-        target_price_per_unit=requirements.get('budget')
-    ))
+    await send_stage(ctx, NEGOTIATORS, msg.request_id, nego_request(st, msg.request_id, use_compact(st)))
     print("✅ Sent to Negotiator")
 
 @wire_proto.on_message(BulkNegotiationResult)
 async def on_nego_result(ctx: Context, sender: str, msg: BulkNegotiationResult):
     print(f"\n🤝 Received BulkNegotiationResult")
+    if not NEGOTIATORS.complete(msg.request_id, sender):
+        print("↩️  Late duplicate from a re-dispatched replica — ignored")
+        return
     st = STATE.get(msg.request_id, {})
     user = st.get("user")
     ranked = st.get("ranked", [])
@@ -488,24 +827,65 @@ async def on_nego_result(ctx: Context, sender: str, msg: BulkNegotiationResult):
         await notify(msg.request_id, f"❌ Negotiation failed: {msg.note}", error=True)
 
     await ctx.send(user, mk_text_chat(summary))
+    STATE.finish(msg.request_id, ok=msg.accepted)
     print("✅ Final result sent to user")
 
+@wire_proto.on_message(PayloadRejected)
+async def on_payload_rejected(ctx: Context, sender: str, msg: PayloadRejected):
+    """A stage could not resolve a compact payload: resend the same request in full form."""
+    print(f"\n🔁 {msg.stage} rejected compact payload for {msg.request_id}: {msg.reason}")
+    st = live_state(msg.request_id, "done" if msg.stage == "negotiator" else "negotiating")
+    if msg.stage not in ("compute", "evaluator", "negotiator") or st is None:
+        await notify(msg.request_id, f"❌ {msg.stage} rejected its payload: {msg.reason}", error=True)
+        return
+    chunk = msg.chunk_index
+    if msg.stage == "compute":
+        key = chunk_key(msg.request_id, chunk)
+        if not COMPUTES.complete(key, sender):
+            return
+        await send_stage(ctx, COMPUTES, key, compute_request(st, msg.request_id, False, chunk))
+    elif msg.stage == "negotiator":
+        if not NEGOTIATORS.complete(msg.request_id, sender):
+            return
+        await send_stage(ctx, NEGOTIATORS, msg.request_id, nego_request(st, msg.request_id, False))
+    else:
+        phase = "symbolic" if msg.phase == "symbolic" else "full"  # a lone compute half is resent whole
+        message = eval_request(st, msg.request_id, False, phase, chunk)
+        if chunk is not None:
+            # The replica holds the request's running top-K: resend just this chunk, to it
+            await to_evaluator(ctx, st, msg.request_id, message)
+        else:
+            if not EVALUATORS.complete(msg.request_id, sender):
+                return
+            if phase == "full":
+                st["followups"] = {}
+            await send_stage(ctx, EVALUATORS, msg.request_id, message)
+            await replay_followups(ctx, msg.request_id)
+    await notify(msg.request_id, f"🔁 {msg.stage} could not resolve catalog rows ({msg.reason}) — resending in full")
+
 # -----------------------------------------------------------------------------
 # ✅ Register & Run
 # -----------------------------------------------------------------------------
-fund_agent_if_low(orchestrator.wallet.address())
 orchestrator.include(chat_proto, publish_manifest=True)
 orchestrator.include(wire_proto, publish_manifest=True)
 
+if PIPELINE_MODE == "fused":
+    PIPELINE = fused_pipeline(orchestrator, {
+        LaptopResponse: on_laptop_response,
+        LaptopScoredResponse: on_scored_laptops,
+        LaptopEvaluationResult: on_eval_result,
+        BulkNegotiationResult: on_nego_result,
+        PayloadRejected: on_payload_rejected,
+    })
+
 if __name__ == "__main__":
+    fund_agent_if_low(orchestrator.wallet.address())
     print("\n🎬 Starting Laptop Procurement Orchestrator...")
     print("=" * 80)
     print(f"🌐 Endpoint: {PUBLIC_URL}/submit")
     print(f"🔔 NOTIFY_URL: {NOTIFY_URL}")
     print("Downstream agent addresses:")
-    print(f"  • SCOUT_ADDR   = {SCOUT_ADDR}")
-    print(f"  • COMPUTE_ADDR = {COMPUTE_ADDR}")
-    print(f"  • EVAL_ADDR    = {EVAL_ADDR}")
-    print(f"  • NEGO_ADDR    = {NEGO_ADDR}")
+    for stage in STAGES:
+        print(f"  • {stage.name:<10} = {'in-process (fused)' if PIPELINE else ', '.join(stage.addresses)}")
     print("=" * 80)
     orchestrator.run()
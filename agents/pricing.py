@@ -0,0 +1,38 @@
+# agents/pricing.py — Bulk-tier discount rules shared by the Negotiator and the sweep API
+#
+# A laptop's `bulk_pricing` is a list of (min_qty, discount_pct) tiers; the
+# applicable tier is the one with the largest min_qty the quantity reaches.
+
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+
+
+def _tier(t):
+    return (t["min_qty"], t["discount_pct"]) if isinstance(t, dict) else (t.min_qty, t.discount_pct)
+
+
+def bulk_discount_pct(bulk_pricing: Iterable, quantity: int) -> float:
+    """Discount % for `quantity` units (BulkPricing models or plain dicts)."""
+    for min_qty, pct in sorted((_tier(t) for t in bulk_pricing), key=lambda x: x[0], reverse=True):
+        if quantity >= min_qty:
+            return pct
+    return 0.0
+
+
+def discount_matrix(tiers_per_row: Sequence[Iterable], quantities) -> np.ndarray:
+    """(rows × quantities) discount % array; same tier choice as `bulk_discount_pct`."""
+    quantities = np.asarray(quantities)
+    out = np.zeros((len(tiers_per_row), len(quantities)))
+    for r, tiers in enumerate(tiers_per_row):
+        # first tier wins among equal min_qty, as in the descending stable sort above
+        by_qty: Dict[int, float] = {}
+        for min_qty, pct in (_tier(t) for t in tiers):
+            by_qty.setdefault(min_qty, pct)
+        if not by_qty:
+            continue
+        thresholds = np.array(sorted(by_qty))
+        pcts = np.array([by_qty[q] for q in thresholds], dtype=float)
+        idx = np.searchsorted(thresholds, quantities, side="right") - 1
+        out[r] = np.where(idx >= 0, pcts[np.maximum(idx, 0)], 0.0)
+    return out
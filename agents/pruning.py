@@ -0,0 +1,63 @@
+# agents/pruning.py — Exact top-K with expensive scoring limited to contenders
+#
+# Each candidate has a cheap upper bound on its final score. Candidates are
+# scored exactly in descending-bound order, a batch at a time; once the K-th
+# best exact score so far beats every remaining bound, the rest cannot reach
+# the top-K and are never scored.
+
+import heapq
+from typing import Awaitable, Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+
+async def bounded_top_k(
+    upper: np.ndarray,
+    k: int,
+    score_rows: Callable[[Sequence[int]], Awaitable[Sequence[float]]],
+    batch_size: int = 16,
+) -> Tuple[Dict[int, float], dict]:
+    """
+    Exact final scores (row → score) for every row that could be in the top-K,
+    plus pruning stats. A row is only skipped when its bound is strictly below
+    the K-th best exact score, so ties are still scored. If an exact score ever
+    exceeds its own bound the bounds are not trusted and everything left is scored.
+    Non-finite bounds (NaN, ±inf) count as unbounded, so those rows are always scored.
+    """
+    upper = np.asarray(upper, dtype=float)
+    upper = np.where(np.isfinite(upper), upper, np.inf)
+    n = len(upper)
+    exact: Dict[int, float] = {}
+    rounds = 0
+    violations = 0
+    if k > 0:
+        order = np.argsort(-upper, kind="stable")
+        best: list = []  # min-heap of the k largest exact scores
+        pos = 0
+        while pos < n:
+            threshold = best[0] if len(best) >= k and not violations else -np.inf
+            end = pos
+            limit = n if violations else min(n, pos + max(batch_size, k))
+            while end < limit and upper[order[end]] >= threshold:
+                end += 1
+            if end == pos:
+                break  # bounds are sorted: nothing left can reach the top-K
+            batch = order[pos:end].tolist()
+            finals = await score_rows(batch)
+            rounds += 1
+            for i, f in zip(batch, finals):
+                exact[i] = float(f)
+                if f > upper[i]:
+                    violations += 1
+                if len(best) < k:
+                    heapq.heappush(best, float(f))
+                elif f > best[0]:
+                    heapq.heapreplace(best, float(f))
+            pos = end
+    return exact, {
+        "candidates": n,
+        "scored": len(exact),
+        "pruned": n - len(exact),
+        "rounds": rounds,
+        "bound_violations": violations,
+    }
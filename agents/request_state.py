@@ -0,0 +1,192 @@
+# agents/request_state.py — Bounded per-request orchestration state
+#
+# The orchestrator keeps a state dict per request_id while the request moves
+# through Scout → Compute → Evaluator → Negotiator. Each entry records a
+# lifecycle phase. Finished entries (done / failed) are kept briefly for late
+# replies, unfinished ones expire once the pipeline has gone quiet on them,
+# and past `max_entries` finished entries are evicted first, least recently
+# used first.
+
+import sys
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterable, Optional
+
+PHASES = ("scouting", "computing", "evaluating", "negotiating", "done", "failed")
+TERMINAL = ("done", "failed")
+
+
+def approx_size(obj, _seen: Optional[set] = None) -> int:
+    """Rough deep size in bytes (containers, pydantic models and plain objects are followed)."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k, seen) + approx_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += approx_size(vars(obj), seen)
+    return size
+
+
+class _Entry:
+    __slots__ = ("state", "phase", "created_at", "touched_at", "size")
+
+    def __init__(self, state: Dict):
+        self.state = state
+        self.phase = PHASES[0]
+        self.created_at = self.touched_at = time.monotonic()
+        self.size = 0  # approx_size(state) when last measured
+
+
+class RequestStateStore:
+    """
+    request_id → state dict. `get` refreshes an entry's TTL and LRU position,
+    `advance` moves it forward through PHASES, `finish` ends it (keeping only
+    `keep` keys); `expire` drops entries past their TTL.
+
+    Active and finished entries live in separate OrderedDicts kept in
+    touched_at order, so expiry and eviction only ever look at the oldest end.
+    The state size is a running total: callers write into the dicts handed out
+    by `create` / `get`, so those entries are marked stale and `stats` re-measures
+    at most `remeasure` of them per call.
+    """
+
+    def __init__(self, ttl_s: float = 900.0, done_ttl_s: float = 120.0, max_entries: int = 10_000,
+                 remeasure: int = 64):
+        self.ttl_s = ttl_s
+        self.done_ttl_s = done_ttl_s
+        self.max_entries = max_entries
+        self.remeasure = remeasure
+        self._active: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._terminal: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._stale: "OrderedDict[str, None]" = OrderedDict()  # entries whose size may have changed
+        self._bytes = 0
+        self._by_phase = {phase: 0 for phase in PHASES}
+        self.created = 0
+        self.finished = {phase: 0 for phase in TERMINAL}
+        self.evicted = {"ttl": 0, "lru": 0}
+
+    def __len__(self) -> int:
+        return len(self._active) + len(self._terminal)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._active or request_id in self._terminal
+
+    def _entry(self, request_id: str) -> Optional[_Entry]:
+        entry = self._active.get(request_id)
+        return self._terminal.get(request_id) if entry is None else entry
+
+    def _bucket(self, entry: _Entry) -> "OrderedDict[str, _Entry]":
+        return self._terminal if entry.phase in TERMINAL else self._active
+
+    def _measure(self, request_id: str, entry: _Entry) -> None:
+        size = approx_size(entry.state)
+        self._bytes += size - entry.size
+        entry.size = size
+        self._stale.pop(request_id, None)
+
+    def _remove(self, request_id: str, entry: _Entry) -> None:
+        del self._bucket(entry)[request_id]
+        self._stale.pop(request_id, None)
+        self._bytes -= entry.size
+        self._by_phase[entry.phase] -= 1
+
+    def create(self, request_id: str, **state) -> Dict:
+        old = self._entry(request_id)
+        if old is not None:
+            self._remove(request_id, old)
+        self._active[request_id] = entry = _Entry(state)
+        self._by_phase[entry.phase] += 1
+        self._measure(request_id, entry)
+        self._stale[request_id] = None  # the caller fills it in
+        self.created += 1
+        self._evict_lru()
+        return entry.state
+
+    def get(self, request_id: str, default=None):
+        entry = self._entry(request_id)
+        if entry is None:
+            return default
+        entry.touched_at = time.monotonic()
+        self._bucket(entry).move_to_end(request_id)
+        self._stale[request_id] = None
+        return entry.state
+
+    def phase(self, request_id: str) -> Optional[str]:
+        entry = self._entry(request_id)
+        return None if entry is None else entry.phase
+
+    def advance(self, request_id: str, phase: str) -> None:
+        """Move to `phase` unless the request is already there or further (phases overlap when streaming)."""
+        entry = self._active.get(request_id)
+        if entry is not None and PHASES.index(phase) > PHASES.index(entry.phase):
+            self._by_phase[entry.phase] -= 1
+            self._by_phase[phase] += 1
+            entry.phase = phase
+            if phase in TERMINAL:
+                self._terminal[request_id] = self._active.pop(request_id)
+
+    def finish(self, request_id: str, ok: bool = True, keep: Iterable[str] = ("user", "requirements")) -> None:
+        """Mark the request done / failed and drop all state except `keep`."""
+        entry = self._active.pop(request_id, None)
+        if entry is None:
+            return
+        self._by_phase[entry.phase] -= 1
+        entry.phase = "done" if ok else "failed"
+        self._by_phase[entry.phase] += 1
+        entry.state = {k: v for k, v in entry.state.items() if k in keep}
+        entry.touched_at = time.monotonic()
+        self._terminal[request_id] = entry
+        self._measure(request_id, entry)
+        self.finished[entry.phase] += 1
+
+    def discard(self, request_id: str, *keys: str) -> None:
+        """Drop state keys no later stage will read."""
+        entry = self._entry(request_id)
+        if entry is not None:
+            for key in keys:
+                entry.state.pop(key, None)
+            self._stale[request_id] = None
+
+    def _evict_lru(self) -> None:
+        while len(self) > self.max_entries:
+            # finished entries go first; only then the least recently used active one
+            bucket = self._terminal or self._active
+            request_id, entry = next(iter(bucket.items()))
+            self._remove(request_id, entry)
+            self.evicted["lru"] += 1
+
+    def expire(self) -> int:
+        """Drop finished entries idle for `done_ttl_s` and unfinished ones idle for `ttl_s`."""
+        now = time.monotonic()
+        dropped = 0
+        for bucket, ttl_s in ((self._terminal, self.done_ttl_s), (self._active, self.ttl_s)):
+            while bucket:
+                request_id, entry = next(iter(bucket.items()))
+                if now - entry.touched_at < ttl_s:
+                    break
+                self._remove(request_id, entry)
+                dropped += 1
+        self.evicted["ttl"] += dropped
+        return dropped
+
+    def stats(self, measure: bool = True) -> dict:
+        stats = {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "by_phase": dict(self._by_phase),
+            "created": self.created,
+            "finished": dict(self.finished),
+            "evicted": dict(self.evicted),
+        }
+        if measure:
+            for request_id in list(islice(self._stale, self.remeasure)):
+                self._measure(request_id, self._entry(request_id))
+            stats["approx_bytes"] = self._bytes
+            stats["stale_sizes"] = len(self._stale)
+        return stats
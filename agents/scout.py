@@ -2,11 +2,12 @@ import os
 import httpx
 import random
 import datetime
-from typing import List
+from typing import List, Optional
 
 from uagents import Agent, Context, Protocol
 from uagents.setup import fund_agent_if_low
 from agents.messages import ProcurementRequest, LaptopResponse, LaptopOption
+from agents.catalog_feed import BUDGET_TOLERANCE, CatalogReplica, filter_rows, stream_candidates
 
 # ------------------------------------------------------------------------------
 # ✅ Environment-driven configuration
@@ -14,22 +15,34 @@ from agents.messages import ProcurementRequest, LaptopResponse, LaptopOption
 PORT = int(os.getenv("PORT", "8000"))
 PUBLIC_URL = os.getenv("PUBLIC_URL", f"http://127.0.0.1:{PORT}")
 FASTAPI_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:9000/api/laptops")
+FASTAPI_QUERY_URL = os.getenv("FASTAPI_QUERY_URL", f"{FASTAPI_URL}/query")
+FASTAPI_STREAM_URL = os.getenv("FASTAPI_STREAM_URL", f"{FASTAPI_URL}/stream")
+# "query": push filters down to the indexed endpoint
+# "stream": filter the NDJSON feed incrementally as rows arrive
+# "replica": filter a local, conditionally-refreshed copy of the catalog in memory
+CATALOG_MODE = os.getenv("SCOUT_CATALOG_MODE", "query")
+REPLICA_TTL_S = float(os.getenv("SCOUT_REPLICA_TTL_S", "30"))
 NOTIFY_URL = os.getenv("NOTIFY_URL", "http://127.0.0.1:9000/api/notify")
 AGENT_MNEMONIC = os.getenv("AGENT_MNEMONIC")  # optional stable identity
 
 # ------------------------------------------------------------------------------
-# ✅ Agent Setup
+# ✅ Protocol (the Agent itself is only built when run standalone, see bottom)
 # ------------------------------------------------------------------------------
-scout = Agent(
-    name="scout_agent",
-    port=PORT,
-    endpoint=f"{PUBLIC_URL}/submit",
-    mailbox=True,
-    seed=AGENT_MNEMONIC,
-)
-
 proto = Protocol(name="scout_protocol")
 
+# One pooled client for catalog traffic instead of a new connection per request
+_http: Optional[httpx.AsyncClient] = None
+
+
+def http_client() -> httpx.AsyncClient:
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=30)
+    return _http
+
+
+replica = CatalogReplica(FASTAPI_URL, ttl_s=REPLICA_TTL_S, client_factory=http_client)
+
 
 # ------------------------------------------------------------------------------
 # ✅ SSE Notify Helper
@@ -60,6 +73,58 @@ def generate_ocean_metadata():
     }
 
 
+# ------------------------------------------------------------------------------
+# ✅ Candidate replies (one LaptopResponse, or chunks as candidates are found)
+# ------------------------------------------------------------------------------
+class CandidateChunks:
+    """
+    Sends a request's candidates back as they are found: a LaptopResponse
+    chunk every `msg.chunk_size` candidates and a final one with the totals,
+    or a single unchunked reply when the request did not ask for chunks.
+    """
+
+    def __init__(self, ctx: Context, sender: str, msg: ProcurementRequest):
+        self.ctx = ctx
+        self.sender = sender
+        self.msg = msg
+        self.size = msg.chunk_size if msg.chunk_size and msg.chunk_size > 0 else None
+        self.catalog_version: Optional[str] = None
+        self.buffer: List[LaptopOption] = []
+        self.chunks = 0
+        self.total = 0
+
+    def _reply(self, laptops: List[LaptopOption], **chunk) -> LaptopResponse:
+        if self.msg.wire_format == "compact" and self.catalog_version:
+            # Orchestrator resolves the rows from its own replica of this snapshot
+            return LaptopResponse(
+                request_id=self.msg.request_id, laptop_ids=[c.id for c in laptops],
+                catalog_version=self.catalog_version, **chunk,
+            )
+        return LaptopResponse(
+            request_id=self.msg.request_id, laptops=laptops, catalog_version=self.catalog_version, **chunk
+        )
+
+    async def _flush(self, final: bool) -> None:
+        chunk = {"chunk_index": self.chunks, "final": final}
+        if final:
+            chunk.update(total_chunks=self.chunks + 1, total_candidates=self.total)
+        await self.ctx.send(self.sender, self._reply(self.buffer, **chunk))
+        self.buffer = []
+        self.chunks += 1
+
+    async def add(self, candidate: LaptopOption) -> None:
+        self.buffer.append(candidate)
+        self.total += 1
+        if self.size and len(self.buffer) >= self.size:
+            await self._flush(final=False)
+
+    async def finish(self) -> None:
+        if self.size:
+            await self._flush(final=True)
+        else:
+            await self.ctx.send(self.sender, self._reply(self.buffer))
+
+
 # ------------------------------------------------------------------------------
 # ✅ Procurement Handler
 # ------------------------------------------------------------------------------
@@ -67,60 +132,122 @@ def generate_ocean_metadata():
 async def handle_procurement_request(ctx: Context, sender: str, msg: ProcurementRequest):
     print(f"\n🔍 [Scout] Received ProcurementRequest: {msg.request_id}")
     await notify(msg.request_id, f"🔍 Scout received procurement request (use_case={msg.use_case})")
+    reply = CandidateChunks(ctx, sender, msg)
 
     try:
-        # Step 1 — Fetch dataset
-        await notify(msg.request_id, "📡 Fetching dataset from Ocean Protocol (simulated)")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(FASTAPI_URL)
-            all_laptops = response.json().get("laptops", [])
-
         ocean_meta = generate_ocean_metadata()
-        await notify(msg.request_id, f"📥 Retrieved {len(all_laptops)} laptops from dataset")
-
-        # Step 2 — Apply business rules & requirements
-        candidates: List[LaptopOption] = []
-        for laptop_data in all_laptops:
-            if msg.use_case not in laptop_data.get("use_cases", []):
-                continue
-            if msg.min_ram_gb and laptop_data["specs"]["ram_gb"] < msg.min_ram_gb:
-                continue
-            if msg.min_storage_gb and laptop_data["specs"]["storage_gb"] < msg.min_storage_gb:
-                continue
-            if msg.preferred_brand and laptop_data["brand"].lower() != msg.preferred_brand.lower():
-                continue
-            if laptop_data["stock"] < msg.quantity:
-                continue
-            if laptop_data["price"] > msg.max_budget_per_unit * 1.15:  # slight budget tolerance
-                continue
-
-            laptop_data["ocean_meta"] = ocean_meta
-            candidates.append(LaptopOption(**laptop_data))
-
-        print(f"✅ [Scout] Found {len(candidates)} matching candidates")
-        await notify(msg.request_id, f"✅ Scout found {len(candidates)} matching candidates")
-
-        # Step 3 — Reply to orchestrator
-        await ctx.send(sender, LaptopResponse(request_id=msg.request_id, laptops=candidates))
+
+        if CATALOG_MODE == "replica":
+            # Step 1+2 — Filter the local replica (revalidated in the background)
+            rows = await replica.get()
+            reply.catalog_version = replica.catalog_version
+            await notify(msg.request_id, f"📡 Using local dataset replica v{replica.version} ({len(rows)} laptops)")
+            for laptop_data in filter_rows(rows, msg):
+                await reply.add(LaptopOption(**{**laptop_data, "ocean_meta": ocean_meta}))
+        elif CATALOG_MODE == "stream":
+            # Step 1+2 — Stream the dataset, keeping only rows that pass the business rules
+            await notify(msg.request_id, "📡 Streaming dataset from Ocean Protocol (simulated)")
+            async for laptop_data in stream_candidates(http_client(), FASTAPI_STREAM_URL, msg):
+                laptop_data["ocean_meta"] = ocean_meta
+                await reply.add(LaptopOption(**laptop_data))
+            await notify(msg.request_id, f"📥 Streamed dataset, kept {reply.total} laptops matching requirements")
+        else:
+            # Step 1 — Push requirements down to the indexed catalog query
+            # (a page per chunk, all pages from the first page's snapshot)
+            await notify(msg.request_id, "📡 Querying dataset from Ocean Protocol (simulated)")
+            query = {
+                "use_case": msg.use_case,
+                "min_ram_gb": msg.min_ram_gb,
+                "min_storage_gb": msg.min_storage_gb,
+                "preferred_brand": msg.preferred_brand,
+                "min_stock": msg.quantity,
+                "max_price": msg.max_budget_per_unit * BUDGET_TOLERANCE,
+                "limit": reply.size,
+            }
+            offset: Optional[int] = 0
+            while offset is not None:
+                response = await http_client().post(
+                    FASTAPI_QUERY_URL, json={**query, "offset": offset, "catalog_version": reply.catalog_version}
+                )
+                response.raise_for_status()
+                data = response.json()
+                if reply.catalog_version is None:
+                    reply.catalog_version = data.get("catalog_version")
+                    matched = data.get("total_matches", len(data.get("laptops", [])))
+                    await notify(
+                        msg.request_id,
+                        f"📥 Dataset returned {matched} of {data.get('catalog_size', matched)} laptops matching requirements",
+                    )
+
+                # Step 2 — Build candidate models (business rules applied server-side)
+                for laptop_data in data.get("laptops", []):
+                    laptop_data["ocean_meta"] = ocean_meta
+                    await reply.add(LaptopOption(**laptop_data))
+                offset = data.get("next_offset")
+
+        print(f"✅ [Scout] Found {reply.total} matching candidates")
+        await notify(msg.request_id, f"✅ Scout found {reply.total} matching candidates")
+
+        # Step 3 — Reply to orchestrator (the last chunk, when streaming)
+        await reply.finish()
         await notify(msg.request_id, "📤 Scout forwarded results to orchestrator")
 
     except Exception as e:
         print(f"❌ [Scout] Error: {e}")
         await notify(msg.request_id, f"❌ Scout encountered an error: {e}", error=True)
-        await ctx.send(sender, LaptopResponse(request_id=msg.request_id, laptops=[]))
+        if reply.chunks:
+            # close the stream: chunks already sent are still ranked
+            reply.total -= len(reply.buffer)
+            reply.buffer = []
+            await reply.finish()
+        else:
+            await ctx.send(sender, LaptopResponse(request_id=msg.request_id, laptops=[]))
+
+
+# ------------------------------------------------------------------------------
+# ✅ Replica warm-up + background revalidation
+# ------------------------------------------------------------------------------
+async def warm_replica(ctx: Context):
+    if CATALOG_MODE == "replica":
+        try:
+            await replica.refresh()
+            ctx.logger.info(f"Catalog replica loaded: {len(replica.rows)} laptops (etag={replica.etag})")
+        except Exception as e:
+            ctx.logger.warning(f"Catalog replica warm-up failed: {e}")
+
+
+async def revalidate_replica(ctx: Context):
+    if CATALOG_MODE == "replica" and replica.loaded:
+        replica.refresh_in_background()
 
 
 # ------------------------------------------------------------------------------
-# ✅ Init + Register
+# ✅ Init + Register (fused mode calls the handlers above without an Agent)
 # ------------------------------------------------------------------------------
-fund_agent_if_low(scout.wallet.address())
-scout.include(proto, publish_manifest=True)
+def build_agent() -> Agent:
+    agent = Agent(
+        name="scout_agent",
+        port=PORT,
+        endpoint=f"{PUBLIC_URL}/submit",
+        mailbox=True,
+        seed=AGENT_MNEMONIC,
+    )
+    agent.on_event("startup")(warm_replica)
+    agent.on_interval(period=REPLICA_TTL_S)(revalidate_replica)
+    agent.include(proto, publish_manifest=True)
+    return agent
+
 
 if __name__ == "__main__":
+    scout = build_agent()
+    fund_agent_if_low(scout.wallet.address())
     print("🔍 Starting Scout Agent (Ocean-Simulated Laptop Dataset)...")
     print("=" * 80)
     print(f"🌐 Endpoint: {PUBLIC_URL}/submit")
     print(f"📡 FASTAPI_URL: {FASTAPI_URL}")
+    print(f"🔎 FASTAPI_QUERY_URL: {FASTAPI_QUERY_URL}")
+    print(f"🌊 FASTAPI_STREAM_URL: {FASTAPI_STREAM_URL}")
+    print(f"🧭 SCOUT_CATALOG_MODE: {CATALOG_MODE} (replica TTL {REPLICA_TTL_S}s)")
     print(f"📢 NOTIFY_URL: {NOTIFY_URL}")
     print("=" * 80)
     scout.run()
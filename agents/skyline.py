@@ -0,0 +1,107 @@
+# agents/skyline.py — K-skyband dominance filter between Scout and Compute
+#
+# Every hybrid-score input is monotone in a laptop's attributes: cheaper,
+# more RAM, better rating / review volume, longer warranty, faster shipping
+# and an RTX GPU never lower the score, and the processor decides both the
+# CPU tier and Compute's processor score. So a laptop that is matched or
+# beaten on all of those by K laptops with the same processor, each listed
+# before it (equal scores keep list order downstream), can never make the
+# top-K and is dropped before Compute / Evaluator ever see it.
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.taxonomy import gpu_info
+
+REVIEW_CAP = 500  # review signal saturates here in both kb.metta and the fallback
+
+
+def dominance_columns(laptops: Sequence, groups: Optional[dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(n × d) attributes oriented so larger is better, and a processor group id per row."""
+    groups = {} if groups is None else groups
+    group = np.array([groups.setdefault(l.specs.processor, len(groups)) for l in laptops], dtype=np.int64)
+    cols = np.array(
+        [
+            (
+                -l.price,
+                l.specs.ram_gb,
+                l.rating,
+                min(l.review_count, REVIEW_CAP),
+                l.warranty_years,
+                -l.shipping_days,
+                1.0 if gpu_info(l.specs.gpu).family == "rtx" else 0.0,
+            )
+            for l in laptops
+        ],
+        dtype=float,
+    ).reshape(len(laptops), 7)
+    return cols, group
+
+
+class SkybandStream:
+    """
+    K-skyband over candidates that arrive in chunks, in Scout order. A row's
+    dominators are always earlier rows, so a chunk is filtered against the
+    survivors of all earlier chunks and earlier survivors are never revisited.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.groups: dict = {}
+        self.seen = 0
+        self._window = np.empty((0, 7))
+        self._window_group = np.empty(0, dtype=np.int64)
+        self._window_row = np.empty(0, dtype=np.int64)
+
+    @property
+    def survivors(self) -> int:
+        return len(self._window_row)
+
+    def add(self, laptops: Sequence) -> Tuple[List[int], List[int]]:
+        """
+        Sort-filter-skyline over one chunk: its rows (chunk positions, in
+        order) dominated by fewer than `k` rows so far, and for each survivor
+        how many surviving rows dominate it.
+
+        Rows are visited by descending normalized attribute sum, so a row's
+        dominators within the chunk are visited before it; the comparison
+        window only holds survivors (a dropped dominator's own k dominators
+        also dominate).
+        """
+        n = len(laptops)
+        if self.k <= 0 or n == 0:
+            self.seen += n
+            return list(range(n)), [0] * n
+        cols, group = dominance_columns(laptops, self.groups)
+        rows = np.arange(self.seen, self.seen + n)
+        span = cols.max(axis=0) - cols.min(axis=0)
+        norm = (cols - cols.min(axis=0)) / np.where(span > 0, span, 1.0)
+        visit = np.lexsort((np.arange(n), -norm.sum(axis=1)))
+
+        size = len(self._window_row)
+        window = np.concatenate([self._window, np.empty((n, cols.shape[1]))])
+        window_group = np.concatenate([self._window_group, np.empty(n, dtype=np.int64)])
+        window_row = np.concatenate([self._window_row, np.empty(n, dtype=np.int64)])
+        counts = {}
+        for i in visit:
+            w = slice(0, size)
+            dominated = (
+                (window_group[w] == group[i])
+                & (window_row[w] < rows[i])
+                & (window[w] >= cols[i]).all(axis=1)
+            )
+            count = int(dominated.sum())
+            if count < self.k:
+                window[size], window_group[size], window_row[size] = cols[i], group[i], rows[i]
+                size += 1
+                counts[int(i)] = count
+        self._window, self._window_group, self._window_row = window[:size], window_group[:size], window_row[:size]
+        self.seen += n
+        survivors = sorted(counts)
+        return survivors, [counts[i] for i in survivors]
+
+
+def skyband(laptops: Sequence, k: int) -> Tuple[List[int], List[int]]:
+    """Rows (in original order) dominated by fewer than `k` others, with their dominance counts."""
+    return SkybandStream(k).add(laptops)
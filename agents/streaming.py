@@ -0,0 +1,78 @@
+# agents/streaming.py — Running top-K over a streamed request's candidate chunks
+#
+# A streamed request reaches the Evaluator one chunk at a time (and, with
+# fan-out, not necessarily in order). Each chunk's own top-K is merged into
+# the request's running top-K as it lands; the request is complete once all
+# `total_chunks` announced by the final chunk have been seen.
+
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+
+class RankStream:
+    """Running top-K (ties keep Scout order) plus every candidate's final score."""
+
+    def __init__(self, top_k: Optional[int]):
+        self.top_k = top_k
+        self.best: List[Tuple[float, int, int, object]] = []  # (-score, chunk, position, item)
+        self.scores: List[float] = []
+        self.retained: list = []  # what-if store rows, when retention is on
+        self.chunks: set = set()
+        self.total_chunks: Optional[int] = None
+        self.touched_at = time.monotonic()
+
+    def add(self, chunk_index: int, ranked: Sequence[Tuple[int, float, object]], scores: Sequence[float],
+            total_chunks: Optional[int] = None) -> bool:
+        """Merge a chunk's (position, score, item) ranking; False if the chunk was already merged."""
+        if chunk_index in self.chunks:
+            return False
+        self.chunks.add(chunk_index)
+        if total_chunks is not None:
+            self.total_chunks = total_chunks
+        self.scores.extend(scores)
+        merged = self.best + [(-score, chunk_index, pos, item) for pos, score, item in ranked]
+        merged.sort(key=lambda e: e[:3])
+        self.best = merged if self.top_k is None else merged[:max(0, self.top_k)]
+        self.touched_at = time.monotonic()
+        return True
+
+    @property
+    def complete(self) -> bool:
+        return self.total_chunks is not None and len(self.chunks) >= self.total_chunks
+
+    def ranked(self) -> list:
+        return [item for *_, item in self.best]
+
+
+class RankStreams:
+    """Open RankStreams by request_id; streams idle for `ttl_s` (or beyond `max_entries`) are dropped."""
+
+    def __init__(self, ttl_s: float = 300.0, max_entries: int = 10_000):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._streams: "OrderedDict[str, RankStream]" = OrderedDict()
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_s
+        while self._streams:
+            request_id, stream = next(iter(self._streams.items()))
+            if stream.touched_at > cutoff and len(self._streams) < self.max_entries:
+                break
+            del self._streams[request_id]
+            self.expired += 1
+
+    def get(self, request_id: str, top_k: Optional[int]) -> RankStream:
+        stream = self._streams.get(request_id)
+        if stream is None:
+            self._expire()
+            stream = self._streams[request_id] = RankStream(top_k)
+        self._streams.move_to_end(request_id)
+        return stream
+
+    def close(self, request_id: str) -> None:
+        self._streams.pop(request_id, None)
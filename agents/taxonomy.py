@@ -0,0 +1,179 @@
+# agents/taxonomy.py — Structured processor / GPU taxonomy shared by every scorer
+#
+# Catalog specs carry free-form strings ("Intel Core i7-12700H", "NVIDIA RTX 4060").
+# They are parsed once into structured fields and cached by raw string, so the
+# backend's CUDOS scoring, the Evaluator's fallback perf score and any other
+# consumer read the same vendor / family / tier / generation instead of each
+# running its own substring checks per laptop per request.
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+HIGH_TIER = 7  # i7 / Ryzen 7 / Core Ultra 7 / Apple Pro class and above
+
+
+# ------------------------------------------------------------------------------
+# ✅ Parsed records
+# ------------------------------------------------------------------------------
+@dataclass(frozen=True)
+class ProcessorInfo:
+    raw: str
+    vendor: Optional[str] = None      # intel | amd | apple | qualcomm
+    family: Optional[str] = None      # core | core-ultra | ryzen | m-series | snapdragon
+    tier: Optional[int] = None        # 3 / 5 / 7 / 9
+    generation: Optional[int] = None  # 12 for i7-12700H, 7 for Ryzen 9 7945HX, 2 for M2
+    variant: Optional[str] = None     # pro | max | ultra (Apple), None otherwise
+
+    @property
+    def high_tier(self) -> bool:
+        return (self.tier or 0) >= HIGH_TIER
+
+    @property
+    def vendor_named(self) -> bool:
+        """True if the vendor is spelled out in the raw string rather than implied by the family."""
+        return self.vendor is not None and self.vendor in self.raw.lower()
+
+    def covers(self, other: "ProcessorInfo") -> bool:
+        """
+        True if `other` falls under this (possibly partial) description, e.g.
+        "Intel Core i7" covers "Intel Core i7-12700H" but not "Core i7 12700H",
+        which never names the vendor. Unparsed descriptions fall back to a
+        case-insensitive substring match.
+        """
+        if self.family is None:
+            return self.raw.lower() in other.raw.lower()
+        if self.vendor_named and not other.vendor_named:
+            return False
+        return all(
+            mine is None or mine == theirs
+            for mine, theirs in (
+                (self.vendor, other.vendor),
+                (self.family, other.family),
+                (self.tier, other.tier),
+                (self.generation, other.generation),
+                (self.variant, other.variant),
+            )
+        )
+
+    @property
+    def specificity(self) -> int:
+        return sum(f is not None for f in (self.vendor, self.family, self.tier, self.generation, self.variant))
+
+
+@dataclass(frozen=True)
+class GpuInfo:
+    raw: str
+    vendor: Optional[str] = None      # nvidia | amd | intel | apple
+    family: Optional[str] = None      # rtx | gtx | radeon | iris-xe | uhd | arc | apple-gpu
+    tier: Optional[int] = None        # 60 for RTX 4060, 20 for RTX A2000, cores for Apple
+    generation: Optional[int] = None  # 40 for RTX 4060
+    discrete: bool = False
+
+
+# ------------------------------------------------------------------------------
+# ✅ Parsers
+# ------------------------------------------------------------------------------
+_INTEL_CORE = re.compile(r"core\s+i([3579])(?:[-\s]+(\d{4,5}))?", re.I)
+_INTEL_ULTRA = re.compile(r"core\s+ultra\s+([3579])(?:\s+(\d)\d{2})?", re.I)
+_RYZEN = re.compile(r"ryzen\s+([3579])(?:\s+(?:pro\s+)?(\d)\d{3})?", re.I)
+_APPLE_M = re.compile(r"\bm(\d)(?:\s+(pro|max|ultra))?\b", re.I)
+_SNAPDRAGON = re.compile(r"snapdragon\s+x\s*(elite|plus)?", re.I)
+
+_APPLE_TIERS = {None: None, "pro": 7, "max": 9, "ultra": 9}  # base chips carry no tier
+
+
+def _intel_generation(sku: str) -> int:
+    # 12700H → 12, 1365U → 13, 1165G7 → 11, 8565U → 8
+    if len(sku) == 5 or sku.startswith("1"):
+        return int(sku[:2])
+    return int(sku[0])
+
+
+def parse_processor(raw: str) -> ProcessorInfo:
+    text = raw or ""
+    m = _INTEL_ULTRA.search(text)
+    if m:
+        return ProcessorInfo(raw, "intel", "core-ultra", int(m.group(1)), int(m.group(2)) if m.group(2) else None)
+    m = _INTEL_CORE.search(text)
+    if m:
+        return ProcessorInfo(raw, "intel", "core", int(m.group(1)), _intel_generation(m.group(2)) if m.group(2) else None)
+    m = _RYZEN.search(text)
+    if m:
+        return ProcessorInfo(raw, "amd", "ryzen", int(m.group(1)), int(m.group(2)) if m.group(2) else None)
+    if "apple" in text.lower():
+        m = _APPLE_M.search(text)
+        if m:
+            variant = m.group(2).lower() if m.group(2) else None
+            return ProcessorInfo(raw, "apple", "m-series", _APPLE_TIERS[variant], int(m.group(1)), variant)
+    m = _SNAPDRAGON.search(text)
+    if m:
+        return ProcessorInfo(raw, "qualcomm", "snapdragon", 9 if (m.group(1) or "").lower() == "elite" else 7)
+    return ProcessorInfo(raw)
+
+
+_NVIDIA = re.compile(r"\b(rtx|gtx)\s*(a)?(\d)(\d{2,3})\b", re.I)
+_RADEON_DGPU = re.compile(r"radeon\s+rx\s*(\d)(\d{3})", re.I)
+_APPLE_CORES = re.compile(r"(\d+)-core", re.I)
+
+
+def parse_gpu(raw: str) -> GpuInfo:
+    text = raw or ""
+    lower = text.lower()
+    m = _NVIDIA.search(text)
+    if m:
+        family, workstation, lead, rest = m.group(1).lower(), m.group(2), m.group(3), m.group(4)
+        if workstation:  # RTX A2000 → tier 20, no consumer generation
+            return GpuInfo(raw, "nvidia", family, int(lead) * 10, None, True)
+        digits = lead + rest  # 4060 → gen 40 / tier 60, 960 → gen 9 / tier 60
+        return GpuInfo(raw, "nvidia", family, int(digits[-2:]), int(digits[:-2]), True)
+    m = _RADEON_DGPU.search(text)
+    if m:
+        return GpuInfo(raw, "amd", "radeon", int(m.group(2)[:2]), int(m.group(1)), True)
+    if "radeon" in lower:
+        return GpuInfo(raw, "amd", "radeon", None, None, False)
+    if "iris" in lower:
+        return GpuInfo(raw, "intel", "iris-xe", None, None, False)
+    if "uhd" in lower:
+        return GpuInfo(raw, "intel", "uhd", None, None, False)
+    if "arc" in lower and "intel" in lower:
+        return GpuInfo(raw, "intel", "arc", None, None, "integrated" not in lower)
+    if "apple" in lower:
+        m = _APPLE_CORES.search(text)
+        return GpuInfo(raw, "apple", "apple-gpu", int(m.group(1)) if m else None, None, False)
+    return GpuInfo(raw)
+
+
+# ------------------------------------------------------------------------------
+# ✅ Index (parse once per distinct raw string)
+# ------------------------------------------------------------------------------
+_PROCESSORS: Dict[str, ProcessorInfo] = {}
+_GPUS: Dict[str, GpuInfo] = {}
+
+
+def processor_info(raw: str) -> ProcessorInfo:
+    info = _PROCESSORS.get(raw)
+    if info is None:
+        info = _PROCESSORS[raw] = parse_processor(raw)
+    return info
+
+
+def gpu_info(raw: str) -> GpuInfo:
+    info = _GPUS.get(raw)
+    if info is None:
+        info = _GPUS[raw] = parse_gpu(raw)
+    return info
+
+
+def match_processor_weight(processor: str, weights: Dict[str, float], default: float = 0.7) -> float:
+    """
+    Weight of the most specific `weights` key covering `processor` (ties go to
+    the earlier key), so "Apple M2 Pro" wins over "Apple M2" regardless of order.
+    """
+    info = processor_info(processor)
+    best, best_specificity = default, -1
+    for key, val in weights.items():
+        key_info = processor_info(key)
+        if key_info.covers(info) and key_info.specificity > best_specificity:
+            best, best_specificity = val, key_info.specificity
+    return best
@@ -0,0 +1,187 @@
+# agents/wire.py — Compact (reference-by-id) message payloads
+#
+# Laptop rows used to travel in full through every hop. In the compact form
+# a message carries laptop ids, the catalog snapshot version they were read
+# from, and per-laptop scores as aligned columns; each agent resolves the
+# rows from its own cached catalog replica. The full form stays valid on
+# every message, and is what the orchestrator resends when a stage cannot
+# resolve a compact one.
+
+import os
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+from agents.catalog_feed import CatalogReplica
+from agents.messages import LaptopOption, ScoredLaptop, ScoredLaptopOption
+
+# "compact" (default) or "full"; fused in-process pipelines always use "full"
+WIRE_FORMAT = os.getenv("WIRE_FORMAT", "compact")
+CATALOG_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:9000/api/laptops")
+CATALOG_ROWS_URL = os.getenv("CATALOG_ROWS_URL", "http://127.0.0.1:9000/api/laptops/rows")
+
+
+# ------------------------------------------------------------------------------
+# ✅ Row resolution (local replica first, then the backend's recent snapshots)
+# ------------------------------------------------------------------------------
+# One pooled client for catalog traffic instead of a new connection per refresh
+_http: Optional[httpx.AsyncClient] = None
+
+
+def http_client() -> httpx.AsyncClient:
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=30)
+    return _http
+
+
+def _older(have: Optional[str], want: str) -> bool:
+    """True unless `have` is known to be `want` or a later snapshot of the same catalog."""
+    try:
+        have_epoch, have_version = (have or "").split(".")
+        want_epoch, want_version = want.split(".")
+        return have_epoch != want_epoch or int(have_version) < int(want_version)
+    except ValueError:
+        return True
+
+
+class CatalogResolver:
+    """Laptop rows by id as of a given catalog_version, or None if that version is gone."""
+
+    def __init__(self, replica: CatalogReplica, rows_url: str = CATALOG_ROWS_URL):
+        self.replica = replica
+        self.rows_url = rows_url
+        self._by_id: Dict[str, dict] = {}
+        self._indexed_version = 0
+        self.replica_hits = 0
+        self.backend_fetches = 0
+        self.failures = 0
+
+    def _index(self) -> Dict[str, dict]:
+        if self._indexed_version != self.replica.version:
+            self._by_id = {row["id"]: row for row in self.replica.rows}
+            self._indexed_version = self.replica.version
+        return self._by_id
+
+    def _from_replica(self, catalog_version: str, ids: Sequence[str]) -> Optional[List[dict]]:
+        if self.replica.catalog_version != catalog_version:
+            return None
+        by_id = self._index()
+        rows = [by_id.get(laptop_id) for laptop_id in ids]
+        return None if any(row is None for row in rows) else rows
+
+    async def rows(self, catalog_version: Optional[str], ids: Sequence[str]) -> Optional[List[dict]]:
+        if not catalog_version:
+            self.failures += 1
+            return None
+        try:
+            if not self.replica.loaded or _older(self.replica.catalog_version, catalog_version):
+                await self.replica.refresh()
+        except Exception as e:
+            print(f"[CatalogResolver] Replica refresh failed: {e}")
+        rows = self._from_replica(catalog_version, ids)
+        if rows is not None:
+            self.replica_hits += 1
+            return rows
+        # The catalog moved on since the sender read it: ask for that exact version
+        try:
+            response = await http_client().post(
+                self.rows_url, json={"ids": list(ids), "catalog_version": catalog_version}, timeout=10.0
+            )
+            if response.status_code == 200 and not response.json().get("missing"):
+                by_id = {row["id"]: row for row in response.json()["laptops"]}
+                self.backend_fetches += 1
+                return [by_id[laptop_id] for laptop_id in ids]
+        except Exception as e:
+            print(f"[CatalogResolver] Row fetch failed: {e}")
+        self.failures += 1
+        return None
+
+    async def laptops(self, catalog_version: Optional[str], ids: Sequence[str]) -> Optional[List[LaptopOption]]:
+        rows = await self.rows(catalog_version, ids)
+        return None if rows is None else [LaptopOption(**row) for row in rows]
+
+
+_RESOLVER: Optional[CatalogResolver] = None
+
+
+def resolver() -> CatalogResolver:
+    """Process-wide resolver over this agent's catalog replica."""
+    global _RESOLVER
+    if _RESOLVER is None:
+        _RESOLVER = CatalogResolver(CatalogReplica(CATALOG_URL, client_factory=http_client))
+    return _RESOLVER
+
+
+# ------------------------------------------------------------------------------
+# ✅ Column ↔ object helpers
+# ------------------------------------------------------------------------------
+def hybrid_rationale(symbolic: float, compute: float, value: float, engine: str) -> str:
+    return f"hybrid: symbolic={symbolic:.3f}, compute={compute:.3f}, value={value:.3f} ({engine})"
+
+
+def scored_options(laptops: Sequence[LaptopOption], msg) -> List[ScoredLaptopOption]:
+    """Full ScoredLaptopOptions from a compact message's score columns (laptops aligned with laptop_ids)."""
+    return [
+        ScoredLaptopOption(
+            base=l, processor_score=p, warranty_score=w, shipping_score=s, cudos_meta=msg.cudos_meta or {},
+        )
+        for l, p, w, s in zip(laptops, msg.processor_scores, msg.warranty_scores, msg.shipping_scores)
+    ]
+
+
+def score_columns(scored: Sequence[ScoredLaptopOption]) -> dict:
+    """Compact fields for a list of ScoredLaptopOptions."""
+    return {
+        "laptop_ids": [s.base.id for s in scored],
+        "processor_scores": [s.processor_score for s in scored],
+        "warranty_scores": [s.warranty_score for s in scored],
+        "shipping_scores": [s.shipping_score for s in scored],
+        "cudos_meta": scored[0].cudos_meta if scored else None,
+    }
+
+
+def dominance_column(laptops: Sequence[LaptopOption]) -> dict:
+    """Compact field for the skyline's dominance_count tags (omitted when no laptop has one)."""
+    counts = [l.dominance_count for l in laptops]
+    return {"dominance_counts": counts} if any(c is not None for c in counts) else {}
+
+
+def with_dominance(laptops: List[LaptopOption], counts: Optional[Sequence[Optional[int]]]) -> List[LaptopOption]:
+    """Catalog rows resolved from a compact message, tagged again with its dominance_counts."""
+    if counts is None:
+        return laptops
+    return [l.copy(update={"dominance_count": c}) for l, c in zip(laptops, counts)]
+
+
+def ranked_columns(ranked: Sequence[ScoredLaptop]) -> dict:
+    """Compact LaptopEvaluationResult fields for a ranking."""
+    return {
+        "ranked_ids": [r.laptop.id for r in ranked],
+        "scores": [r.score for r in ranked],
+        "symbolic_scores": [r.symbolic_score for r in ranked],
+        "compute_scores": [r.compute_score for r in ranked],
+        "value_scores": [r.value_score for r in ranked],
+        "score_engines": [r.score_engine for r in ranked],
+    }
+
+
+def expand_ranked(msg, by_id: Dict[str, LaptopOption]) -> Optional[List[ScoredLaptop]]:
+    """ScoredLaptops from a compact LaptopEvaluationResult, or None if an id is unknown."""
+    if any(laptop_id not in by_id for laptop_id in msg.ranked_ids):
+        return None
+    return [
+        ScoredLaptop(
+            laptop=by_id[laptop_id],
+            score=score,
+            symbolic_score=symbolic,
+            compute_score=compute,
+            value_score=value,
+            metta_used=engine == "metta",
+            score_engine=engine,
+            rationale=hybrid_rationale(symbolic, compute, value, engine),
+        )
+        for laptop_id, score, symbolic, compute, value, engine in zip(
+            msg.ranked_ids, msg.scores, msg.symbolic_scores, msg.compute_scores, msg.value_scores, msg.score_engines
+        )
+    ]
@@ -0,0 +1,372 @@
+# backend/catalog_index.py — In-memory secondary indexes over the laptop catalog
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Copy-on-write overlays are folded back into plain columns past this share of rows
+COMPACT_RATIO = 16
+COMPACT_MIN = 1024
+
+
+# -----------------------------------------------------------------------------
+# 🧩 Copy-on-write overlays
+# -----------------------------------------------------------------------------
+class OverlayValues:
+    """Row-indexed view with `overrides` (pos → value) on top of an immutable base."""
+
+    def __init__(self, base: Sequence, overrides: Dict[int, object], size: int):
+        self.base = base
+        self.overrides = overrides
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, pos):
+        if pos in self.overrides:
+            return self.overrides[pos]
+        if not 0 <= pos < self.size:
+            raise IndexError(pos)
+        return self.base[pos]
+
+
+def _compact_limit(size: int) -> int:
+    return max(COMPACT_MIN, size // COMPACT_RATIO)
+
+
+class LayeredMap:
+    """
+    Persistent mapping: a shared base dict under a short stack of small delta
+    layers (newest first). `updated` never touches the layers it is given;
+    adjacent layers of similar size are merged (so there are O(log n) of
+    them), and once the layers outgrow the compaction limit they are folded
+    into a new base. Each write costs amortized O(changes · log n).
+    """
+
+    __slots__ = ("base", "layers", "delta")
+
+    def __init__(self, base: Optional[Dict] = None, layers: Tuple[Dict, ...] = (), delta: int = 0):
+        self.base = {} if base is None else base
+        self.layers = layers
+        self.delta = delta  # entries across layers (may count a key more than once)
+
+    def get(self, key, default=None):
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+        return self.base.get(key, default)
+
+    def __getitem__(self, key):
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+        return self.base[key]
+
+    def __contains__(self, key) -> bool:
+        return any(key in layer for layer in self.layers) or key in self.base
+
+    def __bool__(self) -> bool:
+        return bool(self.base) or any(self.layers)
+
+    def items(self) -> Iterator[Tuple[object, object]]:
+        seen = set()
+        for layer in self.layers + (self.base,):
+            for key, value in layer.items():
+                if key not in seen:
+                    seen.add(key)
+                    yield key, value
+
+    def updated(self, changes: Dict) -> "LayeredMap":
+        if not changes:
+            return self
+        layers = [dict(changes), *self.layers]
+        delta = self.delta + len(changes)
+        if delta > _compact_limit(len(self.base)):
+            base = dict(self.base)
+            for layer in reversed(layers):
+                base.update(layer)
+            return LayeredMap(base)
+        while len(layers) > 1 and 2 * len(layers[0]) >= len(layers[1]):
+            newer, older = layers.pop(0), layers.pop(0)
+            layers.insert(0, {**older, **newer})
+        return LayeredMap(self.base, tuple(layers), sum(len(layer) for layer in layers))
+
+
+def overlay(base: Sequence, updates: Dict[int, object], size: int) -> Sequence:
+    """New view of `base` with `updates` applied; `base` itself is never mutated."""
+    overrides = LayeredMap()
+    if isinstance(base, OverlayValues):
+        overrides, base = base.overrides, base.base
+        if not isinstance(overrides, LayeredMap):
+            overrides = LayeredMap(dict(overrides))
+    overrides = overrides.updated(updates)
+    if len(overrides.base) + overrides.delta > _compact_limit(size):
+        return [overrides[pos] if pos in overrides else base[pos] for pos in range(size)]
+    return OverlayValues(base, overrides, size)
+
+
+# -----------------------------------------------------------------------------
+# 🗂️ Sorted range column
+# -----------------------------------------------------------------------------
+class _SortedKeys:
+    """Sequence view of `values` in `order`, so bisect can search a presorted column."""
+
+    def __init__(self, values, order):
+        self.values = values
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.values[self.order[i]]
+
+
+class RangeColumn:
+    """A numeric column plus its row order sorted by value, for bisect range search."""
+
+    def __init__(self, values: Sequence[float], order: Optional[Sequence[int]] = None):
+        self.values = values  # row-ordered, for residual predicate checks
+        if order is None:
+            self.rows = sorted(range(len(values)), key=values.__getitem__)
+            self.keys = [values[pos] for pos in self.rows]
+        else:
+            self.rows = order
+            self.keys = _SortedKeys(values, order)
+
+    def count_at_least(self, lo: float) -> int:
+        return len(self.keys) - bisect_left(self.keys, lo)
+
+    def count_at_most(self, hi: float) -> int:
+        return bisect_right(self.keys, hi)
+
+    def rows_at_least(self, lo: float) -> Sequence[int]:
+        return self.rows[bisect_left(self.keys, lo):]
+
+    def rows_at_most(self, hi: float) -> Sequence[int]:
+        return self.rows[:bisect_right(self.keys, hi)]
+
+    def with_updates(self, updates: Dict[int, float], size: int):
+        return DeltaRangeColumn(self, dict(updates), size)
+
+
+class DeltaRangeColumn:
+    """
+    A `RangeColumn` plus a small sorted side list of changed/appended rows.
+    Base entries for changed rows are skipped, so the base is shared untouched
+    between snapshots; once the delta grows past the compaction limit the
+    column is rebuilt as a plain `RangeColumn`.
+    """
+
+    def __init__(self, base: RangeColumn, overrides: Dict[int, float], size: int):
+        self.base = base
+        self.overrides = overrides
+        self.values = OverlayValues(base.values, overrides, size)
+        pairs = sorted((v, pos) for pos, v in overrides.items())
+        self.side_keys = [v for v, _ in pairs]
+        self.side_rows = [pos for _, pos in pairs]
+
+    # Counts are estimates (superseded base entries are not subtracted); they
+    # only choose the driving predicate, rows are always checked exactly.
+    def count_at_least(self, lo: float) -> int:
+        return self.base.count_at_least(lo) + len(self.side_keys) - bisect_left(self.side_keys, lo)
+
+    def count_at_most(self, hi: float) -> int:
+        return self.base.count_at_most(hi) + bisect_right(self.side_keys, hi)
+
+    def rows_at_least(self, lo: float) -> List[int]:
+        live = [pos for pos in self.base.rows_at_least(lo) if pos not in self.overrides]
+        return live + self.side_rows[bisect_left(self.side_keys, lo):]
+
+    def rows_at_most(self, hi: float) -> List[int]:
+        live = [pos for pos in self.base.rows_at_most(hi) if pos not in self.overrides]
+        return live + self.side_rows[:bisect_right(self.side_keys, hi)]
+
+    def with_updates(self, updates: Dict[int, float], size: int):
+        merged = {**self.overrides, **updates}
+        if len(merged) > _compact_limit(size):
+            return RangeColumn([merged[pos] if pos in merged else self.base.values[pos] for pos in range(size)])
+        return DeltaRangeColumn(self.base, merged, size)
+
+
+# -----------------------------------------------------------------------------
+# 🔎 Catalog index
+# -----------------------------------------------------------------------------
+class CatalogIndex:
+    """
+    Inverted indexes on `use_cases` / `brand` plus sorted price/RAM/storage/stock
+    columns. `query` picks the most selective predicate as the driving row set
+    and checks the remaining predicates against the row-ordered columns, so the
+    cost follows the number of matches rather than the catalog size.
+    """
+
+    def __init__(
+        self,
+        use_cases: Sequence[Sequence[str]],
+        brands: Sequence[str],
+        price: RangeColumn,
+        ram: RangeColumn,
+        storage: RangeColumn,
+        stock: RangeColumn,
+        by_use_case: Optional[Dict[str, List[int]]] = None,
+        by_brand: Optional[Dict[str, List[int]]] = None,
+    ):
+        self.size = len(brands)
+        self.use_cases = use_cases  # row-ordered, for residual predicate checks
+        self.brands = brands        # lowercased
+        self.price = price
+        self.ram = ram
+        self.storage = storage
+        self.stock = stock
+
+        if by_use_case is None or by_brand is None:
+            by_use_case, by_brand = {}, {}
+            for pos in range(self.size):
+                for uc in use_cases[pos]:
+                    by_use_case.setdefault(uc, []).append(pos)
+                by_brand.setdefault(brands[pos], []).append(pos)
+        self.by_use_case: Dict[str, List[int]] = by_use_case
+        self.by_brand: Dict[str, List[int]] = by_brand
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict]) -> "CatalogIndex":
+        return cls(
+            use_cases=[tuple(row.get("use_cases", [])) for row in rows],
+            brands=[row["brand"].lower() for row in rows],
+            price=RangeColumn([row["price"] for row in rows]),
+            ram=RangeColumn([row["specs"]["ram_gb"] for row in rows]),
+            storage=RangeColumn([row["specs"]["storage_gb"] for row in rows]),
+            stock=RangeColumn([row["stock"] for row in rows]),
+        )
+
+    @classmethod
+    def from_store(cls, store) -> "CatalogIndex":
+        """Build over a `CatalogStore` without materializing any rows."""
+        uc_off = store.column("use_cases.offsets")
+        uc_codes = store.column("use_cases.codes")
+        use_cases = [
+            tuple(store.string(c) for c in uc_codes[uc_off[pos]:uc_off[pos + 1]])
+            for pos in range(len(store))
+        ]
+        lowered: Dict[int, str] = {}
+        brands = []
+        for code in store.column("brand"):
+            brand = lowered.get(code)
+            if brand is None:
+                brand = lowered[code] = store.string(code).lower()
+            brands.append(brand)
+
+        def column(name: str) -> RangeColumn:
+            return RangeColumn(store.column(name), store.column(f"{name}.order"))
+
+        return cls(
+            use_cases=use_cases,
+            brands=brands,
+            price=column("price"),
+            ram=column("ram_gb"),
+            storage=column("storage_gb"),
+            stock=column("stock"),
+        )
+
+    def with_changes(self, changes: Dict[int, dict]) -> "CatalogIndex":
+        """
+        Index for a catalog where rows at `changes` positions were replaced or
+        appended. Copy-on-write: this index is left untouched, and only the
+        posting lists and column overlays that the changed rows touch are
+        copied.
+        """
+        size = max(self.size, max(changes) + 1) if changes else self.size
+        by_use_case, by_brand = dict(self.by_use_case), dict(self.by_brand)
+        copied = set()
+
+        def postings(table: Dict[str, List[int]], key: str) -> List[int]:
+            if (id(table), key) not in copied:
+                table[key] = list(table.get(key, []))
+                copied.add((id(table), key))
+            return table.setdefault(key, [])
+
+        def move(table, old_keys, new_keys, pos):
+            for key in old_keys - new_keys:
+                rows = postings(table, key)
+                i = bisect_left(rows, pos)
+                if i < len(rows) and rows[i] == pos:
+                    rows.pop(i)
+                if not rows:
+                    del table[key]
+            for key in new_keys - old_keys:
+                insort(postings(table, key), pos)
+
+        uc_updates, brand_updates = {}, {}
+        for pos, row in changes.items():
+            existed = pos < self.size
+            uc_updates[pos] = new_ucs = tuple(row.get("use_cases", []))
+            brand_updates[pos] = new_brand = row["brand"].lower()
+            move(by_use_case, set(self.use_cases[pos]) if existed else set(), set(new_ucs), pos)
+            move(by_brand, {self.brands[pos]} if existed else set(), {new_brand}, pos)
+
+        def column(col, values):
+            return col.with_updates({pos: values(row) for pos, row in changes.items()}, size)
+
+        return CatalogIndex(
+            use_cases=overlay(self.use_cases, uc_updates, size),
+            brands=overlay(self.brands, brand_updates, size),
+            price=column(self.price, lambda r: r["price"]),
+            ram=column(self.ram, lambda r: r["specs"]["ram_gb"]),
+            storage=column(self.storage, lambda r: r["specs"]["storage_gb"]),
+            stock=column(self.stock, lambda r: r["stock"]),
+            by_use_case=by_use_case,
+            by_brand=by_brand,
+        )
+
+    def query(
+        self,
+        use_case: Optional[str] = None,
+        brand: Optional[str] = None,
+        min_ram_gb: Optional[int] = None,
+        min_storage_gb: Optional[int] = None,
+        min_stock: Optional[int] = None,
+        max_price: Optional[float] = None,
+    ) -> List[int]:
+        """Return matching row positions in catalog order."""
+        brand = brand.lower() if brand else None
+
+        # (estimated matches, row supplier) for every active predicate
+        drivers = []
+        if use_case is not None:
+            rows = self.by_use_case.get(use_case, [])
+            drivers.append((len(rows), lambda rows=rows: rows))
+        if brand:
+            rows = self.by_brand.get(brand, [])
+            drivers.append((len(rows), lambda rows=rows: rows))
+        if min_ram_gb:
+            drivers.append((self.ram.count_at_least(min_ram_gb), lambda: self.ram.rows_at_least(min_ram_gb)))
+        if min_storage_gb:
+            drivers.append((self.storage.count_at_least(min_storage_gb), lambda: self.storage.rows_at_least(min_storage_gb)))
+        if min_stock is not None:
+            drivers.append((self.stock.count_at_least(min_stock), lambda: self.stock.rows_at_least(min_stock)))
+        if max_price is not None:
+            drivers.append((self.price.count_at_most(max_price), lambda: self.price.rows_at_most(max_price)))
+
+        if not drivers:
+            return list(range(self.size))
+
+        _, supplier = min(drivers, key=lambda d: d[0])
+
+        matches = []
+        for pos in supplier():
+            if use_case is not None and use_case not in self.use_cases[pos]:
+                continue
+            if brand and self.brands[pos] != brand:
+                continue
+            if min_ram_gb and self.ram.values[pos] < min_ram_gb:
+                continue
+            if min_storage_gb and self.storage.values[pos] < min_storage_gb:
+                continue
+            if min_stock is not None and self.stock.values[pos] < min_stock:
+                continue
+            if max_price is not None and self.price.values[pos] > max_price:
+                continue
+            matches.append(pos)
+
+        matches.sort()
+        return matches
@@ -0,0 +1,214 @@
+# backend/catalog_snapshot.py — Versioned, copy-on-write catalog snapshots
+#
+# Every read handler grabs `Catalog.current` once and works against that
+# immutable snapshot for the rest of the request. Writers (PATCH / bulk upsert)
+# build the next snapshot from the previous one — row overlay, index and score
+# table all updated incrementally — and publish it with a single reference
+# swap. Readers never take a lock; writers are serialized among themselves.
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic.v1 import ValidationError
+
+from agents.messages import LaptopOption
+from backend.catalog_index import CatalogIndex, LayeredMap, OverlayValues
+from backend.catalog_store import CatalogStore
+
+REQUIRED_FIELDS = (
+    "id", "model", "brand", "specs", "price", "supplier", "rating", "review_count",
+    "shipping_days", "warranty_years", "stock", "use_cases", "bulk_pricing",
+)
+REQUIRED_SPECS = ("processor", "ram_gb", "storage_gb", "gpu", "screen_size", "weight_lbs")
+
+
+class CatalogValidationError(ValueError):
+    pass
+
+
+def merge_row(base: dict, patch: dict) -> dict:
+    """Apply a partial update; `specs` is merged key by key, everything else replaced."""
+    row = copy.deepcopy(base)
+    for key, value in patch.items():
+        if key == "specs" and isinstance(value, dict):
+            row["specs"] = {**row.get("specs", {}), **value}
+        else:
+            row[key] = value
+    return row
+
+
+def validate_row(row: dict) -> dict:
+    """`row` with every catalog field type-checked and coerced (e.g. "16" → 16), or CatalogValidationError."""
+    missing = [f for f in REQUIRED_FIELDS if f not in row]
+    specs = row.get("specs")
+    missing += [f"specs.{f}" for f in REQUIRED_SPECS if not isinstance(specs, dict) or f not in specs]
+    if missing:
+        raise CatalogValidationError(f"laptop {row.get('id', '?')} is missing {', '.join(missing)}")
+    try:
+        laptop = LaptopOption(**row)
+    except ValidationError as e:
+        problems = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        raise CatalogValidationError(f"laptop {row.get('id', '?')} has invalid fields ({problems})")
+    coerced = laptop.dict(include=set(REQUIRED_FIELDS))
+    return {**row, **coerced, "specs": {**row["specs"], **coerced["specs"]}}
+
+
+# -----------------------------------------------------------------------------
+# 📄 Rows: mmap store + overlay of changed / appended rows
+# -----------------------------------------------------------------------------
+class CatalogRows:
+    """Sequence of laptop dicts: store rows, with changed/appended rows overlaid."""
+
+    def __init__(self, store: CatalogStore, overrides: Optional[LayeredMap] = None, size: Optional[int] = None):
+        self.store = store
+        self.overrides = LayeredMap() if overrides is None else overrides  # pos -> row
+        self.size = len(store) if size is None else size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, pos: int) -> dict:
+        row = self.overrides.get(pos)
+        if row is not None:
+            return copy.deepcopy(row)
+        if not 0 <= pos < self.size:
+            raise IndexError(pos)
+        return self.store.row(pos)
+
+    def __iter__(self) -> Iterator[dict]:
+        for pos in range(self.size):
+            yield self[pos]
+
+    def rows(self) -> List[dict]:
+        return list(self)
+
+    def with_changes(self, changes: Dict[int, dict]) -> "CatalogRows":
+        size = max(self.size, max(changes) + 1) if changes else self.size
+        return CatalogRows(self.store, self.overrides.updated(changes), size)
+
+    def column(self, store_column: str, path: Tuple[str, ...]):
+        """Row-ordered column: the store's column with overridden rows patched in."""
+        if store_column in ("id", "model", "brand", "supplier", "processor", "gpu"):
+            base = self.store.strings(store_column)
+        else:
+            base = self.store.column(store_column)
+        updates = {}
+        for pos, row in self.overrides.items():
+            value = row
+            for key in path:
+                value = value[key]
+            updates[pos] = value
+        return OverlayValues(base, updates, self.size) if updates else base
+
+
+# -----------------------------------------------------------------------------
+# 📸 Snapshot + publisher
+# -----------------------------------------------------------------------------
+class CatalogSnapshot:
+    """One immutable catalog version: rows, id → position map and secondary index."""
+
+    def __init__(self, epoch: str, version: int, rows: CatalogRows, positions, index: CatalogIndex):
+        self.epoch = epoch
+        self.version = version
+        self.rows = rows
+        self.positions = positions  # LayeredMap: id -> row position
+        self.index = index
+
+    @property
+    def catalog_version(self) -> str:
+        return f"{self.epoch}.{self.version}"
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, laptop_id: str) -> Optional[dict]:
+        pos = self.positions.get(laptop_id)
+        return self.rows[pos] if pos is not None else None
+
+    def score_columns(self):
+        """(ids, processors, warranty_years, shipping_days) for ScoreTable.sync."""
+        return (
+            self.rows.column("id", ("id",)),
+            self.rows.column("processor", ("specs", "processor")),
+            self.rows.column("warranty_years", ("warranty_years",)),
+            self.rows.column("shipping_days", ("shipping_days",)),
+        )
+
+
+class Catalog:
+    """
+    Holds the current snapshot; `upsert` publishes the next one. The last
+    `history` snapshots stay addressable by catalog_version (they share
+    unchanged rows, so keeping them is cheap).
+    """
+
+    def __init__(self, store: CatalogStore, history: int = 16):
+        epoch = hashlib.sha256(json.dumps(store.header["source"], sort_keys=True).encode()).hexdigest()[:8]
+        ids = store.strings("id")
+        positions = LayeredMap({ids[pos]: pos for pos in range(len(store))})
+        self._lock = threading.Lock()
+        self.history = max(1, history)
+        self._recent: "OrderedDict[str, CatalogSnapshot]" = OrderedDict()
+        self._publish(CatalogSnapshot(epoch, 1, CatalogRows(store), positions, CatalogIndex.from_store(store)))
+
+    def _publish(self, snap: CatalogSnapshot) -> None:
+        self._recent[snap.catalog_version] = snap
+        while len(self._recent) > self.history:
+            self._recent.popitem(last=False)
+        self.current = snap
+
+    def snapshot(self, catalog_version: str) -> Optional[CatalogSnapshot]:
+        """A recent snapshot by version, or None once it has aged out."""
+        return self._recent.get(catalog_version)
+
+    def upsert(self, updates: Iterable[dict],
+               before_publish: Optional[Callable[[List[dict]], object]] = None) -> Tuple[CatalogSnapshot, List[dict], int, int]:
+        """
+        Apply partial updates (by id) and full inserts. Returns the new snapshot,
+        the resulting rows, and the updated / inserted counts. `before_publish`
+        gets the resulting rows under the writer lock, before the snapshot is
+        published, so derived state (the score table) is updated in the same
+        order as the catalog.
+        """
+        with self._lock:
+            snap = self.current
+            positions = snap.positions
+            changes: Dict[int, dict] = {}
+            new_ids: Dict[str, int] = {}
+            next_pos = len(snap.rows)
+            updated = inserted = 0
+
+            for patch in updates:
+                laptop_id = patch.get("id")
+                if not laptop_id:
+                    raise CatalogValidationError("every laptop needs an id")
+                pos = positions.get(laptop_id, new_ids.get(laptop_id))
+                if pos is None:
+                    row = validate_row(copy.deepcopy(patch))
+                    pos = new_ids[laptop_id] = next_pos
+                    next_pos += 1
+                    inserted += 1
+                else:
+                    row = validate_row(merge_row(changes[pos] if pos in changes else snap.rows[pos], patch))
+                    updated += 1
+                changes[pos] = row
+
+            if not changes:
+                return snap, [], 0, 0
+
+            nxt = CatalogSnapshot(
+                snap.epoch,
+                snap.version + 1,
+                snap.rows.with_changes(changes),
+                positions.updated(new_ids),
+                snap.index.with_changes(changes),
+            )
+            rows = [copy.deepcopy(changes[pos]) for pos in sorted(changes)]
+            if before_publish is not None:
+                before_publish(rows)
+            self._publish(nxt)
+            return nxt, rows, updated, inserted
@@ -0,0 +1,283 @@
+# backend/catalog_store.py — Columnar, memory-mapped laptop catalog shared by all workers
+#
+# laptops.json is compiled once into data/laptops.cat. Every uvicorn worker then
+# mmaps the same file read-only, so start-up is a header parse and the column
+# pages are shared through the OS page cache instead of each worker holding its
+# own list of nested dicts.
+#
+# File layout (native byte order, every section 8-byte aligned):
+#   magic (8 bytes) | header length (uint32) | JSON header | column sections
+#
+#   * fixed-width numeric columns   ('d' float64 / 'i' int32)
+#   * dictionary-encoded strings    (one string table + 'I' uint32 codes)
+#   * offset-indexed lists          (use_cases, bulk_pricing: 'I' offsets + flat values)
+#   * sorted row orders             (price/RAM/storage/stock, for range search)
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+MAGIC = b"PCAT\x00\x00\x00\x01"
+
+FLOAT_COLUMNS = {
+    "price": ("price",),
+    "rating": ("rating",),
+    "screen_size": ("specs", "screen_size"),
+    "weight_lbs": ("specs", "weight_lbs"),
+}
+INT_COLUMNS = {
+    "review_count": ("review_count",),
+    "shipping_days": ("shipping_days",),
+    "warranty_years": ("warranty_years",),
+    "stock": ("stock",),
+    "ram_gb": ("specs", "ram_gb"),
+    "storage_gb": ("specs", "storage_gb"),
+}
+STRING_COLUMNS = {
+    "id": ("id",),
+    "model": ("model",),
+    "brand": ("brand",),
+    "supplier": ("supplier",),
+    "processor": ("specs", "processor"),
+    "gpu": ("specs", "gpu"),
+}
+SORTED_COLUMNS = ("price", "ram_gb", "storage_gb", "stock")
+
+
+def _get(row: dict, path: tuple):
+    for key in path:
+        row = row[key]
+    return row
+
+
+def _source_stamp(path: Path) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+# -----------------------------------------------------------------------------
+# 🛠️ Compiler (laptops.json → laptops.cat)
+# -----------------------------------------------------------------------------
+def compile_catalog(rows: List[dict], out_path: Path, source: Optional[Dict[str, int]] = None) -> None:
+    """Write `rows` as a columnar catalog file (atomically, via rename)."""
+    strings: List[str] = []
+    string_codes: Dict[str, int] = {}
+
+    def encode(value: str) -> int:
+        code = string_codes.get(value)
+        if code is None:
+            code = string_codes[value] = len(strings)
+            strings.append(value)
+        return code
+
+    sections: Dict[str, array] = {}
+    for name, path in FLOAT_COLUMNS.items():
+        sections[name] = array("d", (float(_get(r, path)) for r in rows))
+    for name, path in INT_COLUMNS.items():
+        sections[name] = array("i", (int(_get(r, path)) for r in rows))
+    for name, path in STRING_COLUMNS.items():
+        sections[name] = array("I", (encode(_get(r, path)) for r in rows))
+
+    uc_offsets, uc_codes = array("I", [0]), array("I")
+    bp_offsets, bp_qty, bp_pct = array("I", [0]), array("i"), array("d")
+    for r in rows:
+        uc_codes.extend(encode(uc) for uc in r.get("use_cases", []))
+        uc_offsets.append(len(uc_codes))
+        for tier in r.get("bulk_pricing", []):
+            bp_qty.append(int(tier["min_qty"]))
+            bp_pct.append(float(tier["discount_pct"]))
+        bp_offsets.append(len(bp_qty))
+    sections.update({
+        "use_cases.offsets": uc_offsets, "use_cases.codes": uc_codes,
+        "bulk_pricing.offsets": bp_offsets, "bulk_pricing.min_qty": bp_qty,
+        "bulk_pricing.discount_pct": bp_pct,
+    })
+
+    for name in SORTED_COLUMNS:
+        values = sections[name]
+        sections[f"{name}.order"] = array("I", sorted(range(len(rows)), key=values.__getitem__))
+
+    blob = "".join(strings).encode("utf-8")
+    str_offsets, pos = array("I", [0]), 0
+    for s in strings:
+        pos += len(s.encode("utf-8"))
+        str_offsets.append(pos)
+    sections["strings.offsets"] = str_offsets
+
+    # Lay out sections after the header
+    layout, body, cursor = {}, [], 0
+    for name, arr in list(sections.items()) + [("strings.blob", blob)]:
+        data = arr if isinstance(arr, bytes) else arr.tobytes()
+        fmt = "B" if isinstance(arr, bytes) else arr.typecode
+        layout[name] = {"format": fmt, "offset": cursor, "length": len(data)}
+        body.append(data)
+        pad = -len(data) % 8
+        body.append(b"\x00" * pad)
+        cursor += len(data) + pad
+
+    header = json.dumps({
+        "rows": len(rows),
+        "strings": len(strings),
+        "byteorder": sys.byteorder,
+        "source": source or {},
+        "sections": layout,
+    }).encode("utf-8")
+    prefix_len = len(MAGIC) + 4 + len(header)
+    header += b" " * (-prefix_len % 8)
+
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for chunk in body:
+            f.write(chunk)
+    os.replace(tmp_path, out_path)
+
+
+# -----------------------------------------------------------------------------
+# 📖 Reader
+# -----------------------------------------------------------------------------
+class _CodedColumn:
+    """Row-indexed view over a dictionary-encoded column, decoded on access."""
+
+    def __init__(self, codes, decode):
+        self.codes = codes
+        self.decode = decode
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, pos):
+        return self.decode(self.codes[pos])
+
+
+class CatalogStore:
+    """
+    Read-only, mmap-backed catalog. Behaves as a sequence of laptop dicts, but
+    rows are only materialized when indexed; the numeric columns are exposed
+    directly as zero-copy memoryviews.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a catalog store")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        base = len(MAGIC) + 4
+        self.header = json.loads(bytes(self._mm[base:base + header_len]))
+        if self.header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self.path} was compiled for a {self.header['byteorder']}-endian host")
+
+        self._data = base + header_len
+        self._view = memoryview(self._mm)
+        self._columns: Dict[str, memoryview] = {}
+        self.size: int = self.header["rows"]
+        self._strings: List[Optional[str]] = [None] * self.header["strings"]
+        self._str_offsets = self.column("strings.offsets")
+        self._str_blob = self.column("strings.blob")
+
+    # ---------- raw access ----------
+    def column(self, name: str) -> memoryview:
+        view = self._columns.get(name)
+        if view is None:
+            meta = self.header["sections"][name]
+            start = self._data + meta["offset"]
+            view = self._columns[name] = self._view[start:start + meta["length"]].cast(meta["format"])
+        return view
+
+    def string(self, code: int) -> str:
+        s = self._strings[code]
+        if s is None:
+            lo, hi = self._str_offsets[code], self._str_offsets[code + 1]
+            s = self._strings[code] = bytes(self._str_blob[lo:hi]).decode("utf-8")
+        return s
+
+    def strings(self, name: str) -> _CodedColumn:
+        return _CodedColumn(self.column(name), self.string)
+
+    def source_matches(self, source_path: Path) -> bool:
+        return self.header.get("source") == _source_stamp(source_path)
+
+    # ---------- row materialization ----------
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[dict]:
+        for pos in range(self.size):
+            yield self.row(pos)
+
+    def __getitem__(self, pos: int) -> dict:
+        if pos < 0:
+            pos += self.size
+        if not 0 <= pos < self.size:
+            raise IndexError(pos)
+        return self.row(pos)
+
+    def row(self, pos: int) -> dict:
+        """Materialize one row in the laptops.json / `LaptopOption` shape."""
+        col, s = self.column, self.string
+        uc_off = col("use_cases.offsets")
+        uc_codes = col("use_cases.codes")
+        bp_off = col("bulk_pricing.offsets")
+        bp_qty, bp_pct = col("bulk_pricing.min_qty"), col("bulk_pricing.discount_pct")
+        return {
+            "id": s(col("id")[pos]),
+            "model": s(col("model")[pos]),
+            "brand": s(col("brand")[pos]),
+            "specs": {
+                "processor": s(col("processor")[pos]),
+                "ram_gb": col("ram_gb")[pos],
+                "storage_gb": col("storage_gb")[pos],
+                "gpu": s(col("gpu")[pos]),
+                "screen_size": col("screen_size")[pos],
+                "weight_lbs": col("weight_lbs")[pos],
+            },
+            "price": col("price")[pos],
+            "supplier": s(col("supplier")[pos]),
+            "rating": col("rating")[pos],
+            "review_count": col("review_count")[pos],
+            "shipping_days": col("shipping_days")[pos],
+            "warranty_years": col("warranty_years")[pos],
+            "stock": col("stock")[pos],
+            "use_cases": [s(c) for c in uc_codes[uc_off[pos]:uc_off[pos + 1]]],
+            "bulk_pricing": [
+                {"min_qty": bp_qty[i], "discount_pct": bp_pct[i]}
+                for i in range(bp_off[pos], bp_off[pos + 1])
+            ],
+        }
+
+    def rows(self) -> List[dict]:
+        return [self.row(pos) for pos in range(self.size)]
+
+
+def open_catalog(json_path: Path, store_path: Path) -> CatalogStore:
+    """Open the compiled store, recompiling it first if laptops.json changed."""
+    json_path, store_path = Path(json_path), Path(store_path)
+    if store_path.exists():
+        try:
+            store = CatalogStore(store_path)
+            if store.source_matches(json_path):
+                return store
+        except (ValueError, KeyError):
+            pass
+    stamp = _source_stamp(json_path)
+    with open(json_path, "r") as f:
+        rows = json.load(f).get("laptops", [])
+    compile_catalog(rows, store_path, source=stamp)
+    return CatalogStore(store_path)
+
+
+if __name__ == "__main__":
+    src = Path(sys.argv[1] if len(sys.argv) > 1 else "data/laptops.json")
+    dst = Path(sys.argv[2] if len(sys.argv) > 2 else src.with_suffix(".cat"))
+    store = open_catalog(src, dst)
+    print(f"✅ Compiled {len(store)} laptops → {dst} ({dst.stat().st_size} bytes)")
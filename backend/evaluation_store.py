@@ -0,0 +1,253 @@
+# backend/evaluation_store.py — Retained Evaluator component vectors for what-if re-ranking
+#
+# After scoring, the Evaluator posts each candidate's score components here.
+# A re-rank with a new budget, preference or weights then only recomputes the
+# cheap parts: the kb.metta rules (compiled, vectorized), the compute blend,
+# the value term and the weighted sum — no Scout / Compute / MeTTa round trip.
+# A sweep does the same over a whole grid of budgets × quantities at once.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from agents.eval_features import value_scores
+from agents.kb_compiler import KBCompileError, compiled_kb
+from agents.pricing import discount_matrix
+
+KB_ENGINES = ("compiled", "metta")  # rows whose symbolic score came from the kb rules
+
+
+def merge_weights(base: Dict[str, float], override: Optional[Dict[str, float]], name: str) -> Dict[str, float]:
+    """`override` on top of `base`; negative weights would break the skyband's monotonicity."""
+    merged = {**base, **(override or {})}
+    negative = sorted(k for k, v in merged.items() if v < 0)
+    if negative:
+        raise ValueError(f"{name} must be non-negative: {', '.join(negative)}")
+    return merged
+
+
+class StoredEvaluation:
+    """
+    Column arrays for one evaluated request. The candidates are what Scout
+    returned under the original budget, cut to the orchestrator's K-skyband
+    when `skyband_k` is set: re-ranks stay exact for budgets up to the
+    original one, non-negative weights and top-k up to `skyband_k`.
+    """
+
+    def __init__(self, request_id: str, candidates: List[dict], max_budget: float, prefer_performance: bool,
+                 weights: Dict[str, float], compute_weights: Dict[str, float], skyband_k: Optional[int] = None):
+        self.request_id = request_id
+        self.max_budget = max_budget
+        self.prefer_performance = prefer_performance
+        self.weights = dict(weights)
+        self.compute_weights = dict(compute_weights)
+        self.skyband_k = skyband_k
+        self.touched_at = time.monotonic()
+
+        self.ids = [c["id"] for c in candidates]
+        self.models = [c.get("model", c["id"]) for c in candidates]
+        self.columns = {
+            "id": self.ids,
+            "processor": [c["processor"] for c in candidates],
+            "ram_gb": np.array([c["ram_gb"] for c in candidates], dtype=np.int64),
+            "gpu": [c["gpu"] for c in candidates],
+            "price": np.array([c["price"] for c in candidates], dtype=float),
+            "rating": np.array([c["rating"] for c in candidates], dtype=float),
+            "review_count": np.array([c["review_count"] for c in candidates], dtype=np.int64),
+        }
+        self.perf = np.array([c["perf"] for c in candidates], dtype=float)
+        self.review = np.array([c["review"] for c in candidates], dtype=float)
+        self.processor_score = np.array([c["processor_score"] for c in candidates], dtype=float)
+        self.warranty_score = np.array([c["warranty_score"] for c in candidates], dtype=float)
+        self.shipping_score = np.array([c["shipping_score"] for c in candidates], dtype=float)
+        self.symbolic = np.array([c["symbolic"] for c in candidates], dtype=float)
+        self.kb_rows = np.array([c.get("engine") in KB_ENGINES for c in candidates], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _scores(self, budget, prefer: bool, w: Dict[str, float], cw: Dict[str, float]):
+        """(final, symbolic, compute, value); `budget` may be a column of budgets."""
+        symbolic = self.symbolic
+        if (np.ndim(budget) or budget != self.max_budget or prefer != self.prefer_performance) and self.kb_rows.any():
+            # kb rules read budget / preference, so the kb-scored rows are recomputed
+            try:
+                kb_scores = compiled_kb().score_columns(self.columns, {"budget": budget, "prefer_performance": prefer})
+                symbolic = np.where(self.kb_rows, kb_scores, self.symbolic)
+            except (KBCompileError, OSError):
+                pass
+        compute = (
+            cw["processor"] * self.processor_score
+            + cw["warranty"] * self.warranty_score
+            + cw["shipping"] * self.shipping_score
+        )
+        value = value_scores(self.columns["price"], budget)
+        final = w["symbolic"] * symbolic + w["compute"] * compute + w["value"] * value
+        return final, symbolic, compute, value
+
+    def rerank(
+        self,
+        max_budget: Optional[float] = None,
+        prefer_performance: Optional[bool] = None,
+        weights: Optional[Dict[str, float]] = None,
+        compute_weights: Optional[Dict[str, float]] = None,
+        top_k: int = 3,
+        budget_tolerance: float = 1.0,
+    ) -> dict:
+        """
+        Top `top_k` for new settings; candidates priced above budget × tolerance
+        are dropped, as in `sweep`. ValueError for a `top_k` beyond the skyband
+        or a negative weight, where the retained candidates may miss the answer.
+        """
+        if self.skyband_k is not None and top_k > self.skyband_k:
+            raise ValueError(f"top_k {top_k} exceeds the {self.skyband_k}-skyband the candidates were cut to")
+        budget = self.max_budget if max_budget is None else float(max_budget)
+        prefer = self.prefer_performance if prefer_performance is None else prefer_performance
+        w = merge_weights(self.weights, weights, "weights")
+        cw = merge_weights(self.compute_weights, compute_weights, "compute_weights")
+        final, symbolic, compute, value = self._scores(budget, prefer, w, cw)
+
+        eligible = np.flatnonzero(self.columns["price"] <= budget * budget_tolerance)
+        top = eligible[np.argsort(-final[eligible], kind="stable")[:max(0, top_k)]]
+        notes = []
+        if budget > self.max_budget:
+            notes.append(
+                f"Only laptops Scout returned under the original ${self.max_budget:.0f} budget are re-ranked; "
+                "pricier ones are not considered."
+            )
+        return {
+            "max_budget": budget,
+            "prefer_performance": prefer,
+            "weights": w,
+            "compute_weights": cw,
+            "original_max_budget": self.max_budget,
+            "skyband_k": self.skyband_k,
+            "total_candidates": len(self),
+            "eligible_candidates": len(eligible),
+            "notes": notes,
+            "ranked": [
+                {
+                    "id": self.ids[i],
+                    "model": self.models[i],
+                    "score": float(final[i]),
+                    "symbolic_score": float(symbolic[i]),
+                    "compute_score": float(compute[i]),
+                    "value_score": float(value[i]),
+                }
+                for i in top
+            ],
+        }
+
+    def sweep(
+        self,
+        budgets: Sequence[float],
+        quantities: Sequence[int],
+        bulk_pricing: Sequence[Iterable],
+        prefer_performance: Optional[bool] = None,
+        weights: Optional[Dict[str, float]] = None,
+        compute_weights: Optional[Dict[str, float]] = None,
+        budget_tolerance: float = 1.0,
+    ) -> dict:
+        """
+        Winner per budget and negotiated totals per (budget, quantity), all in
+        one array pass. Candidates priced above budget × tolerance are dropped,
+        as Scout would; a deal is accepted when the discounted unit price is
+        within the per-unit budget, as the Negotiator decides. Winners come
+        from the retained candidates only, so budgets above the original one
+        are flagged in `beyond_original_budget`; negative weights raise ValueError.
+        """
+        B = np.asarray(budgets, dtype=float)[:, None]
+        Q = np.asarray(quantities, dtype=np.int64)
+        prefer = self.prefer_performance if prefer_performance is None else prefer_performance
+        w = merge_weights(self.weights, weights, "weights")
+        cw = merge_weights(self.compute_weights, compute_weights, "compute_weights")
+
+        prices = self.columns["price"]
+        if len(self):
+            final, _, _, _ = self._scores(B, prefer, w, cw)
+            final = np.where(prices <= B * budget_tolerance, final, -np.inf)
+        else:
+            final = np.full((len(B), 1), -np.inf)
+            prices = np.zeros(1)
+            bulk_pricing = [[]]
+        has_winner = np.isfinite(final).any(axis=1)
+        winner = final.argmax(axis=1)  # first maximum, so ties resolve like the stable sort
+
+        discounts = discount_matrix(bulk_pricing, Q)[winner]
+        unit = prices[winner][:, None] * (1 - discounts / 100)
+        total = unit * Q
+        accepted = unit <= B
+
+        def grid(a):
+            return [[float(x) if ok else None for x in row] for row, ok in zip(a, has_winner)]
+
+        beyond = B[:, 0] > self.max_budget
+        notes = [
+            f"Winners are picked from the {len(self)} candidates Scout returned under the original "
+            f"${self.max_budget:.0f} budget" + ("" if self.skyband_k is None else f" (cut to the {self.skyband_k}-skyband)")
+            + "."
+        ]
+        if beyond.any():
+            notes.append("Budgets above the original one cannot select laptops Scout filtered out; see beyond_original_budget.")
+        return {
+            "budgets": B[:, 0].tolist(),
+            "quantities": Q.tolist(),
+            "prefer_performance": prefer,
+            "original_max_budget": self.max_budget,
+            "skyband_k": self.skyband_k,
+            "beyond_original_budget": beyond.tolist(),
+            "notes": notes,
+            "total_candidates": len(self),
+            "winners": [
+                {"id": self.ids[i], "model": self.models[i], "score": float(final[b, i])} if ok else None
+                for b, (i, ok) in enumerate(zip(winner, has_winner))
+            ],
+            "discount_pct": grid(discounts),
+            "unit_price": grid(unit),
+            "total_cost": grid(total),
+            "accepted": [[bool(x) if ok else None for x in row] for row, ok in zip(accepted, has_winner)],
+        }
+
+
+class EvaluationStore:
+    """
+    Bounded map of request id → StoredEvaluation. Entries idle for longer
+    than `ttl_s` expire; past `max_entries` the least recently used go first.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_s: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, StoredEvaluation]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, evaluation: StoredEvaluation) -> None:
+        with self._lock:
+            self._entries[evaluation.request_id] = evaluation
+            self._entries.move_to_end(evaluation.request_id)
+            self._expire()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[StoredEvaluation]:
+        with self._lock:
+            self._expire()
+            evaluation = self._entries.get(request_id)
+            if evaluation is not None:
+                evaluation.touched_at = time.monotonic()
+                self._entries.move_to_end(request_id)
+            return evaluation
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_s
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.touched_at >= cutoff:
+                break
+            self._entries.popitem(last=False)
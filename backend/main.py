@@ -1,19 +1,28 @@
 # backend/main.py
 
 import asyncio
+import json
 import os
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from uuid import uuid4
 
 import httpx
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from agents.catalog_feed import BUDGET_TOLERANCE
+from backend.catalog_snapshot import Catalog, CatalogValidationError
+from backend.catalog_store import open_catalog
+from backend.evaluation_store import EvaluationStore, StoredEvaluation
+from backend.payload_cache import PayloadCache
+from backend.scoring import ScoreTable, ScoringFactors, score_batch
 
 # -----------------------------------------------------------------------------
 # 🌐 Env Config
@@ -89,6 +98,48 @@ class NotifyBody(BaseModel):
     done: bool = False
     error: bool = False
 
+class LaptopQueryBody(BaseModel):
+    use_case: Optional[str] = None
+    min_ram_gb: Optional[int] = None
+    min_storage_gb: Optional[int] = None
+    preferred_brand: Optional[str] = None
+    min_stock: Optional[int] = None
+    max_price: Optional[float] = None
+    # Paging (Scout streams matches in chunks): pin to the first page's snapshot
+    catalog_version: Optional[str] = None
+    offset: int = 0
+    limit: Optional[int] = None
+
+class LaptopBulkBody(BaseModel):
+    laptops: List[dict]
+
+class LaptopRowsBody(BaseModel):
+    ids: List[str]
+    catalog_version: Optional[str] = None  # None = current snapshot
+
+class EvaluationBody(BaseModel):
+    request_id: str
+    max_budget: float
+    prefer_performance: bool = True
+    weights: Dict[str, float]
+    compute_weights: Dict[str, float]
+    skyband_k: Optional[int] = None  # candidates are the orchestrator's K-skyband (None = all of Scout's)
+    candidates: List[dict]
+
+class RerankBody(BaseModel):
+    max_budget: Optional[float] = None
+    prefer_performance: Optional[bool] = None
+    weights: Optional[Dict[str, float]] = None
+    compute_weights: Optional[Dict[str, float]] = None
+    top_k: int = 3
+
+class SweepBody(BaseModel):
+    budgets: List[float]
+    quantities: List[int]
+    prefer_performance: Optional[bool] = None
+    weights: Optional[Dict[str, float]] = None
+    compute_weights: Optional[Dict[str, float]] = None
+
 
 # -----------------------------------------------------------------------------
 # 🧠 Helper: Format chat text
@@ -160,51 +211,287 @@ async def api_stream(request_id: str, request: Request):
 # 💾 Data Serving (for Scout & Compute)
 # -----------------------------------------------------------------------------
 LAPTOPS_FILE = Path(__file__).parent.parent / "data" / "laptops.json"
-with open(LAPTOPS_FILE, "r") as f:
-    LAPTOPS = __import__("json").load(f).get("laptops", [])
+CATALOG_STORE_FILE = Path(os.getenv("CATALOG_STORE_FILE", str(LAPTOPS_FILE.with_suffix(".cat"))))
+
+# Columnar, mmap-backed catalog: compiled from laptops.json when stale, then
+# shared read-only by every worker. Rows are materialized only when served.
+LAPTOPS = open_catalog(LAPTOPS_FILE, CATALOG_STORE_FILE)
+
+# Versioned snapshots (rows + secondary indexes) over the store. Handlers read
+# `CATALOG.current` once per request; PATCH / bulk upserts publish a new
+# snapshot instead of mutating the one in-flight requests are using.
+CATALOG = Catalog(LAPTOPS, history=int(os.getenv("CATALOG_HISTORY", "16")))
 
 SCORING_FILE = Path(__file__).parent.parent / "data" / "scoring_factors.json"
-with open(SCORING_FILE, "r") as f:
-    SCORING_FACTORS = __import__("json").load(f)
+SCORING = ScoringFactors(SCORING_FILE)
+
+# Per-SKU processor/warranty/shipping scores, materialized for the whole
+# catalog, rebuilt when scoring_factors.json changes and upserted per edit.
+SCORE_TABLE = ScoreTable()
+
+
+def sync_score_table() -> int:
+    rescored = 0
+    while True:
+        snap = CATALOG.current
+        rescored += SCORE_TABLE.sync(*snap.score_columns(), SCORING.factors, SCORING.version)
+        # An upsert published meanwhile may have been overwritten; carry-over makes a re-sync cheap
+        if CATALOG.current is snap:
+            return rescored
+
+
+sync_score_table()
+
+# Batches at or above the threshold are split and scored on a worker pool
+SCORE_POOL_THRESHOLD = int(os.getenv("SCORE_POOL_THRESHOLD", "2000"))
+SCORE_CHUNK_SIZE = int(os.getenv("SCORE_CHUNK_SIZE", "5000"))
+SCORING_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SCORE_WORKERS", str(os.cpu_count() or 4))),
+    thread_name_prefix="scoring",
+)
+
+
+# Encoded once per catalog version (plain/gzip/br) and revalidated by ETag
+CATALOG_PAYLOAD = PayloadCache(lambda snap: {"laptops": snap.rows.rows()})
 
 
 @app.get("/api/laptops")
-def get_laptops():
-    return {"laptops": LAPTOPS}
+def get_laptops(request: Request):
+    snap = CATALOG.current
+    return CATALOG_PAYLOAD.get(snap.version, snap).response(
+        request, {"X-Catalog-Version": snap.catalog_version}
+    )
+
+
+@app.get("/api/laptops/stream")
+def stream_laptops(offset: int = 0, limit: Optional[int] = None, chunk_size: int = 500):
+    """Catalog as NDJSON (one laptop per line), materialized and flushed per chunk."""
+    snap = CATALOG.current
+    rows = snap.rows
+    stop = len(rows) if limit is None else min(len(rows), offset + limit)
+    chunk_size = max(1, chunk_size)
+
+    def ndjson_chunks():
+        for start in range(offset, stop, chunk_size):
+            chunk = (rows[pos] for pos in range(start, min(start + chunk_size, stop)))
+            yield "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in chunk)
+
+    return StreamingResponse(
+        ndjson_chunks(),
+        media_type="application/x-ndjson",
+        headers={"X-Catalog-Size": str(len(rows)), "X-Catalog-Version": snap.catalog_version},
+    )
+
+
+@app.post("/api/laptops/query")
+def query_laptops(body: LaptopQueryBody):
+    snap = CATALOG.current if body.catalog_version is None else CATALOG.snapshot(body.catalog_version)
+    if snap is None:
+        raise HTTPException(status_code=410, detail=f"catalog version {body.catalog_version} no longer retained")
+    positions = snap.index.query(
+        use_case=body.use_case,
+        brand=body.preferred_brand,
+        min_ram_gb=body.min_ram_gb,
+        min_storage_gb=body.min_storage_gb,
+        min_stock=body.min_stock,
+        max_price=body.max_price,
+    )
+    end = len(positions) if body.limit is None else min(len(positions), body.offset + body.limit)
+    return {
+        "laptops": [snap.rows[pos] for pos in positions[body.offset:end]],
+        "catalog_size": len(snap),
+        "catalog_version": snap.catalog_version,
+        "total_matches": len(positions),
+        "next_offset": end if end < len(positions) else None,
+    }
+
+
+@app.post("/api/laptops/rows")
+def laptop_rows(body: LaptopRowsBody):
+    """Rows by id as of a recent catalog_version (agents resolving compact messages)."""
+    snap = CATALOG.current if body.catalog_version is None else CATALOG.snapshot(body.catalog_version)
+    if snap is None:
+        raise HTTPException(status_code=410, detail=f"catalog version {body.catalog_version} no longer retained")
+    rows = [snap.get(laptop_id) for laptop_id in body.ids]
+    return {
+        "laptops": [row for row in rows if row is not None],
+        "missing": [laptop_id for laptop_id, row in zip(body.ids, rows) if row is None],
+        "catalog_version": snap.catalog_version,
+    }
+
+
+# -----------------------------------------------------------------------------
+# ✏️ Catalog mutations (copy-on-write snapshots, applied incrementally)
+# -----------------------------------------------------------------------------
+def _apply_upserts(updates: List[dict]) -> dict:
+    rescored = []
+    try:
+        # The score table is updated under the catalog's writer lock, in snapshot order
+        snap, rows, updated, inserted = CATALOG.upsert(
+            updates, before_publish=lambda rows: rescored.append(SCORE_TABLE.upsert(rows))
+        )
+    except CatalogValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    rescored = sum(rescored)
+    return {
+        "catalog_version": snap.catalog_version,
+        "catalog_size": len(snap),
+        "updated": updated,
+        "inserted": inserted,
+        "rescored": rescored,
+        "laptops": rows,
+    }
+
+
+@app.patch("/api/laptops/{laptop_id}")
+def patch_laptop(laptop_id: str, patch: dict):
+    """Partial update of one laptop (e.g. {"price": 999, "stock": 12}); specs merge key by key."""
+    if CATALOG.current.get(laptop_id) is None:
+        raise HTTPException(status_code=404, detail=f"unknown laptop {laptop_id}")
+    return _apply_upserts([{**patch, "id": laptop_id}])
+
+
+@app.post("/api/laptops/bulk")
+def bulk_upsert_laptops(body: LaptopBulkBody):
+    """Patch existing laptops by id and insert new ones (full rows) in one snapshot."""
+    return _apply_upserts(body.laptops)
 
 
 @app.post("/api/score")
-def score_laptops(payload: dict):
-    laptops = payload.get("laptops", [])
-    scored = []
-    max_warranty = SCORING_FACTORS["max_warranty_years"]
-    max_shipping = SCORING_FACTORS["max_shipping_days"]
-
-    for laptop in laptops:
-        processor = laptop["specs"]["processor"]
-        warranty = laptop["warranty_years"]
-        shipping_days = laptop["shipping_days"]
-
-        proc_score = 0.7
-        for key, val in SCORING_FACTORS["processor_weights"].items():
-            if key.lower() in processor.lower():
-                proc_score = val
-                break
-
-        warranty_score = min(warranty / max_warranty, 1.0)
-        shipping_score = round((max_shipping - shipping_days) / max_shipping, 2)
-
-        scored.append({
-            "id": laptop["id"],
-            "processor_score": proc_score,
-            "warranty_score": warranty_score,
-            "shipping_score": shipping_score,
-        })
+async def score_laptops(payload: dict):
+    loop = asyncio.get_running_loop()
+    if SCORING.refresh_if_changed():
+        rescored = await loop.run_in_executor(SCORING_POOL, sync_score_table)
+        print(f"♻️ scoring_factors.json changed → score table v{SCORING.version} ({rescored} SKUs rescored)")
+    table = SCORE_TABLE.current
+
+    # By id: O(k) lookups against the precomputed table
+    if "ids" in payload:
+        scored, missing = [], []
+        for laptop_id in payload["ids"]:
+            result = table.get(laptop_id)
+            if result is None:
+                missing.append(laptop_id)
+            else:
+                scored.append(result)
+        extra = {"missing": missing}
+    else:
+        # Full laptops: table hits where inputs still match, batch-score the rest
+        laptops = payload.get("laptops", [])
+        scored = [table.lookup(laptop) for laptop in laptops]
+        misses = [laptops[k] for k, result in enumerate(scored) if result is None]
+        extra = {}
+
+        if len(misses) < SCORE_POOL_THRESHOLD:
+            fresh = score_batch(misses, table.factors)
+        else:
+            # Large batches: vectorized chunks on the worker pool, event loop stays free
+            chunks = [misses[i:i + SCORE_CHUNK_SIZE] for i in range(0, len(misses), SCORE_CHUNK_SIZE)]
+            parts = await asyncio.gather(*[
+                loop.run_in_executor(SCORING_POOL, score_batch, chunk, table.factors)
+                for chunk in chunks
+            ])
+            fresh = [row for part in parts for row in part]
+
+        fresh_iter = iter(fresh)
+        scored = [result if result is not None else next(fresh_iter) for result in scored]
 
     return {
         "compute_job_id": f"cudos-job-{random.randint(1000,9999)}",
         "execution_time_ms": random.randint(100, 300),
         "compute_cost": f"{round(random.uniform(0.001, 0.01), 4)} CUDOS",
         "node_location": "us-east-distributed-cluster",
+        "factor_version": table.factor_version,
         "results": scored,
+        **extra,
     }
+
+
+# -----------------------------------------------------------------------------
+# 🔁 What-if re-ranking (Evaluator component vectors retained per request)
+# -----------------------------------------------------------------------------
+EVALUATIONS = EvaluationStore(
+    max_entries=int(os.getenv("EVAL_STORE_MAX_ENTRIES", "1000")),
+    ttl_s=float(os.getenv("EVAL_STORE_TTL_S", "3600")),
+)
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "10000"))
+
+
+@app.post("/api/evaluations")
+def store_evaluation(body: EvaluationBody):
+    """Called by the Evaluator after ranking; keeps the score components for re-ranks."""
+    try:
+        evaluation = StoredEvaluation(
+            body.request_id, body.candidates, body.max_budget, body.prefer_performance,
+            body.weights, body.compute_weights, body.skyband_k,
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"malformed candidate: {e}")
+    EVALUATIONS.put(evaluation)
+    return {"ok": True, "candidates": len(evaluation)}
+
+
+@app.post("/api/rerank/{request_id}")
+async def rerank(request_id: str, body: RerankBody):
+    """Re-score a finished request with a new budget / preference / weights and stream the new order."""
+    evaluation = EVALUATIONS.get(request_id)
+    if evaluation is None:
+        raise HTTPException(status_code=404, detail=f"no retained evaluation for {request_id}")
+
+    start = time.perf_counter()
+    try:
+        result = evaluation.rerank(
+            max_budget=body.max_budget,
+            prefer_performance=body.prefer_performance,
+            weights=body.weights,
+            compute_weights=body.compute_weights,
+            top_k=body.top_k,
+            budget_tolerance=BUDGET_TOLERANCE,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    result["elapsed_us"] = round((time.perf_counter() - start) * 1e6, 1)
+
+    # The request's own stream is closed (or still busy with negotiation), so
+    # each re-rank gets a stream of its own
+    stream_id = f"{request_id}.rerank-{uuid4().hex[:8]}"
+    await push_event(
+        stream_id,
+        f"🔁 What-if re-rank (budget=${result['max_budget']:.0f}, "
+        f"prefer_performance={result['prefer_performance']}) over {result['eligible_candidates']} "
+        f"of {result['total_candidates']} candidates in {result['elapsed_us']:.0f}µs:",
+    )
+    for i, r in enumerate(result["ranked"], 1):
+        await push_event(stream_id, f"   {i}. {r['model']} → final={r['score']:.3f}")
+    for note in result["notes"]:
+        await push_event(stream_id, f"⚠️ {note}")
+    await close_stream(stream_id)
+    return {"request_id": request_id, "stream_id": stream_id, **result}
+
+
+@app.post("/api/sweep/{request_id}")
+def sweep(request_id: str, body: SweepBody):
+    """Winner and negotiated totals for a request over a budgets × quantities grid."""
+    evaluation = EVALUATIONS.get(request_id)
+    if evaluation is None:
+        raise HTTPException(status_code=404, detail=f"no retained evaluation for {request_id}")
+    if len(body.budgets) * len(body.quantities) > SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=422, detail=f"sweep grid exceeds {SWEEP_MAX_POINTS} points")
+
+    snap = CATALOG.current
+    bulk_pricing = [(snap.get(lid) or {}).get("bulk_pricing", []) for lid in evaluation.ids]
+    start = time.perf_counter()
+    try:
+        result = evaluation.sweep(
+            body.budgets,
+            body.quantities,
+            bulk_pricing,
+            prefer_performance=body.prefer_performance,
+            weights=body.weights,
+            compute_weights=body.compute_weights,
+            budget_tolerance=BUDGET_TOLERANCE,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    result["elapsed_us"] = round((time.perf_counter() - start) * 1e6, 1)
+    return {"request_id": request_id, "catalog_version": snap.catalog_version, **result}
@@ -0,0 +1,95 @@
+# backend/payload_cache.py — Pre-encoded (plain / gzip / brotli) JSON responses with ETags
+
+import gzip
+import hashlib
+import json
+import threading
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+def encode_json(content) -> bytes:
+    """Same bytes FastAPI's JSONResponse would produce for `content`."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        token, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if token and q > 0:
+            accepted.add(token.lower())
+    return accepted
+
+
+# -----------------------------------------------------------------------------
+# 📦 Encoded payload
+# -----------------------------------------------------------------------------
+class EncodedPayload:
+    """One immutable JSON body, its compressed variants, and a content-hash ETag."""
+
+    def __init__(self, body: bytes):
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.encodings = {"identity": body, "gzip": gzip.compress(body, compresslevel=6, mtime=0)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(body)
+
+    def response(self, request: Request, extra_headers: Optional[dict] = None) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+            **(extra_headers or {}),
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or self.etag in [t.strip() for t in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.encodings:
+                headers["Content-Encoding"] = encoding
+                return Response(self.encodings[encoding], media_type="application/json", headers=headers)
+        return Response(self.encodings["identity"], media_type="application/json", headers=headers)
+
+
+class PayloadCache:
+    """
+    Builds an `EncodedPayload` once per source version and reuses it until the
+    version changes, so an unchanged catalog is never re-serialized. `build`
+    receives the `source` passed to `get` (e.g. the catalog snapshot).
+    """
+
+    def __init__(self, build: Callable[[object], object]):
+        self._build = build
+        self._lock = threading.Lock()
+        self._entry = (None, None)  # (version, EncodedPayload), swapped as one reference
+
+    def get(self, version=None, source=None) -> EncodedPayload:
+        cached_version, payload = self._entry
+        if payload is not None and cached_version == version:
+            return payload
+        with self._lock:
+            cached_version, payload = self._entry
+            if payload is None or cached_version != version:
+                payload = EncodedPayload(encode_json(self._build(source)))
+                self._entry = (version, payload)
+            return payload
@@ -0,0 +1,239 @@
+# backend/scoring.py — CUDOS-style processor / warranty / shipping scoring (batch engine)
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from agents.taxonomy import match_processor_weight
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+# -----------------------------------------------------------------------------
+# 🧮 Scalar reference kernels
+# -----------------------------------------------------------------------------
+def processor_score(processor: str, factors: dict) -> float:
+    return match_processor_weight(processor, factors["processor_weights"], default=0.7)
+
+
+def warranty_score(warranty, factors: dict) -> float:
+    return min(warranty / factors["max_warranty_years"], 1.0)
+
+
+def shipping_score(shipping_days, factors: dict) -> float:
+    max_shipping = factors["max_shipping_days"]
+    return round((max_shipping - shipping_days) / max_shipping, 2)
+
+
+def score_rows(laptops: List[dict], factors: dict) -> List[Dict]:
+    """Row-at-a-time scoring (reference implementation, used without NumPy)."""
+    return [
+        {
+            "id": laptop["id"],
+            "processor_score": processor_score(laptop["specs"]["processor"], factors),
+            "warranty_score": warranty_score(laptop["warranty_years"], factors),
+            "shipping_score": shipping_score(laptop["shipping_days"], factors),
+        }
+        for laptop in laptops
+    ]
+
+
+# -----------------------------------------------------------------------------
+# ⚡ Vectorized batch engine
+# -----------------------------------------------------------------------------
+def _lookup(column, kernel, factors: dict):
+    """
+    Evaluate `kernel` once per distinct value and gather the results back to
+    row order. Results stay the exact Python objects the scalar kernel returns
+    (object array), so output is byte-identical to `score_rows`.
+    """
+    uniques, inverse = np.unique(column, return_inverse=True)
+    table = np.empty(len(uniques), dtype=object)
+    table[:] = [kernel(u.item(), factors) for u in uniques]
+    return table[inverse.reshape(-1)]
+
+
+def score_columns(ids, processors, warranty, shipping, factors: dict) -> List[Dict]:
+    """Score column sequences (ids / processor / warranty_years / shipping_days)."""
+    if not HAS_NUMPY or not len(ids):
+        return [
+            {
+                "id": i,
+                "processor_score": processor_score(p, factors),
+                "warranty_score": warranty_score(w, factors),
+                "shipping_score": shipping_score(d, factors),
+            }
+            for i, p, w, d in zip(ids, processors, warranty, shipping)
+        ]
+
+    processors = np.asarray(processors)
+    warranty = np.asarray(warranty)
+    shipping = np.asarray(shipping)
+
+    proc_scores = _lookup(processors, processor_score, factors)
+    if warranty.dtype.kind in "iuf":
+        warranty_scores = np.minimum(warranty / factors["max_warranty_years"], 1.0)
+    else:
+        warranty_scores = _lookup(warranty, warranty_score, factors)
+    # Python's round() is correctly rounded; np.round is not, so go via distinct values
+    shipping_scores = _lookup(shipping, shipping_score, factors)
+
+    return [
+        {"id": i, "processor_score": p, "warranty_score": w, "shipping_score": s}
+        for i, p, w, s in zip(ids, proc_scores.tolist(), warranty_scores.tolist(), shipping_scores.tolist())
+    ]
+
+
+def score_batch(laptops: List[dict], factors: dict) -> List[Dict]:
+    """Score a batch as column arrays; same results as `score_rows`."""
+    if not HAS_NUMPY or not laptops:
+        return score_rows(laptops, factors)
+    return score_columns(
+        [laptop["id"] for laptop in laptops],
+        [laptop["specs"]["processor"] for laptop in laptops],
+        [laptop["warranty_years"] for laptop in laptops],
+        [laptop["shipping_days"] for laptop in laptops],
+        factors,
+    )
+
+
+# -----------------------------------------------------------------------------
+# 📚 Scoring factors (hot-reloaded) + per-SKU score table
+# -----------------------------------------------------------------------------
+class ScoringFactors:
+    """scoring_factors.json plus a content-hash version; reloads when the file changes."""
+
+    def __init__(self, path: Path, check_interval_s: float = 1.0):
+        self.path = Path(path)
+        self.check_interval_s = check_interval_s
+        self._checked_at = 0.0
+        self._stamp = None
+        self.factors: dict = {}
+        self.version = ""
+        self.reload()
+
+    def reload(self) -> None:
+        st = os.stat(self.path)
+        raw = self.path.read_bytes()
+        self.factors = json.loads(raw)
+        self.version = hashlib.sha256(raw).hexdigest()[:12]
+        self._stamp = (st.st_mtime_ns, st.st_size)
+
+    def refresh_if_changed(self) -> bool:
+        """Re-read the file if its mtime/size moved (checked at most once per interval)."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return False
+        self._checked_at = now
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        if (st.st_mtime_ns, st.st_size) == self._stamp:
+            return False
+        old_version = self.version
+        self.reload()
+        return self.version != old_version
+
+
+class ScoreTableVersion:
+    """One immutable generation of the score table (base entries + small upsert delta)."""
+
+    def __init__(self, factor_version: str, factors: dict, entries: Dict[str, tuple], delta: Optional[Dict[str, tuple]] = None):
+        self.factor_version = factor_version
+        self.factors = factors
+        self.entries = entries  # id -> ((processor, warranty, shipping), result)
+        self.delta = delta or {}  # same shape, rows upserted since the last compaction
+
+    def __len__(self) -> int:
+        return len(self.entries) + sum(1 for i in self.delta if i not in self.entries)
+
+    def entry(self, laptop_id: str) -> Optional[tuple]:
+        entry = self.delta.get(laptop_id)
+        return entry if entry is not None else self.entries.get(laptop_id)
+
+    def get(self, laptop_id: str) -> Optional[Dict]:
+        entry = self.entry(laptop_id)
+        return entry[1] if entry is not None else None
+
+    def lookup(self, laptop: dict) -> Optional[Dict]:
+        """Cached result for a full laptop dict, or None if unknown / inputs differ."""
+        entry = self.entry(laptop["id"])
+        if entry is None:
+            return None
+        inputs = (laptop["specs"]["processor"], laptop["warranty_years"], laptop["shipping_days"])
+        return entry[1] if entry[0] == inputs else None
+
+
+class ScoreTable:
+    """
+    Processor / warranty / shipping scores for every catalog SKU, keyed by id.
+
+    Entries remember the inputs they were computed from, so a lookup only hits
+    when the caller's laptop still matches. `sync` builds a new generation and
+    publishes it as one reference, so readers never see a half-built table.
+    When the factor version is unchanged, SKUs whose inputs did not change are
+    carried over instead of rescored. `upsert` rescores only the given rows and
+    layers them on the current generation as a delta, folded into the base
+    entries once it grows past `compact_at`.
+    """
+
+    compact_at = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = ScoreTableVersion("", {}, {})
+
+    def sync(self, ids, processors, warranty, shipping, factors: dict, factor_version: str) -> int:
+        """Bring the table in line with the given catalog columns; returns rows rescored."""
+        with self._lock:
+            cur = self.current
+            same_factors = factor_version == cur.factor_version
+            entries: Dict[str, tuple] = {}
+            stale = []
+            for pos, (i, p, w, d) in enumerate(zip(ids, processors, warranty, shipping)):
+                entry = cur.entry(i) if same_factors else None
+                if entry is not None and entry[0] == (p, w, d):
+                    entries[i] = entry
+                else:
+                    stale.append(pos)
+
+            if stale:
+                results = score_columns(
+                    [ids[pos] for pos in stale],
+                    [processors[pos] for pos in stale],
+                    [warranty[pos] for pos in stale],
+                    [shipping[pos] for pos in stale],
+                    factors,
+                )
+                for pos, result in zip(stale, results):
+                    entries[ids[pos]] = ((processors[pos], warranty[pos], shipping[pos]), result)
+
+            self.current = ScoreTableVersion(factor_version, factors, entries)
+            return len(stale)
+
+    def upsert(self, laptops: List[dict]) -> int:
+        """Rescore changed catalog rows against the current factors; returns rows rescored."""
+        with self._lock:
+            cur = self.current
+            changed = [laptop for laptop in laptops if cur.lookup(laptop) is None]
+            if not changed:
+                return 0
+            delta = dict(cur.delta)
+            for laptop, result in zip(changed, score_batch(changed, cur.factors)):
+                inputs = (laptop["specs"]["processor"], laptop["warranty_years"], laptop["shipping_days"])
+                delta[laptop["id"]] = (inputs, result)
+            if len(delta) > self.compact_at:
+                self.current = ScoreTableVersion(cur.factor_version, cur.factors, {**cur.entries, **delta})
+            else:
+                self.current = ScoreTableVersion(cur.factor_version, cur.factors, cur.entries, delta)
+            return len(changed)
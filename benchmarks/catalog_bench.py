@@ -0,0 +1,290 @@
+# benchmarks/catalog_bench.py — Catalog scaling benchmarks (load / filter / serialize / score)
+#
+# Runs each catalog size in its own subprocess so peak RSS and allocator state
+# never leak between sizes. Everything is offline: the backend modules are
+# exercised directly (no FastAPI server, no uAgents network).
+#
+#   python -m benchmarks.catalog_bench                        # 1k → 1M
+#   python -m benchmarks.catalog_bench --sizes 1000,10000 --out /tmp/bench.json
+#   python -m benchmarks.compare old.json new.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+# -----------------------------------------------------------------------------
+# 📏 Measurement helpers
+# -----------------------------------------------------------------------------
+def _reset_peak_rss() -> None:
+    """Reset the kernel's high-water mark (Linux) so each stage reports its own peak."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+    }
+
+
+def measure(fn: Callable[[], object], runs: int = 1, rows: int = 0) -> dict:
+    """Run `fn` `runs` times; latency percentiles, rows/s throughput and stage peak RSS."""
+    _reset_peak_rss()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    stats = _latency(samples)
+    if rows:
+        stats["rows_per_s"] = round(rows / statistics.median(samples))
+    stats["peak_rss_mb"] = _peak_rss_mb()
+    return stats
+
+
+# -----------------------------------------------------------------------------
+# 🧪 One catalog size (runs inside a worker subprocess)
+# -----------------------------------------------------------------------------
+def _queries(rows: List[dict], count: int, seed: int) -> List[SimpleNamespace]:
+    """Seeded ProcurementRequest-shaped filters drawn from the catalog's own values."""
+    rng = random.Random(seed)
+    use_cases = sorted({uc for r in rows[:5000] for uc in r["use_cases"]})
+    brands = sorted({r["brand"] for r in rows[:5000]})
+    return [
+        SimpleNamespace(
+            use_case=rng.choice(use_cases),
+            min_ram_gb=rng.choice([None, 8, 16, 32]),
+            min_storage_gb=rng.choice([None, 256, 512, 1000]),
+            preferred_brand=rng.choice([None, None, None] + brands),
+            quantity=rng.choice([1, 5, 10, 25, 50]),
+            max_budget_per_unit=rng.choice([800, 1200, 1500, 2000, 3000]),
+        )
+        for _ in range(count)
+    ]
+
+
+def run_size(size: int, seed: int, queries: int, workdir: Path) -> dict:
+    from agents.catalog_feed import BUDGET_TOLERANCE, filter_rows
+    from backend.catalog_index import CatalogIndex
+    from backend.catalog_snapshot import Catalog
+    from backend.catalog_store import CatalogStore, compile_catalog
+    from backend.payload_cache import EncodedPayload, encode_json
+    from backend.scoring import HAS_NUMPY, ScoreTable, score_batch, score_rows
+    from benchmarks.synth_catalog import write_catalog
+
+    json_path = workdir / f"laptops-{size}.json"
+    store_path = workdir / f"laptops-{size}.cat"
+    factors = json.loads((ROOT / "data" / "scoring_factors.json").read_text())
+    repeat = 5 if size <= 10_000 else 3 if size <= 100_000 else 1
+    stages: Dict[str, dict] = {}
+    state: Dict[str, object] = {}
+
+    stages["generate"] = measure(lambda: write_catalog(json_path, size, seed), rows=size)
+    stages["generate"]["json_bytes"] = json_path.stat().st_size
+
+    # --- Load ---------------------------------------------------------------
+    stages["load_json"] = measure(
+        lambda: state.update(rows=json.loads(json_path.read_text())["laptops"]), rows=size
+    )
+    rows = state["rows"]
+    stages["compile_store"] = measure(lambda: compile_catalog(rows, store_path), rows=size)
+    stages["compile_store"]["store_bytes"] = store_path.stat().st_size
+    stages["open_store"] = measure(lambda: state.update(store=CatalogStore(store_path)), runs=repeat)
+    store = state["store"]
+    stages["build_index"] = measure(lambda: state.update(index=CatalogIndex.from_store(store)), rows=size)
+    stages["build_snapshot"] = measure(lambda: state.update(catalog=Catalog(store)), rows=size)
+    index, catalog = state["index"], state["catalog"]
+
+    # --- Filter -------------------------------------------------------------
+    msgs = _queries(rows, queries, seed)
+    scan_queries = msgs[: max(1, queries // (10 if size >= 100_000 else 1))]
+    it = iter(scan_queries * repeat)
+    stages["filter_scout_scan"] = measure(
+        lambda: sum(1 for _ in filter_rows(rows, next(it))), runs=len(scan_queries) * repeat, rows=size
+    )
+
+    def index_query(msg):
+        return index.query(
+            use_case=msg.use_case,
+            brand=msg.preferred_brand,
+            min_ram_gb=msg.min_ram_gb,
+            min_storage_gb=msg.min_storage_gb,
+            min_stock=msg.quantity,
+            max_price=msg.max_budget_per_unit * BUDGET_TOLERANCE,
+        )
+
+    it = iter(msgs * repeat)
+    stages["filter_index_query"] = measure(lambda: index_query(next(it)), runs=len(msgs) * repeat)
+    it = iter(msgs * repeat)
+    stages["filter_index_materialize"] = measure(
+        lambda: [store.row(pos) for pos in index_query(next(it))], runs=len(msgs) * repeat
+    )
+    stages["filter_index_query"]["qps"] = round(1000 / stages["filter_index_query"]["mean_ms"])
+
+    # --- Serialize ------------------------------------------------------------
+    stages["serialize_materialize"] = measure(lambda: state.update(served=store.rows()), runs=repeat, rows=size)
+    stages["serialize_json"] = measure(
+        lambda: state.update(body=encode_json({"laptops": state["served"]})), runs=repeat, rows=size
+    )
+    stages["serialize_json"]["body_bytes"] = len(state["body"])
+    stages["serialize_encode_payload"] = measure(
+        lambda: state.update(payload=EncodedPayload(state["body"])), runs=repeat, rows=size
+    )
+    stages["serialize_encode_payload"]["encoded_bytes"] = {
+        name: len(body) for name, body in state["payload"].encodings.items()
+    }
+    stages["serialize_ndjson"] = measure(
+        lambda: sum(len(json.dumps(row, separators=(",", ":"))) + 1 for row in state["served"]),
+        runs=repeat,
+        rows=size,
+    )
+    state.pop("served")
+    state.pop("body")
+    state.pop("payload")
+
+    # --- Score --------------------------------------------------------------
+    stages["score_rows"] = measure(lambda: score_rows(rows, factors), runs=repeat, rows=size)
+    if HAS_NUMPY:
+        stages["score_batch"] = measure(lambda: score_batch(rows, factors), runs=repeat, rows=size)
+    table = ScoreTable()
+    stages["score_table_sync"] = measure(
+        lambda: table.sync(*catalog.current.score_columns(), factors, "bench"), rows=size
+    )
+    stages["score_table_resync"] = measure(
+        lambda: table.sync(*catalog.current.score_columns(), factors, "bench"), runs=repeat, rows=size
+    )
+    rng = random.Random(seed)
+    ids = [rows[rng.randrange(size)]["id"] for _ in range(100)]
+    stages["score_table_ids_100"] = measure(lambda: [table.current.get(i) for i in ids], runs=200)
+
+    # --- Mutate -------------------------------------------------------------
+    def patch():
+        row = rows[rng.randrange(size)]
+        snap, changed, _, _ = catalog.upsert([{"id": row["id"], "price": round(row["price"] * 0.97, 2), "stock": 3}])
+        table.upsert(changed)
+
+    stages["mutate_patch_one"] = measure(patch, runs=50)
+
+    return {"size": size, "seed": seed, "queries": queries, "stages": stages}
+
+
+# -----------------------------------------------------------------------------
+# 🏁 Driver
+# -----------------------------------------------------------------------------
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _environment() -> dict:
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Catalog scaling benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--queries", type=int, default=200, help="filter queries per size")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        result = run_size(args.worker, args.seed, args.queries, args.workdir)
+        print(json.dumps(result))
+        return 0
+
+    commit = _git_commit()
+    out = args.out or RESULTS_DIR / f"catalog-{commit}.json"
+    report = {
+        "benchmark": "catalog",
+        "commit": commit,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "environment": _environment(),
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="procura-bench-") as workdir:
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            print(f"⏱️ {size:>9,} SKUs ...", flush=True)
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.catalog_bench", "--worker", str(size),
+                 "--seed", str(args.seed), "--queries", str(args.queries), "--workdir", workdir],
+                cwd=ROOT, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(proc.stderr, file=sys.stderr)
+                report["results"].append({"size": size, "error": proc.stderr.strip().splitlines()[-1:]})
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            report["results"].append(result)
+            for name, stats in result["stages"].items():
+                rate = f"{stats['rows_per_s']:>12,} rows/s" if "rows_per_s" in stats else " " * 19
+                print(f"   {name:<26} p50 {stats['p50_ms']:>10.3f} ms  {rate}  peak {stats['peak_rss_mb']:>8.1f} MB")
+            for path in Path(workdir).glob(f"laptops-{size}.*"):
+                path.unlink()
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"✅ Results → {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
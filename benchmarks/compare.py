@@ -0,0 +1,46 @@
+# benchmarks/compare.py — Diff two catalog_bench result files stage by stage
+#
+#   python -m benchmarks.compare benchmarks/results/catalog-abc123.json benchmarks/results/catalog-def456.json
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _by_size(report: dict) -> dict:
+    return {r["size"]: r["stages"] for r in report["results"] if "stages" in r}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    base = json.loads(args.baseline.read_text())
+    cand = json.loads(args.candidate.read_text())
+    print(f"📊 {base.get('commit')} → {cand.get('commit')}")
+
+    regressions = 0
+    base_sizes, cand_sizes = _by_size(base), _by_size(cand)
+    for size in sorted(set(base_sizes) & set(cand_sizes)):
+        print(f"\n{size:,} SKUs")
+        for name, new in cand_sizes[size].items():
+            old = base_sizes[size].get(name)
+            if old is None:
+                print(f"   {name:<26} (new) p50 {new['p50_ms']:.3f} ms")
+                continue
+            ratio = new["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("inf")
+            flag = "⚠️" if ratio >= args.threshold else "  "
+            regressions += ratio >= args.threshold
+            print(
+                f"{flag} {name:<26} p50 {old['p50_ms']:>10.3f} → {new['p50_ms']:>10.3f} ms ({ratio:5.2f}x)"
+                f"  peak {old['peak_rss_mb']:>8.1f} → {new['peak_rss_mb']:>8.1f} MB"
+            )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/synth_catalog.py — Seeded synthetic laptop catalogs (data/laptops.json schema)
+#
+# Rows are built from the vocabulary of the real catalog (brands, suppliers,
+# processors, GPUs, use cases, bulk tiers) with seeded jitter on prices, stock
+# and ratings, so filters and scorers see realistic selectivity at any size.
+#
+#   python -m benchmarks.synth_catalog 100000 --seed 7 --out /tmp/laptops-100k.json
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Iterator, List
+
+SEED_CATALOG = Path(__file__).parent.parent / "data" / "laptops.json"
+
+
+def _vocabulary(seed_rows: List[dict]) -> dict:
+    def distinct(values):
+        return sorted(set(values), key=str)
+
+    return {
+        "templates": seed_rows,
+        "brands": distinct(r["brand"] for r in seed_rows),
+        "suppliers": distinct(r["supplier"] for r in seed_rows),
+        "processors": distinct(r["specs"]["processor"] for r in seed_rows),
+        "gpus": distinct(r["specs"]["gpu"] for r in seed_rows),
+        "use_cases": distinct(uc for r in seed_rows for uc in r["use_cases"]),
+        "bulk_pricing": [r["bulk_pricing"] for r in seed_rows],
+    }
+
+
+def iter_catalog(size: int, seed: int = 42, seed_catalog: Path = SEED_CATALOG) -> Iterator[dict]:
+    """Yield `size` laptops; the same (size, seed) always yields the same rows."""
+    rng = random.Random(seed)
+    vocab = _vocabulary(json.loads(Path(seed_catalog).read_text())["laptops"])
+
+    for i in range(size):
+        tpl = rng.choice(vocab["templates"])
+        specs = tpl["specs"]
+        # Mostly the template's own pairing, sometimes a cross-over, so the
+        # processor / GPU / brand distributions stay close to the real catalog
+        processor = specs["processor"] if rng.random() < 0.8 else rng.choice(vocab["processors"])
+        gpu = specs["gpu"] if rng.random() < 0.8 else rng.choice(vocab["gpus"])
+        brand = tpl["brand"] if rng.random() < 0.9 else rng.choice(vocab["brands"])
+        use_cases = list(tpl["use_cases"])
+        if rng.random() < 0.3:
+            use_cases.append(rng.choice(vocab["use_cases"]))
+            use_cases = list(dict.fromkeys(use_cases))
+
+        yield {
+            "id": f"lap-{i + 1:07d}",
+            "model": f"{tpl['model']} G{rng.randint(1, 9)}",
+            "brand": brand,
+            "specs": {
+                "processor": processor,
+                "ram_gb": rng.choice([8, 16, 16, 32, 32, 64]) if rng.random() < 0.3 else specs["ram_gb"],
+                "storage_gb": rng.choice([256, 512, 1000, 2000]) if rng.random() < 0.3 else specs["storage_gb"],
+                "gpu": gpu,
+                "screen_size": specs["screen_size"],
+                "weight_lbs": round(specs["weight_lbs"] * rng.uniform(0.9, 1.1), 1),
+            },
+            "price": round(tpl["price"] * rng.uniform(0.75, 1.25), 2),
+            "supplier": rng.choice(vocab["suppliers"]),
+            "rating": round(min(5.0, max(3.0, tpl["rating"] + rng.uniform(-0.4, 0.3))), 1),
+            "review_count": rng.randint(5, 5000),
+            "shipping_days": rng.randint(1, 10),
+            "warranty_years": rng.choice([1, 1, 2, 3]),
+            "stock": rng.randint(0, 300),
+            "use_cases": use_cases,
+            "bulk_pricing": rng.choice(vocab["bulk_pricing"]),
+        }
+
+
+def generate_catalog(size: int, seed: int = 42) -> List[dict]:
+    return list(iter_catalog(size, seed))
+
+
+def write_catalog(path: Path, size: int, seed: int = 42) -> Path:
+    """Write a {"laptops": [...]} file without holding all rows as one document."""
+    path = Path(path)
+    with path.open("w") as f:
+        f.write('{"laptops": [')
+        for k, row in enumerate(iter_catalog(size, seed)):
+            if k:
+                f.write(",")
+            f.write(json.dumps(row))
+        f.write("]}")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic laptops.json")
+    parser.add_argument("size", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args()
+    write_catalog(args.out, args.size, args.seed)
+    print(f"✅ Wrote {args.size} laptops → {args.out}")
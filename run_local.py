@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import uvicorn
 import subprocess
@@ -7,16 +8,20 @@ import os
 # FastAPI app import
 from backend.main import app
 
-async def start_agents():
-    print("🚀 Starting agents as separate processes...\n")
-    
-    agent_scripts = [
-        ("agents/orchestrator.py", "orchestrator_agent"),
-        ("agents/scout.py", "scout_agent"),
-        ("agents/compute_agent.py", "compute_agent"),   # ✅ NEW LINE
-        ("agents/evaluator.py", "evaluator_agent"),
-        ("agents/negotiator.py", "negotiator_agent")
-    ]
+async def start_agents(mode: str):
+    if mode == "fused":
+        # Scout / Compute / Evaluator / Negotiator run inside the orchestrator process
+        print("🚀 Starting orchestrator with in-process pipeline stages (fused mode)...\n")
+        agent_scripts = [("agents/orchestrator.py", "orchestrator_agent")]
+    else:
+        print("🚀 Starting agents as separate processes...\n")
+        agent_scripts = [
+            ("agents/orchestrator.py", "orchestrator_agent"),
+            ("agents/scout.py", "scout_agent"),
+            ("agents/compute_agent.py", "compute_agent"),   # ✅ NEW LINE
+            ("agents/evaluator.py", "evaluator_agent"),
+            ("agents/negotiator.py", "negotiator_agent")
+        ]
     
     processes = []
     
@@ -24,6 +29,7 @@ async def start_agents():
     env = os.environ.copy()
     project_root = os.getcwd()
     env['PYTHONPATH'] = project_root
+    env['PIPELINE_MODE'] = mode
     
     for script, name in agent_scripts:
         script_path = os.path.join(project_root, script)
@@ -89,9 +95,9 @@ async def start_fastapi():
     server = uvicorn.Server(config)
     await server.serve()
 
-async def main():
+async def main(mode: str):
     await asyncio.gather(
-        start_agents(),
+        start_agents(mode),
         start_fastapi()
     )
 
@@ -100,7 +106,17 @@ if __name__ == "__main__":
     print("🔥 Local Multi-Agent Orchestration 🔥")
     print("===================================\n")
     
+    parser = argparse.ArgumentParser(description="Run the gateway and agents locally")
+    parser.add_argument(
+        "--mode",
+        choices=["distributed", "fused"],
+        default=os.getenv("PIPELINE_MODE", "distributed"),
+        help="distributed: one process per agent; fused: all stages in the orchestrator process",
+    )
+    args = parser.parse_args()
+
     # Verify we're in the right directory
-    print(f"Working directory: {os.getcwd()}\n")
+    print(f"Working directory: {os.getcwd()}")
+    print(f"Pipeline mode: {args.mode}\n")
     
-    asyncio.run(main())
+    asyncio.run(main(args.mode))
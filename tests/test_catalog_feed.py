@@ -0,0 +1,57 @@
+# tests/test_catalog_feed.py — CatalogReplica fetches and client lifetime
+
+import asyncio
+
+import httpx
+
+import agents.catalog_feed as catalog_feed
+from agents.catalog_feed import CatalogReplica
+
+ROWS = [{"id": "lap-001"}, {"id": "lap-002"}]
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.headers.get("if-none-match") == '"v1"':
+        return httpx.Response(304)
+    return httpx.Response(200, json={"laptops": ROWS}, headers={"etag": '"v1"', "x-catalog-version": "e.1"})
+
+
+def test_default_client_is_closed_after_each_fetch(monkeypatch):
+    clients = []
+
+    class RecordingClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(handler), **kwargs)
+            clients.append(self)
+
+    monkeypatch.setattr(catalog_feed.httpx, "AsyncClient", RecordingClient)
+
+    async def run():
+        replica = CatalogReplica("http://catalog/api/laptops")
+        await replica.refresh()
+        await replica.refresh()  # revalidation: 304
+        return replica
+
+    replica = asyncio.run(run())
+    assert replica.rows == ROWS and replica.catalog_version == "e.1" and replica.version == 1
+    assert len(clients) == 2 and all(c.is_closed for c in clients)
+
+
+def test_client_factory_is_reused_and_left_open():
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        calls = []
+
+        def factory():
+            calls.append(client)
+            return client
+
+        replica = CatalogReplica("http://catalog/api/laptops", client_factory=factory)
+        await replica.refresh()
+        await replica.refresh()
+        closed = client.is_closed
+        await client.aclose()
+        return replica, calls, closed
+
+    replica, calls, closed = asyncio.run(run())
+    assert replica.rows == ROWS and len(calls) == 2 and not closed
@@ -0,0 +1,94 @@
+# tests/test_catalog_index.py — CatalogIndex query planning vs. a brute-force filter
+
+import random
+
+import pytest
+
+from backend.catalog_index import CatalogIndex
+
+USE_CASES = ["office-work", "programming", "video-editing", "gaming", "data-science"]
+BRANDS = ["Dell", "Lenovo", "HP", "ASUS", "Apple"]
+
+
+def make_rows(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"lap-{i:04d}",
+            "brand": rng.choice(BRANDS),
+            "price": round(rng.uniform(400, 3000), 2),
+            "stock": rng.randrange(0, 60),
+            "use_cases": rng.sample(USE_CASES, rng.randrange(0, 3)),
+            "specs": {"ram_gb": rng.choice([8, 16, 32, 64]), "storage_gb": rng.choice([256, 512, 1024, 2048])},
+        }
+        for i in range(n)
+    ]
+
+
+def brute_force(rows, use_case=None, brand=None, min_ram_gb=None, min_storage_gb=None, min_stock=None, max_price=None):
+    return [
+        pos for pos, r in enumerate(rows)
+        if (use_case is None or use_case in r["use_cases"])
+        and (not brand or r["brand"].lower() == brand.lower())
+        and (not min_ram_gb or r["specs"]["ram_gb"] >= min_ram_gb)
+        and (not min_storage_gb or r["specs"]["storage_gb"] >= min_storage_gb)
+        and (min_stock is None or r["stock"] >= min_stock)
+        and (max_price is None or r["price"] <= max_price)
+    ]
+
+
+def random_query(rng):
+    return {
+        "use_case": rng.choice([None, *USE_CASES, "unknown"]),
+        "brand": rng.choice([None, "", *BRANDS, "dell", "nobody"]),
+        "min_ram_gb": rng.choice([None, 0, 16, 32, 128]),
+        "min_storage_gb": rng.choice([None, 512, 2048]),
+        "min_stock": rng.choice([None, 0, 10, 59]),
+        "max_price": rng.choice([None, 399.0, 1000.0, 2500.0]),
+    }
+
+
+def test_empty_query_returns_every_row():
+    rows = make_rows(50)
+    assert CatalogIndex.from_rows(rows).query() == list(range(50))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_query_matches_brute_force(seed):
+    rows = make_rows(400, seed)
+    index = CatalogIndex.from_rows(rows)
+    rng = random.Random(seed)
+    for _ in range(200):
+        q = random_query(rng)
+        assert index.query(**q) == brute_force(rows, **q), q
+
+
+def test_with_changes_matches_a_rebuilt_index_and_leaves_the_old_one_alone():
+    rows = make_rows(300)
+    index = CatalogIndex.from_rows(rows)
+    rng = random.Random(1)
+    before = {i: index.query(**q) for i, q in enumerate(random_query(rng) for _ in range(50))}
+
+    current, changed_rows = index, list(rows)
+    for step in range(20):
+        changes = {}
+        for _ in range(rng.randrange(1, 6)):
+            pos = rng.randrange(len(changed_rows) + 2)  # some appends
+            pos = min(pos, len(changed_rows))
+            row = make_rows(1, seed=1000 + step * 10 + len(changes))[0]
+            changes[pos] = row
+            if pos == len(changed_rows):
+                changed_rows.append(row)
+            else:
+                changed_rows[pos] = row
+        current = current.with_changes(changes)
+
+    rebuilt = CatalogIndex.from_rows(changed_rows)
+    rng = random.Random(2)
+    for _ in range(200):
+        q = random_query(rng)
+        assert current.query(**q) == rebuilt.query(**q) == brute_force(changed_rows, **q), q
+
+    rng = random.Random(1)
+    for i, q in enumerate(random_query(rng) for _ in range(50)):
+        assert index.query(**q) == before[i] == brute_force(rows, **q)
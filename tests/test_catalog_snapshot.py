@@ -0,0 +1,110 @@
+# tests/test_catalog_snapshot.py — Copy-on-write catalog snapshots, validation and LayeredMap
+
+import copy
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from backend.catalog_index import LayeredMap
+from backend.catalog_snapshot import Catalog, CatalogValidationError, validate_row
+from backend.catalog_store import CatalogStore, compile_catalog
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+ROWS = json.loads((DATA / "laptops.json").read_text())["laptops"]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "laptops.cat"
+    compile_catalog(ROWS, path, source={})
+    return Catalog(CatalogStore(path))
+
+
+def new_row(laptop_id, **fields):
+    return {**copy.deepcopy(ROWS[0]), "id": laptop_id, **fields}
+
+
+def test_old_snapshot_is_unchanged_after_upsert(catalog):
+    before = catalog.current
+    first = ROWS[0]["id"]
+    snap, rows, updated, inserted = catalog.upsert([{"id": first, "price": 1.0}, new_row("lap-new")])
+    assert (updated, inserted) == (1, 1)
+    assert snap.version == before.version + 1
+    assert before.get(first)["price"] == ROWS[0]["price"]
+    assert before.get("lap-new") is None and len(before) == len(ROWS)
+    assert snap.get(first)["price"] == 1.0 and snap.get("lap-new")["id"] == "lap-new"
+    assert catalog.snapshot(before.catalog_version) is before
+
+
+def test_snapshot_rows_are_copies(catalog):
+    snap = catalog.current
+    snap.rows[0]["price"] = -1
+    assert snap.rows[0]["price"] == ROWS[0]["price"]
+
+
+@pytest.mark.parametrize("patch", [{"price": "abc"}, {"brand": None}, {"specs": {"ram_gb": "lots"}}])
+def test_type_mismatch_is_rejected(catalog, patch):
+    before = catalog.current
+    with pytest.raises(CatalogValidationError):
+        catalog.upsert([{"id": ROWS[0]["id"], **patch}])
+    assert catalog.current is before
+
+
+def test_missing_fields_are_rejected():
+    row = new_row("lap-x")
+    del row["specs"]["gpu"]
+    with pytest.raises(CatalogValidationError, match="specs.gpu"):
+        validate_row(row)
+
+
+def test_values_are_coerced(catalog):
+    row = validate_row(new_row("lap-x", price="999.5", specs={**ROWS[0]["specs"], "ram_gb": "16", "tdp_w": 45}))
+    assert row["price"] == 999.5 and row["specs"]["ram_gb"] == 16 and row["specs"]["tdp_w"] == 45
+    snap, _, _, _ = catalog.upsert([{"id": ROWS[0]["id"], "specs": {"ram_gb": "64"}}])
+    assert snap.get(ROWS[0]["id"])["specs"]["ram_gb"] == 64
+
+
+def test_before_publish_runs_before_the_snapshot_is_visible(catalog):
+    before = catalog.current
+    seen = []
+    catalog.upsert([{"id": ROWS[1]["id"], "stock": 3}], before_publish=lambda rows: seen.append((catalog.current, rows)))
+    (current, rows), = seen
+    assert current is before
+    assert [r["stock"] for r in rows] == [3]
+    assert catalog.current.version == before.version + 1
+
+
+def test_many_upserts_match_a_plain_dict(catalog):
+    rng = random.Random(9)
+    expected = {r["id"]: r["price"] for r in ROWS}
+    snapshots = []
+    for step in range(300):
+        if rng.random() < 0.3:
+            laptop_id = f"lap-new-{step}"
+            catalog.upsert([new_row(laptop_id, price=float(step))])
+        else:
+            laptop_id = rng.choice(list(expected))
+            catalog.upsert([{"id": laptop_id, "price": float(step)}])
+        expected[laptop_id] = float(step)
+        snapshots.append((catalog.current, dict(expected)))
+    for snap, prices in snapshots[::37] + snapshots[-1:]:
+        assert len(snap) == len(prices)
+        assert {r["id"]: r["price"] for r in snap.rows} == prices
+
+
+def test_layered_map_matches_dict():
+    rng = random.Random(3)
+    base = {i: i for i in range(500)}
+    layered, plain = LayeredMap(dict(base)), dict(base)
+    history = []
+    for _ in range(400):
+        changes = {rng.randrange(700): rng.random() for _ in range(rng.randrange(1, 8))}
+        layered, plain = layered.updated(changes), {**plain, **changes}
+        history.append((layered, dict(plain)))
+        assert len(layered.layers) <= 12
+    for m, expected in history:
+        assert dict(m.items()) == expected
+        assert all(m[k] == v and k in m for k, v in expected.items())
+        assert m.get(-1, "missing") == "missing" and -1 not in m
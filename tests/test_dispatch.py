@@ -0,0 +1,87 @@
+# tests/test_dispatch.py — Replica selection, consistent hashing and re-dispatch
+
+import asyncio
+import time
+from collections import Counter
+
+from agents.dispatch import ReplicaSet, dispatch, parse_addresses, redispatch_expired
+
+ADDRS = [f"agent{i}" for i in range(4)]
+IDS = [f"req-{i}" for i in range(4000)]
+
+
+class FakeCtx:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, address, message):
+        self.sent.append((address, message))
+
+
+def test_parse_addresses():
+    assert parse_addresses(" a, b,,a ,c ") == ["a", "b", "c"]
+    assert parse_addresses("") == []
+
+
+def test_hash_is_deterministic_and_balanced():
+    first, second = ReplicaSet("s", ADDRS, "hash"), ReplicaSet("s", list(reversed(ADDRS)), "hash")
+    picks = [first.pick(rid) for rid in IDS]
+    assert picks == [second.pick(rid) for rid in IDS]
+    shares = Counter(picks)
+    assert set(shares) == set(ADDRS)
+    assert max(shares.values()) < 2 * min(shares.values())
+
+
+def test_adding_a_replica_only_moves_keys_to_it():
+    before = ReplicaSet("s", ADDRS, "hash")
+    after = ReplicaSet("s", ADDRS + ["agent4"], "hash")
+    moved = [rid for rid in IDS if before.pick(rid) != after.pick(rid)]
+    assert all(after.pick(rid) == "agent4" for rid in moved)
+    assert len(moved) < len(IDS) / 3
+
+
+def test_removing_a_replica_only_moves_its_keys():
+    before = ReplicaSet("s", ADDRS, "hash")
+    after = ReplicaSet("s", ADDRS[1:], "hash")
+    for rid in IDS:
+        if before.pick(rid) != ADDRS[0]:
+            assert after.pick(rid) == before.pick(rid)
+
+
+def test_least_outstanding_and_down_replicas():
+    rs = ReplicaSet("s", ADDRS[:3], "least")
+    for i in range(6):
+        rs.sent(f"r{i}", rs.pick(f"r{i}"), None)
+    assert [r.outstanding for r in rs.replicas.values()] == [2, 2, 2]
+    rs.complete("r0", "x")
+    freed = next(a for a, r in rs.replicas.items() if r.outstanding == 1)
+    assert rs.pick("new") == freed
+
+    rs.replicas[freed].down_until = float("inf")
+    assert rs.pick("new") != freed
+    assert rs.pick("new", exclude=tuple(a for a in ADDRS[:3] if a != freed)) == freed  # all else excluded
+
+
+def test_late_duplicates_are_dropped():
+    rs = ReplicaSet("s", ADDRS, "hash")
+    rs.sent("r", "agent0", "msg")
+    assert rs.complete("r", "agent0") is True
+    assert rs.complete("r", "agent1") is False
+    rs.sent("r", "agent0", "msg")  # a follow-up request expects a new reply
+    assert rs.complete("r", "agent0") is True
+
+
+def test_expired_requests_move_to_untried_replicas():
+    async def run():
+        ctx, rs = FakeCtx(), ReplicaSet("s", ADDRS[:2], "hash", timeout_s=0.0, down_for_s=60.0)
+        first = await dispatch(ctx, rs, "r", "msg")
+        (rid, src, dst), = await redispatch_expired(ctx, rs)
+        assert (rid, src) == ("r", first) and dst not in (None, first)
+        assert rs.replicas[first].timeouts == 1 and not rs.replicas[first].up(time.monotonic())
+        # both replicas tried: the request is abandoned instead of bouncing
+        assert await redispatch_expired(ctx, rs) == [("r", dst, None)]
+        assert rs.in_flight("r") is None and rs.redispatched == 1
+        assert [a for a, _ in ctx.sent] == [first, dst]
+        assert all(r.outstanding == 0 for r in rs.replicas.values())
+
+    asyncio.run(run())
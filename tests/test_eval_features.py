@@ -0,0 +1,67 @@
+# tests/test_eval_features.py — Evaluator feature cache: fingerprint keys and vectorized fills
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from agents.eval_features import DEFAULT_COMPUTE, FeatureCache, value_scores
+from agents.evaluator import (
+    FEATURE_CACHE_SIZE, compute_blend, perf_scores, py_perf_score, py_price_value, py_review_signal, review_signals,
+)
+from agents.messages import LaptopOption
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+LAPTOPS = [LaptopOption(**row) for row in json.loads((DATA / "laptops.json").read_text())["laptops"]]
+
+
+def new_cache(capacity=FEATURE_CACHE_SIZE):
+    return FeatureCache(perf_scores, review_signals, compute_blend, capacity=capacity)
+
+
+def compute_map(laptops, seed=0):
+    rng = np.random.default_rng(seed)
+    return {l.id: dict(zip(("processor", "warranty", "shipping"), rng.random(3))) for l in laptops[::2]}
+
+
+def test_gather_matches_scalar_features_exactly():
+    cmap = compute_map(LAPTOPS)
+    perf, review, compute = new_cache().gather(LAPTOPS, cmap)
+    for k, l in enumerate(LAPTOPS):
+        cs = cmap.get(l.id)
+        blend = compute_blend(cs["processor"], cs["warranty"], cs["shipping"]) if cs else compute_blend(*DEFAULT_COMPUTE)
+        assert perf[k] == py_perf_score(l.specs)
+        assert review[k] == py_review_signal(l.rating, l.review_count)
+        assert compute[k] == blend
+
+
+def test_value_scores_match_scalar():
+    prices = [l.price for l in LAPTOPS]
+    for budget in (500.0, 1200.0, 4000.0):
+        assert value_scores(prices, budget).tolist() == [py_price_value(p, budget) for p in prices]
+
+
+def test_unchanged_laptops_hit_after_unrelated_changes():
+    cache, cmap = new_cache(), compute_map(LAPTOPS)
+    cache.gather(LAPTOPS, cmap)
+    misses = cache.misses
+    assert misses == len(cache) <= len(LAPTOPS)
+
+    # a price change (not a feature input) and a rating change on another laptop
+    changed = list(LAPTOPS)
+    changed[0] = changed[0].copy(update={"price": changed[0].price + 1})
+    changed[1] = changed[1].copy(update={"rating": 1.0})
+    _, review, _ = cache.gather(changed, cmap)
+    assert cache.misses == misses + 1
+    assert review[1] == py_review_signal(1.0, changed[1].review_count)
+
+
+def test_lru_eviction_keeps_results_correct():
+    cache = new_cache(capacity=len(LAPTOPS))
+    first, second = LAPTOPS[: len(LAPTOPS) // 2], LAPTOPS[len(LAPTOPS) // 2:]
+    bumped = [l.copy(update={"review_count": l.review_count + 1}) for l in second]
+    for batch in (first, bumped, first, second):
+        perf, review, _ = cache.gather(batch, {})
+        assert review.tolist() == [py_review_signal(l.rating, l.review_count) for l in batch]
+        assert perf.tolist() == [py_perf_score(l.specs) for l in batch]
+    assert len(cache) <= cache.capacity and cache.evictions > 0
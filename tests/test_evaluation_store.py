@@ -0,0 +1,87 @@
+# tests/test_evaluation_store.py — What-if re-ranks and sweeps over retained Evaluator components
+
+import random
+
+import pytest
+
+from backend.evaluation_store import EvaluationStore, StoredEvaluation
+
+WEIGHTS = {"symbolic": 0.5, "compute": 0.35, "value": 0.15}
+COMPUTE_WEIGHTS = {"processor": 0.5, "warranty": 0.3, "shipping": 0.2}
+
+
+def make_evaluation(n=40, seed=5, budget=1500.0, request_id="req", skyband_k=None):
+    rng = random.Random(seed)
+    candidates = [
+        {
+            "id": f"lap-{i}", "model": f"Model {i}", "processor": "Intel Core i7-12700H", "gpu": "NVIDIA RTX 4060",
+            "ram_gb": rng.choice([8, 16, 32]), "price": round(rng.uniform(600, 2400), 2),
+            "rating": round(rng.uniform(3, 5), 1), "review_count": rng.randrange(0, 1500),
+            "perf": rng.random(), "review": rng.random(), "processor_score": rng.random(),
+            "warranty_score": rng.random(), "shipping_score": rng.random(), "symbolic": rng.random(),
+            "engine": "fallback",
+        }
+        for i in range(n)
+    ]
+    return StoredEvaluation(request_id, candidates, budget, True, WEIGHTS, COMPUTE_WEIGHTS, skyband_k)
+
+
+@pytest.mark.parametrize("tolerance", [1.0, 1.1])
+def test_rerank_drops_candidates_sweep_would_drop(tolerance):
+    ev = make_evaluation()
+    prices = dict(zip(ev.ids, ev.columns["price"]))
+    for budget in (700.0, 1200.0, 2000.0):
+        result = ev.rerank(max_budget=budget, top_k=len(ev), budget_tolerance=tolerance)
+        ranked = [r["id"] for r in result["ranked"]]
+        assert all(prices[lid] <= budget * tolerance for lid in ranked)
+        assert len(ranked) == result["eligible_candidates"] == sum(p <= budget * tolerance for p in prices.values())
+        winner = ev.sweep([budget], [1], [[] for _ in ev.ids], budget_tolerance=tolerance)["winners"][0]
+        assert (winner or {}).get("id") == (ranked[0] if ranked else None)
+
+
+def test_rerank_orders_by_score_and_respects_top_k():
+    ev = make_evaluation()
+    result = ev.rerank(top_k=5)
+    scores = [r["score"] for r in result["ranked"]]
+    assert len(scores) == 5 and scores == sorted(scores, reverse=True)
+    assert ev.rerank(max_budget=100.0)["ranked"] == []
+
+
+def test_rerank_top_k_is_capped_by_the_skyband():
+    ev = make_evaluation(skyband_k=3)
+    assert len(ev.rerank(top_k=3)["ranked"]) == 3
+    with pytest.raises(ValueError, match="3-skyband"):
+        ev.rerank(top_k=4)
+    assert len(make_evaluation().rerank(top_k=10)["ranked"]) == 10  # no skyband, no cap
+
+
+@pytest.mark.parametrize("override", [{"weights": {"value": -0.1}}, {"compute_weights": {"shipping": -1.0}}])
+def test_rerank_rejects_negative_weights(override):
+    with pytest.raises(ValueError, match="non-negative"):
+        make_evaluation().rerank(**override)
+
+
+def test_rerank_notes_a_raised_budget():
+    ev = make_evaluation(budget=1500.0)
+    assert ev.rerank(max_budget=1200.0)["notes"] == []
+    result = ev.rerank(max_budget=2000.0)
+    assert result["original_max_budget"] == 1500.0 and "$1500" in result["notes"][0]
+
+
+def test_sweep_flags_budgets_beyond_the_original_and_rejects_negative_weights():
+    ev = make_evaluation(budget=1500.0, skyband_k=3)
+    result = ev.sweep([1000.0, 1500.0, 2500.0], [1], [[] for _ in ev.ids])
+    assert result["beyond_original_budget"] == [False, False, True]
+    assert "3-skyband" in result["notes"][0] and len(result["notes"]) == 2
+    assert len(ev.sweep([1000.0], [1], [[] for _ in ev.ids])["notes"]) == 1
+    with pytest.raises(ValueError, match="non-negative"):
+        ev.sweep([1000.0], [1], [[] for _ in ev.ids], weights={"symbolic": -0.5})
+
+
+def test_store_expires_and_evicts_lru():
+    store = EvaluationStore(max_entries=2, ttl_s=3600.0)
+    for rid in ("a", "b"):
+        store.put(make_evaluation(n=3, request_id=rid))
+    assert store.get("a") is not None  # a is now most recently used
+    store.put(make_evaluation(n=3, request_id="c"))
+    assert store.get("b") is None and store.get("a") is not None and len(store) == 2
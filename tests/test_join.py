@@ -0,0 +1,101 @@
+# tests/test_join.py — Pairing the symbolic and compute halves of an evaluation
+
+import asyncio
+
+from agents.join import HalfJoin
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_compute_first_then_symbolic_joins():
+    async def go():
+        join = HalfJoin()
+        offer = asyncio.create_task(join.offer("r", "scores", timeout_s=1.0))
+        await asyncio.sleep(0)
+        assert join.open("r")
+        half = await join.claim("r", timeout_s=1.0)
+        return join, half, await offer
+
+    join, half, outcome = run(go())
+    assert (half, outcome) == ("scores", "joined")
+    assert join.stats() == {"pending": 0, "joined": 1, "compute_late": 0, "symbolic_late": 0, "closed": 0, "dropped": 0}
+
+
+def test_symbolic_first_waits_for_compute():
+    async def go():
+        join = HalfJoin()
+        assert join.open("r")
+        claim = asyncio.create_task(join.claim("r", timeout_s=1.0))
+        await asyncio.sleep(0.01)
+        assert join.pending() == 1
+        outcome = await join.offer("r", "scores", timeout_s=1.0)
+        return join, await claim, outcome
+
+    join, half, outcome = run(go())
+    assert (half, outcome) == ("scores", "joined")
+    assert join.outcomes["joined"] == 1 and join.pending() == 0
+
+
+def test_claim_times_out_and_late_compute_half_is_dropped():
+    async def go():
+        join = HalfJoin()
+        join.open("r")
+        half = await join.claim("r", timeout_s=0.01)
+        return join, half, await join.offer("r", "scores", timeout_s=1.0)
+
+    join, half, outcome = run(go())
+    assert half is None and outcome == "late"
+    assert join.outcomes["compute_late"] == 1 and join.outcomes["dropped"] == 1
+    assert join.pending() == 0
+
+
+def test_offer_alone_when_symbolic_half_never_arrives():
+    async def go():
+        join = HalfJoin()
+        outcome = await join.offer("r", "scores", timeout_s=0.01)
+        return join, outcome, join.open("r")
+
+    join, outcome, opened = run(go())
+    assert outcome == "alone" and opened is False
+    assert join.outcomes["symbolic_late"] == 1 and join.outcomes["dropped"] == 1
+
+
+def test_close_settles_without_compute():
+    async def go():
+        join = HalfJoin()
+        join.open("r")
+        join.close("r")
+        return join, await join.offer("r", "scores", timeout_s=1.0)
+
+    join, outcome = run(go())
+    assert outcome == "late"
+    assert join.outcomes["closed"] == 1 and join.pending() == 0
+
+
+def test_duplicate_compute_half_is_late():
+    async def go():
+        join = HalfJoin()
+        first = asyncio.create_task(join.offer("r", "a", timeout_s=1.0))
+        await asyncio.sleep(0)
+        second = await join.offer("r", "b", timeout_s=1.0)
+        join.open("r")
+        half = await join.claim("r", timeout_s=1.0)
+        return second, await first, half
+
+    assert run(go()) == ("late", "joined", "a")
+
+
+def test_settled_outcomes_are_bounded():
+    async def go():
+        join = HalfJoin(remember=3)
+        for i in range(5):
+            join.open(f"r{i}")
+            join.close(f"r{i}")
+        # the oldest outcomes are forgotten, so a very late half is no longer recognised
+        return join, join.open("r0"), join.open("r4")
+
+    join, oldest, newest = run(go())
+    assert len(join._settled) == 3 and list(join._settled) == ["r2", "r3", "r4"]
+    assert oldest is True and newest is False
@@ -0,0 +1,79 @@
+# tests/test_kb_compiler.py — kb.metta parsing, compiled scoring and parity with real MeTTa
+
+import json
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agents.kb_compiler import LAPTOP_FIELDS, CompiledKB, KBCompileError, Sym, compare_scores, parse_sexprs
+from agents.messages import LaptopOption
+from agents.metta_engine import HAS_METTA, KB_PATH, MettaKB, parse_scores
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+LAPTOPS = [LaptopOption(**row) for row in json.loads((DATA / "laptops.json").read_text())["laptops"]]
+
+QUERY = """
+(= (get-laptop-scores)
+   (collapse (match &self (laptop $id $cpu $ram $gpu $price $rating $count)
+     (match &self (pref budget $budget)
+       (scored $id {expr} metta)))))
+"""
+
+
+def test_parse_sexprs():
+    forms = parse_sexprs('; comment\n(= (f $x) (+ $x 1.5)) (laptop "Intel Core i7" -3)')
+    assert forms == [["=", ["f", "$x"], ["+", "$x", 1.5]], ["laptop", "Intel Core i7", -3]]
+    assert isinstance(forms[0][1][1], Sym) and not isinstance(forms[1][1], Sym)
+    for bad in ("(+ 1 2", "(+ 1 2))"):
+        with pytest.raises(KBCompileError):
+            parse_sexprs(bad)
+
+
+def test_integer_division_truncates_like_hyperon():
+    kb = CompiledKB(QUERY.format(expr="(/ $ram $count)"))
+    columns = {field: np.zeros(2) for field in LAPTOP_FIELDS}
+    columns.update(id=["a", "b"], ram_gb=np.array([7, -7]), review_count=np.array([2, 2]))
+    assert kb.score_columns(columns, {"budget": 1.0}).tolist() == [3, -3]
+    kb = CompiledKB(QUERY.format(expr="(/ $ram 2.0)"))
+    assert kb.score_columns(columns, {"budget": 1.0}).tolist() == [3.5, -3.5]
+
+
+@pytest.mark.parametrize("text", [
+    "(= (f $x) (f $x))" + QUERY.format(expr="(f $ram)"),
+    "(= (f 1) 2)" + QUERY.format(expr="(f $ram)"),
+    "(= (f $x) 1) (= (f $x) 2)" + QUERY.format(expr="(f $ram)"),
+    QUERY.format(expr="(unknown $ram)"),
+    "(= (f $x) 1)",
+])
+def test_uncompilable_rules_are_rejected(text):
+    with pytest.raises(KBCompileError):
+        CompiledKB(text)
+
+
+def test_budget_column_broadcasts():
+    kb = CompiledKB.from_file(KB_PATH)
+    budgets = [900.0, 1500.0, 2500.0]
+    one_by_one = [kb.score(LAPTOPS, b, True) for b in budgets]
+    columns = {
+        "id": [l.id for l in LAPTOPS],
+        "processor": [l.specs.processor for l in LAPTOPS],
+        "ram_gb": np.array([l.specs.ram_gb for l in LAPTOPS]),
+        "gpu": [l.specs.gpu for l in LAPTOPS],
+        "price": np.array([l.price for l in LAPTOPS]),
+        "rating": np.array([l.rating for l in LAPTOPS]),
+        "review_count": np.array([l.review_count for l in LAPTOPS]),
+    }
+    grid = kb.score_columns(columns, {"budget": np.array(budgets)[:, None], "prefer_performance": True})
+    for row, expected in zip(grid, one_by_one):
+        assert row.tolist() == pytest.approx([expected[l.id] for l in LAPTOPS])
+
+
+@pytest.mark.skipif(not HAS_METTA, reason="hyperon is not installed")
+@pytest.mark.parametrize("budget,prefer", [(800.0, True), (1500.0, False), (3000.0, True)])
+def test_parity_with_metta(budget, prefer):
+    compiled = CompiledKB.from_file(KB_PATH).score(LAPTOPS, budget, prefer)
+    metta = parse_scores(MettaKB().score(LAPTOPS, budget, prefer))
+    report = compare_scores(compiled, metta)
+    assert report["ok"], report
@@ -0,0 +1,72 @@
+# tests/test_local_pipeline.py — Fused mode: in-process stages, no extra Agents
+
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+from agents.local_pipeline import LocalPipeline
+
+ROOT = Path(__file__).resolve().parent.parent
+
+COUNT_AGENTS = """
+import uagents
+built = []
+init = uagents.Agent.__init__
+def counting_init(self, *args, **kwargs):
+    built.append(kwargs.get("name"))
+    init(self, *args, **kwargs)
+uagents.Agent.__init__ = counting_init
+
+from agents import compute_agent, evaluator, negotiator, scout
+from agents.local_pipeline import fused_pipeline
+
+class Host:
+    def on_event(self, event):
+        return lambda fn: fn
+    def on_interval(self, period):
+        return lambda fn: fn
+
+pipeline = fused_pipeline(Host(), {})
+assert sorted(pipeline.stages) == ["compute", "evaluator", "negotiator", "scout"], pipeline.stages
+print("AGENTS", built)
+"""
+
+
+def test_stage_modules_build_no_agents():
+    out = subprocess.run([sys.executable, "-c", COUNT_AGENTS], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert "AGENTS []" in out.stdout
+
+
+class A:
+    address = "orchestrator"
+
+
+class Ctx:
+    agent = A()
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, destination, message):
+        self.sent.append((destination, message))
+
+
+def test_replies_to_the_orchestrator_stay_in_process():
+    delivered = []
+
+    async def stage(ctx, sender, message):
+        await ctx.send(sender, int(message))  # back to the orchestrator
+        await ctx.send("elsewhere", message)  # anything else goes out through the real context
+
+    async def on_reply(ctx, sender, message):
+        delivered.append((sender, message))
+
+    async def run():
+        ctx = Ctx()
+        await LocalPipeline({"scout": stage}, {int: on_reply}).submit(ctx, "scout", "7")
+        return ctx.sent
+
+    assert asyncio.run(run()) == [("elsewhere", "7")]
+    assert delivered == [("local:scout", 7)]
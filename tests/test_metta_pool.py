@@ -0,0 +1,104 @@
+# tests/test_metta_pool.py — MettaPool scoring, timeouts and worker recycling
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from agents.messages import LaptopOption
+from agents.metta_engine import HAS_METTA, KB_PATH, METTA_MP_START, MettaKB, MettaPool, MettaPoolTimeout, parse_scores
+
+pytestmark = pytest.mark.skipif(not HAS_METTA, reason="hyperon is not installed")
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+LAPTOPS = [LaptopOption(**row) for row in json.loads((DATA / "laptops.json").read_text())["laptops"]][:5]
+
+LOOPING_KB = """
+(= (spin $x) (spin $x))
+(= (get-laptop-scores)
+   (collapse (match &self (laptop $id $cpu $ram $gpu $price $rating $count)
+     (scored $id (spin $ram) metta))))
+"""
+
+# Spins on the 999 GB laptop only; every other laptop takes SLOW_S to score
+SLOW_S = 1.5
+MIXED_KB = f"""
+(= (spin $x) (spin $x))
+(= (slow $ram) (if (== $ram 999) (spin $ram) (let $t ((py-atom time.sleep) {SLOW_S}) $ram)))
+(= (get-laptop-scores)
+   (collapse (match &self (laptop $id $cpu $ram $gpu $price $rating $count)
+     (scored $id (slow $ram) metta))))
+"""
+
+
+def test_workers_are_not_forked():
+    assert METTA_MP_START in ("forkserver", "spawn")
+
+
+def test_pool_matches_in_process_kb():
+    async def run():
+        pool = MettaPool(1, timeout_s=60.0)
+        try:
+            return await pool.score(LAPTOPS, 1500.0, True), pool.stats()
+        finally:
+            pool.shutdown()
+
+    scores, stats = asyncio.run(run())
+    assert scores == parse_scores(MettaKB(KB_PATH).score(LAPTOPS, 1500.0, True))
+    assert stats["completed"] == 1 and stats["recycles"] == 0
+
+
+def test_timeout_recycles_workers_and_frees_the_slot(tmp_path):
+    kb = tmp_path / "kb.metta"
+    kb.write_text(LOOPING_KB)
+
+    async def run():
+        pool = MettaPool(1, max_inflight=1, timeout_s=1.0, kb_path=kb)
+        try:
+            await pool.warm()
+            with pytest.raises(MettaPoolTimeout):
+                await pool.score(LAPTOPS, 1500.0, True)
+            for _ in range(100):  # the terminated worker's call ends shortly after
+                if pool.in_flight == 0:
+                    break
+                await asyncio.sleep(0.05)
+            return pool.stats(), pool._semaphore.locked()
+        finally:
+            pool.shutdown()
+
+    stats, locked = asyncio.run(run())
+    assert stats["timeouts"] == 1 and stats["recycles"] == 1
+    assert stats["in_flight"] == 0 and not locked
+
+
+def test_timeout_lets_the_other_calls_on_the_pool_finish(tmp_path):
+    kb = tmp_path / "kb.metta"
+    kb.write_text(MIXED_KB)
+    stuck = LAPTOPS[0].copy(update={"specs": LAPTOPS[0].specs.copy(update={"ram_gb": 999})})
+
+    async def run():
+        pool = MettaPool(2, timeout_s=2.0, kb_path=kb)
+        try:
+            await pool.warm()
+            overrun = asyncio.create_task(pool.score([stuck], 1500.0, True))
+            await asyncio.sleep(1.0)
+            healthy = asyncio.create_task(pool.score(LAPTOPS[1:2], 1500.0, True))  # running when `overrun` times out
+            with pytest.raises(MettaPoolTimeout):
+                await overrun
+            scores = await healthy  # still on the retired pool, not broken by the recycle
+            for _ in range(100):
+                if pool.in_flight == 0:
+                    break
+                await asyncio.sleep(0.05)
+            stats = pool.stats()  # the retired pool was reaped, freeing the overrun call's slot
+            after = await pool.score(LAPTOPS[2:3], 1500.0, True)  # fresh workers
+            return scores, after, stats
+        finally:
+            pool.shutdown()
+
+    scores, after, stats = asyncio.run(run())
+    assert scores == {LAPTOPS[1].id: float(LAPTOPS[1].specs.ram_gb)}
+    assert after == {LAPTOPS[2].id: float(LAPTOPS[2].specs.ram_gb)}
+    assert stats["timeouts"] == 1 and stats["recycles"] == 1 and stats["errors"] == 0
+    assert stats["in_flight"] == 0
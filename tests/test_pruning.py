@@ -0,0 +1,117 @@
+# tests/test_pruning.py — Exact top-K under bound pruning, and kb.metta score bounds
+
+import asyncio
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from agents.kb_compiler import CompiledKB, has_bounded_rules, score_upper_bounds
+from agents.messages import LaptopOption
+from agents.metta_engine import HAS_METTA, KB_PATH, MettaKB, parse_scores
+from agents.pruning import bounded_top_k
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+LAPTOPS = [LaptopOption(**row) for row in json.loads((DATA / "laptops.json").read_text())["laptops"]]
+
+
+def top_k(scores, k):
+    return sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:k]
+
+
+def run_pruned(exact, upper, k, batch_size=4):
+    calls = []
+
+    async def score_rows(rows):
+        calls.append(list(rows))
+        return [exact[i] for i in rows]
+
+    scored, stats = asyncio.run(bounded_top_k(np.asarray(upper), k, score_rows, batch_size))
+    return scored, stats, calls
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_pruned_top_k_matches_full_ranking(seed):
+    rng = random.Random(seed)
+    n, k = rng.randrange(1, 80), rng.randrange(0, 10)
+    exact = [round(rng.random(), 2) for _ in range(n)]  # rounded, so ties happen
+    upper = [s + rng.random() * 0.3 for s in exact]
+    scored, stats, _ = run_pruned(exact, upper, k)
+    # every row that belongs in the top-K was scored, so ranking the scored rows gives the true top-K
+    pruned_rank = sorted(scored, key=lambda i: (-scored[i], i))[:k]
+    assert [exact[i] for i in pruned_rank] == [exact[i] for i in top_k(exact, k)]
+    assert stats["scored"] + stats["pruned"] == n and stats["bound_violations"] == 0
+    if k:
+        assert all(upper[i] < min(exact[j] for j in pruned_rank) for i in range(n) if i not in scored)
+
+
+def test_ties_at_the_threshold_are_scored():
+    exact = [0.9, 0.5, 0.5, 0.1]
+    scored, _, _ = run_pruned(exact, [0.9, 0.5, 0.5, 0.1], 2, batch_size=1)
+    assert {0, 1, 2} <= set(scored) and 3 not in scored
+
+
+def test_non_finite_bounds_are_always_scored():
+    exact = [0.3, 0.8, 0.9, 0.1]
+    scored, stats, _ = run_pruned(exact, [np.nan, np.nan, 0.95, 0.2], 1, batch_size=1)
+    assert set(scored) == {0, 1, 2} and stats["pruned"] == 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        upper = score_upper_bounds([16, 32], [900.0, 1200.0], [4.5, 4.0], 0.0, True)
+    scored, _, _ = run_pruned([0.4, 0.6], upper, 1)
+    assert len(scored) == 2
+
+
+def test_broken_bounds_fall_back_to_scoring_everything():
+    exact = [0.2, 0.9, 0.1, 0.3, 0.4]
+    upper = [0.8, 0.5, 0.7, 0.6, 0.45]  # row 1 beats its bound
+    scored, stats, _ = run_pruned(exact, upper, 1, batch_size=1)
+    assert len(scored) == len(exact) and stats["bound_violations"] == 1
+
+
+def random_laptops(n, seed):
+    rng = random.Random(seed)
+    return [
+        LAPTOPS[0].copy(update={
+            "id": f"syn-{i}", "price": round(rng.uniform(200, 4000), 2), "rating": round(rng.uniform(0, 5), 1),
+            "review_count": rng.randrange(0, 2000),
+            "specs": LAPTOPS[0].specs.copy(update={"ram_gb": rng.choice([4, 8, 12, 16, 24, 32, 48, 64, 96])}),
+        })
+        for i in range(n)
+    ]
+
+
+def bounds(laptops, budget, prefer):
+    return dict(zip(
+        [l.id for l in laptops],
+        score_upper_bounds([l.specs.ram_gb for l in laptops], [l.price for l in laptops],
+                           [l.rating for l in laptops], budget, prefer),
+    ))
+
+
+@pytest.mark.parametrize("budget", [500.0, 1234.5, 3000.0])
+@pytest.mark.parametrize("prefer", [True, False])
+def test_bounds_hold_for_compiled_scores(budget, prefer):
+    laptops = LAPTOPS + random_laptops(300, seed=int(budget))
+    ub = bounds(laptops, budget, prefer)
+    for lid, score in CompiledKB.from_file(KB_PATH).score(laptops, budget, prefer).items():
+        assert score <= ub[lid]
+
+
+@pytest.mark.skipif(not HAS_METTA, reason="hyperon is not installed")
+@pytest.mark.parametrize("prefer", [True, False])
+def test_bounds_hold_for_metta_scores(prefer):
+    laptops = LAPTOPS + random_laptops(60, seed=3)
+    ub = bounds(laptops, 1500.0, prefer)
+    metta = parse_scores(MettaKB().score(laptops, 1500.0, prefer))
+    assert metta.keys() == ub.keys()
+    assert all(score <= ub[lid] for lid, score in metta.items())
+
+
+def test_bounds_only_apply_to_the_rules_they_came_from():
+    text = KB_PATH.read_text()
+    assert has_bounded_rules(text) and CompiledKB(text).bounded
+    changed = text.replace("(* 0.25 $rating-norm))))", "(* 0.35 $rating-norm))))")
+    assert changed != text
+    assert not has_bounded_rules(changed) and not CompiledKB(changed).bounded
@@ -0,0 +1,92 @@
+# tests/test_request_state.py — Request state lifecycle, expiry, eviction and size accounting
+
+import time
+
+import agents.request_state as request_state
+from agents.request_state import RequestStateStore, approx_size
+
+
+def test_lifecycle_and_phases():
+    store = RequestStateStore()
+    st = store.create("r", user="u", requirements={"budget": 1000})
+    st["candidates"] = list(range(10))
+    assert "r" in store and len(store) == 1 and store.phase("r") == "scouting"
+    store.advance("r", "evaluating")
+    store.advance("r", "computing")  # never moves backwards
+    assert store.phase("r") == "evaluating"
+    store.finish("r", ok=False)
+    store.finish("r", ok=True)  # already finished
+    store.advance("r", "negotiating")
+    assert store.phase("r") == "failed"
+    assert store.get("r") == {"user": "u", "requirements": {"budget": 1000}}
+    stats = store.stats()
+    assert stats["by_phase"]["failed"] == 1 and stats["by_phase"]["scouting"] == 0
+    assert stats["finished"] == {"done": 0, "failed": 1}
+    assert store.get("missing", {}) == {} and store.phase("missing") is None
+
+
+def test_eviction_prefers_finished_then_lru():
+    store = RequestStateStore(max_entries=3)
+    for rid in "abc":
+        store.create(rid)
+    store.finish("b")
+    store.get("a")  # c is now the least recently used active entry
+    store.create("d")
+    assert "b" not in store
+    store.create("e")
+    assert "c" not in store and set("ade") == {rid for rid in "abcde" if rid in store}
+    assert store.stats()["evicted"]["lru"] == 2
+
+
+def test_expire_uses_phase_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(request_state.time, "monotonic", lambda: now[0])
+    store = RequestStateStore(ttl_s=100.0, done_ttl_s=10.0)
+    for rid in ("active", "done", "fresh"):
+        store.create(rid)
+    store.finish("done")
+    now[0] += 50.0
+    store.get("fresh")
+    assert store.expire() == 1 and "done" not in store
+    now[0] += 60.0
+    assert store.expire() == 1 and "active" not in store and "fresh" in store
+    assert store.stats()["evicted"]["ttl"] == 2
+
+
+def test_running_size_tracks_a_full_measure():
+    store = RequestStateStore(remeasure=1_000)
+    for i in range(20):
+        st = store.create(f"r{i}", user=f"u{i}")
+        st["scored"] = [float(j) for j in range(i * 10)]
+    store.discard("r3", "scored")
+    store.finish("r4")
+    store.get("r5")["extra"] = "x" * 1000
+    store.create("r6", user="again")
+    store.expire()
+
+    stats = store.stats()
+    full = sum(approx_size(e.state) for bucket in (store._active, store._terminal) for e in bucket.values())
+    assert stats["approx_bytes"] == full and stats["stale_sizes"] == 0
+
+
+def test_stats_remeasures_a_bounded_batch(monkeypatch):
+    store = RequestStateStore(remeasure=4)
+    for i in range(50):
+        store.create(f"r{i}")
+    store.stats()  # the first batch
+    calls = []
+    monkeypatch.setattr(request_state, "approx_size", lambda obj: calls.append(obj) or 0)
+    stats = store.stats()
+    assert len(calls) == 4 and stats["stale_sizes"] == 42
+    assert stats["entries"] == 50 and stats["by_phase"]["scouting"] == 50
+
+
+def test_recreate_replaces_entry():
+    store = RequestStateStore()
+    store.create("r", user="u")
+    store.finish("r")
+    store.create("r", user="v")
+    stats = store.stats()
+    assert len(store) == 1 and store.phase("r") == "scouting"
+    assert stats["by_phase"]["done"] == 0 and stats["by_phase"]["scouting"] == 1
+    assert stats["approx_bytes"] == approx_size(store.get("r"))
@@ -0,0 +1,77 @@
+# tests/test_skyline.py — K-skyband filter vs. brute-force dominance counts
+
+import random
+
+import numpy as np
+import pytest
+
+from agents.messages import LaptopOption
+from agents.skyline import SkybandStream, dominance_columns, skyband
+
+PROCESSORS = ["Intel Core i7-12700H", "AMD Ryzen 7 7840HS", "Apple M2 Pro"]
+GPUS = ["NVIDIA RTX 4060", "Intel Iris Xe Graphics"]
+
+
+def make_laptops(n, seed):
+    rng = random.Random(seed)
+    return [
+        LaptopOption(
+            id=f"lap-{i}", model=f"Model {i}", brand="Brand", supplier="Supplier",
+            specs={
+                "processor": rng.choice(PROCESSORS), "ram_gb": rng.choice([8, 16, 32]), "storage_gb": 512,
+                "gpu": rng.choice(GPUS), "screen_size": 15.6, "weight_lbs": 4.0,
+            },
+            price=rng.choice([800.0, 1000.0, 1200.0, 1500.0]), rating=rng.choice([3.5, 4.0, 4.5, 5.0]),
+            review_count=rng.choice([50, 300, 500, 900]), shipping_days=rng.choice([2, 5]),
+            warranty_years=rng.choice([1, 2, 3]), stock=10, use_cases=[], bulk_pricing=[],
+        )
+        for i in range(n)
+    ]
+
+
+def brute_force(laptops, k):
+    cols, group = dominance_columns(laptops)
+    counts = [
+        sum(group[i] == group[j] and (cols[i] >= cols[j]).all() for i in range(j))
+        for j in range(len(laptops))
+    ]
+    survivors = [j for j, c in enumerate(counts) if c < k]
+    return survivors, [counts[j] for j in survivors]
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("k", [1, 3, 5])
+def test_skyband_matches_brute_force(seed, k):
+    laptops = make_laptops(120, seed)
+    assert skyband(laptops, k) == brute_force(laptops, k)
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 50])
+def test_chunked_stream_matches_one_pass(chunk):
+    laptops = make_laptops(150, seed=11)
+    stream = SkybandStream(3)
+    survivors, counts = [], []
+    for start in range(0, len(laptops), chunk):
+        rows, dom = stream.add(laptops[start:start + chunk])
+        survivors += [start + r for r in rows]
+        counts += dom
+    assert (survivors, counts) == skyband(laptops, 3)
+    assert stream.survivors == len(survivors) and stream.seen == len(laptops)
+
+
+def test_monotone_score_top_k_survives():
+    laptops = make_laptops(200, seed=4)
+    cols, group = dominance_columns(laptops)
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        score = cols @ rng.random(cols.shape[1]) + rng.random(group.max() + 1)[group]
+        k = int(rng.integers(1, 6))
+        survivors, _ = skyband(laptops, k)
+        full = sorted(range(len(laptops)), key=lambda i: (-score[i], i))[:k]
+        kept = sorted(survivors, key=lambda i: (-score[i], i))[:k]
+        assert full == kept
+
+
+def test_k_zero_keeps_everything():
+    laptops = make_laptops(10, seed=1)
+    assert skyband(laptops, 0) == (list(range(10)), [0] * 10)
@@ -0,0 +1,89 @@
+# tests/test_streaming.py — Running top-K over streamed candidate chunks
+
+import random
+
+from agents.streaming import RankStream, RankStreams
+
+
+def chunk_ranking(scores, items):
+    order = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+    return [(i, scores[i], items[i]) for i in order]
+
+
+def test_out_of_order_chunks_match_one_shot_ranking():
+    rng = random.Random(3)
+    chunks = [[round(rng.random(), 2) for _ in range(7)] for _ in range(5)]
+    expected = sorted(
+        ((-s, c, p, f"{c}:{p}") for c, scores in enumerate(chunks) for p, s in enumerate(scores)),
+        key=lambda e: e[:3],
+    )[:10]
+
+    stream = RankStream(top_k=10)
+    order = list(range(len(chunks)))
+    rng.shuffle(order)
+    for n, c in enumerate(order):
+        items = [f"{c}:{p}" for p in range(len(chunks[c]))]
+        last = n == len(order) - 1
+        assert not stream.complete
+        assert stream.add(c, chunk_ranking(chunks[c], items), chunks[c], len(chunks) if last else None)
+
+    assert stream.complete
+    assert stream.ranked() == [item for *_, item in expected]
+    assert sorted(stream.scores) == sorted(s for scores in chunks for s in scores)
+
+
+def test_ties_keep_scout_order():
+    stream = RankStream(top_k=3)
+    stream.add(1, [(0, 0.5, "b0"), (1, 0.5, "b1")], [0.5, 0.5])
+    stream.add(0, [(0, 0.5, "a0"), (1, 0.5, "a1")], [0.5, 0.5], total_chunks=2)
+    assert stream.ranked() == ["a0", "a1", "b0"]
+
+
+def test_duplicate_chunk_is_ignored():
+    stream = RankStream(top_k=None)
+    assert stream.add(0, [(0, 0.9, "x")], [0.9])
+    assert not stream.add(0, [(0, 0.9, "x")], [0.9])
+    assert stream.ranked() == ["x"] and stream.scores == [0.9]
+
+
+def test_complete_needs_the_announced_total():
+    stream = RankStream(top_k=5)
+    stream.add(2, [], [], total_chunks=3)
+    stream.add(0, [], [])
+    assert not stream.complete
+    stream.add(1, [], [])
+    assert stream.complete
+
+
+def test_zero_top_k_keeps_nothing():
+    stream = RankStream(top_k=0)
+    stream.add(0, [(0, 1.0, "x")], [1.0], total_chunks=1)
+    assert stream.ranked() == [] and stream.scores == [1.0]
+
+
+def test_streams_reuse_and_close():
+    streams = RankStreams()
+    first = streams.get("r", top_k=3)
+    assert streams.get("r", top_k=99) is first and first.top_k == 3
+    streams.close("r")
+    streams.close("r")
+    assert len(streams) == 0 and streams.get("r", top_k=3) is not first
+
+
+def test_idle_streams_expire():
+    streams = RankStreams(ttl_s=60.0)
+    old = streams.get("old", top_k=3)
+    old.touched_at -= 120.0
+    streams.get("new", top_k=3)
+    assert len(streams) == 1 and streams.expired == 1
+    assert streams.get("new", top_k=3) is not old
+
+
+def test_max_entries_drops_least_recently_used():
+    streams = RankStreams(max_entries=2)
+    a = streams.get("a", top_k=1)
+    streams.get("b", top_k=1)
+    streams.get("a", top_k=1)  # a is now most recent
+    streams.get("c", top_k=1)
+    assert len(streams) == 2 and streams.expired == 1
+    assert streams.get("a", top_k=1) is a
@@ -0,0 +1,64 @@
+import json
+import random
+from pathlib import Path
+
+from agents.taxonomy import match_processor_weight, parse_gpu, parse_processor
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+WEIGHTS = json.loads((DATA / "scoring_factors.json").read_text())["processor_weights"]
+
+
+def substring_weight(processor, weights, default=0.7):
+    # the pre-taxonomy walk: first key that is a substring of the processor string
+    for key, val in weights.items():
+        if key.lower() in processor.lower():
+            return val
+    return default
+
+
+def test_parse_processor_fields():
+    info = parse_processor("Intel Core i7-12700H")
+    assert (info.vendor, info.family, info.tier, info.generation) == ("intel", "core", 7, 12)
+    info = parse_processor("AMD Ryzen 9 7945HX")
+    assert (info.vendor, info.family, info.tier, info.generation) == ("amd", "ryzen", 9, 7)
+    info = parse_processor("Apple M2 Pro")
+    assert (info.family, info.generation, info.variant, info.high_tier) == ("m-series", 2, "pro", True)
+    assert parse_processor("Apple M2").tier is None
+    assert parse_processor("Mystery CPU").family is None
+
+
+def test_parse_gpu_fields():
+    info = parse_gpu("NVIDIA GeForce RTX 4060")
+    assert (info.family, info.generation, info.tier, info.discrete) == ("rtx", 40, 60, True)
+    assert parse_gpu("NVIDIA RTX A2000").tier == 20
+    assert parse_gpu("Intel Iris Xe Graphics").family == "iris-xe"
+    assert not parse_gpu("AMD Radeon Graphics").discrete
+
+
+def test_vendor_must_be_named_to_match_vendor_key():
+    assert match_processor_weight("Core i7 12700H", WEIGHTS) == 0.7
+    assert match_processor_weight("Intel Core i7-12700H", WEIGHTS) == 0.85
+    assert match_processor_weight("Core i7 12700H", {"Core i7": 0.8}) == 0.8
+
+
+def test_most_specific_key_wins_regardless_of_order():
+    weights = {"Apple M2": 0.78, "Apple M2 Pro": 0.90}
+    assert match_processor_weight("Apple M2 Pro", weights) == 0.90
+    assert match_processor_weight("Apple M2 Pro", dict(reversed(list(weights.items())))) == 0.90
+    assert match_processor_weight("Apple M2", weights) == 0.78
+
+
+def test_matches_substring_walk_on_catalog():
+    processors = {row["specs"]["processor"] for row in json.loads((DATA / "laptops.json").read_text())["laptops"]}
+    processors |= {"Core i7 12700H", "Intel Core i5-1335U", "AMD Ryzen 7 PRO 7840U", "Snapdragon X Elite", "Mystery CPU"}
+    for processor in processors:
+        assert match_processor_weight(processor, WEIGHTS) == substring_weight(processor, WEIGHTS), processor
+
+
+def test_matches_substring_walk_on_random_strings():
+    rng = random.Random(8)
+    vendors = ["Intel ", "AMD ", "Apple ", ""]
+    models = ["Core i5-1335U", "Core i7 12700H", "Core i9-13900HX", "Ryzen 7 7840HS", "Ryzen 9 7945HX", "M2", "M2 Pro"]
+    for _ in range(200):
+        processor = rng.choice(vendors) + rng.choice(models)
+        assert match_processor_weight(processor, WEIGHTS) == substring_weight(processor, WEIGHTS), processor
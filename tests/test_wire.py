@@ -0,0 +1,25 @@
+# tests/test_wire.py — Compact payload columns round-trip to the full form
+
+import json
+from pathlib import Path
+
+from agents.messages import LaptopEvaluationRequest, LaptopOption
+from agents.wire import dominance_column, with_dominance
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+LAPTOPS = [LaptopOption(**row) for row in json.loads((DATA / "laptops.json").read_text())["laptops"]][:4]
+
+
+def test_dominance_counts_survive_the_compact_form():
+    tagged = [l.copy(update={"dominance_count": c}) for l, c in zip(LAPTOPS, (0, 2, 1, 0))]
+    msg = LaptopEvaluationRequest(
+        request_id="r", use_case="office-work", quantity=1, max_budget=1500.0,
+        laptop_ids=[l.id for l in tagged], **dominance_column(tagged),
+    )
+    resolved = with_dominance(list(LAPTOPS), msg.dominance_counts)  # rows as a catalog replica returns them
+    assert resolved == tagged
+
+
+def test_untagged_laptops_send_no_column():
+    assert dominance_column(LAPTOPS) == {}
+    assert with_dominance(LAPTOPS, None) is LAPTOPS